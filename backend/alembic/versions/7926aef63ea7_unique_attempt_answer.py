@@ -0,0 +1,34 @@
+"""unique attempt answer per question
+
+Revision ID: 7926aef63ea7
+Revises: e22356a186b8
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7926aef63ea7'
+down_revision: Union[str, None] = 'e22356a186b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep only the latest row of any (attempt, question) duplicates left by concurrent autosaves
+    op.execute(
+        "DELETE FROM attempt_answers WHERE id NOT IN "
+        "(SELECT MAX(id) FROM attempt_answers GROUP BY attempt_id, question_id)"
+    )
+    with op.batch_alter_table('attempt_answers') as batch_op:
+        batch_op.create_unique_constraint('uq_attempt_answers_attempt_question', ['attempt_id', 'question_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('attempt_answers') as batch_op:
+        batch_op.drop_constraint('uq_attempt_answers_attempt_question', type_='unique')
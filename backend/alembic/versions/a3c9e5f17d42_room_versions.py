@@ -0,0 +1,29 @@
+"""room version column for the room assessment list ETag
+
+Revision ID: a3c9e5f17d42
+Revises: f1b6d2c8a943
+Create Date: 2026-10-19 10:12:08.214377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5f17d42'
+down_revision: Union[str, None] = 'f1b6d2c8a943'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('rooms') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('rooms') as batch_op:
+        batch_op.drop_column('version')
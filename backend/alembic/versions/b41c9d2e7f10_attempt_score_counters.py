@@ -0,0 +1,43 @@
+"""running score counters on attempts
+
+Revision ID: b41c9d2e7f10
+Revises: 7926aef63ea7
+Create Date: 2026-10-18 11:02:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c9d2e7f10'
+down_revision: Union[str, None] = '7926aef63ea7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('attempts') as batch_op:
+        batch_op.add_column(sa.Column('answered_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('correct_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total_questions', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from the answers already stored
+    op.execute(
+        "UPDATE attempts SET "
+        "answered_count = (SELECT COUNT(*) FROM attempt_answers WHERE attempt_answers.attempt_id = attempts.id), "
+        "correct_count = (SELECT COUNT(*) FROM attempt_answers "
+        "WHERE attempt_answers.attempt_id = attempts.id AND attempt_answers.is_correct), "
+        "total_questions = (SELECT COUNT(*) FROM assessment_questions "
+        "WHERE assessment_questions.assessment_id = attempts.assessment_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('attempts') as batch_op:
+        batch_op.drop_column('total_questions')
+        batch_op.drop_column('correct_count')
+        batch_op.drop_column('answered_count')
@@ -0,0 +1,62 @@
+"""analytics rollup tables
+
+Revision ID: c5e8a1f04d3b
+Revises: b41c9d2e7f10
+Create Date: 2026-10-18 13:40:51.208774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1f04d3b'
+down_revision: Union[str, None] = 'b41c9d2e7f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('assessment_score_rollups',
+    sa.Column('assessment_id', sa.Integer(), nullable=False),
+    sa.Column('attempt_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('highest_score', sa.Float(), nullable=True),
+    sa.Column('lowest_score', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.PrimaryKeyConstraint('assessment_id')
+    )
+    op.create_table('question_option_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assessment_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('selected_answer', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('selected_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['assessment_id'], ['assessments.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('assessment_id', 'question_id', 'selected_answer', name='uq_question_option_rollups')
+    )
+
+    # Backfill from submitted attempts (same aggregation as app.analytics.rollups.rebuild_rollups)
+    op.execute(
+        "INSERT INTO assessment_score_rollups "
+        "(assessment_id, attempt_count, score_sum, highest_score, lowest_score) "
+        "SELECT assessment_id, COUNT(id), SUM(score), MAX(score), MIN(score) FROM attempts "
+        "WHERE submitted_at IS NOT NULL GROUP BY assessment_id"
+    )
+    op.execute(
+        "INSERT INTO question_option_rollups (assessment_id, question_id, selected_answer, selected_count) "
+        "SELECT attempts.assessment_id, attempt_answers.question_id, attempt_answers.selected_answer, "
+        "COUNT(attempt_answers.id) FROM attempt_answers JOIN attempts ON attempt_answers.attempt_id = attempts.id "
+        "WHERE attempts.submitted_at IS NOT NULL "
+        "GROUP BY attempts.assessment_id, attempt_answers.question_id, attempt_answers.selected_answer"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('question_option_rollups')
+    op.drop_table('assessment_score_rollups')
@@ -0,0 +1,79 @@
+"""composite indexes for hot lookups
+
+Revision ID: d93f6b2a8c71
+Revises: c5e8a1f04d3b
+Create Date: 2026-10-18 15:05:33.671240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93f6b2a8c71'
+down_revision: Union[str, None] = 'c5e8a1f04d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicate attempts of one (assessment, student) left by concurrent starts, all but the one to keep:
+# a submitted attempt over an unsubmitted one, then the one with more answers, then the oldest
+DUPLICATE_ATTEMPTS = (
+    "SELECT id FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY assessment_id, student_id ORDER BY "
+    "CASE WHEN submitted_at IS NULL THEN 1 ELSE 0 END, answered_count DESC, id) AS keep_rank "
+    "FROM attempts) ranked WHERE keep_rank > 1"
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    affected = [row[0] for row in bind.execute(sa.text(
+        f"SELECT DISTINCT assessment_id FROM attempts WHERE id IN ({DUPLICATE_ATTEMPTS})"
+    ))]
+    if affected:
+        op.execute(f"DELETE FROM attempt_answers WHERE attempt_id IN ({DUPLICATE_ATTEMPTS})")
+        op.execute(f"DELETE FROM attempts WHERE id IN ({DUPLICATE_ATTEMPTS})")
+        # Rebuild the rollups of those assessments (same aggregation as app.analytics.rollups.rebuild_rollups)
+        assessments = sa.bindparam("assessments", affected, expanding=True)
+        bind.execute(
+            sa.text("DELETE FROM assessment_score_rollups WHERE assessment_id IN :assessments").bindparams(assessments)
+        )
+        bind.execute(
+            sa.text("DELETE FROM question_option_rollups WHERE assessment_id IN :assessments").bindparams(assessments)
+        )
+        bind.execute(sa.text(
+            "INSERT INTO assessment_score_rollups "
+            "(assessment_id, attempt_count, score_sum, highest_score, lowest_score) "
+            "SELECT assessment_id, COUNT(id), SUM(score), MAX(score), MIN(score) FROM attempts "
+            "WHERE submitted_at IS NOT NULL AND assessment_id IN :assessments GROUP BY assessment_id"
+        ).bindparams(assessments))
+        bind.execute(sa.text(
+            "INSERT INTO question_option_rollups (assessment_id, question_id, selected_answer, selected_count) "
+            "SELECT attempts.assessment_id, attempt_answers.question_id, attempt_answers.selected_answer, "
+            "COUNT(attempt_answers.id) FROM attempt_answers JOIN attempts ON attempt_answers.attempt_id = attempts.id "
+            "WHERE attempts.submitted_at IS NOT NULL AND attempts.assessment_id IN :assessments "
+            "GROUP BY attempts.assessment_id, attempt_answers.question_id, attempt_answers.selected_answer"
+        ).bindparams(assessments))
+
+    with op.batch_alter_table('attempts') as batch_op:
+        batch_op.create_unique_constraint('uq_attempts_assessment_student', ['assessment_id', 'student_id'])
+
+    # attempt_answers(attempt_id, question_id) is already unique (7926aef63ea7)
+    op.create_index('ix_room_members_room_student_left', 'room_members', ['room_id', 'student_id', 'left_at'], unique=False)
+    op.create_index('ix_room_members_student_left', 'room_members', ['student_id', 'left_at'], unique=False)
+    op.create_index('ix_assessment_questions_assessment_order', 'assessment_questions', ['assessment_id', 'question_order'], unique=False)
+    op.create_index('ix_assessments_room_id', 'assessments', ['room_id'], unique=False)
+    op.create_index('ix_rooms_teacher_id', 'rooms', ['teacher_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rooms_teacher_id', table_name='rooms')
+    op.drop_index('ix_assessments_room_id', table_name='assessments')
+    op.drop_index('ix_assessment_questions_assessment_order', table_name='assessment_questions')
+    op.drop_index('ix_room_members_student_left', table_name='room_members')
+    op.drop_index('ix_room_members_room_student_left', table_name='room_members')
+    with op.batch_alter_table('attempts') as batch_op:
+        batch_op.drop_constraint('uq_attempts_assessment_student', type_='unique')
@@ -0,0 +1,31 @@
+"""attempts index for score-ordered report pages
+
+Revision ID: e4a7c3d91b25
+Revises: d93f6b2a8c71
+Create Date: 2026-10-18 16:42:10.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c3d91b25'
+down_revision: Union[str, None] = 'd93f6b2a8c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Student-ordered pages use uq_attempts_assessment_student (d93f6b2a8c71)
+    op.create_index(
+        'ix_attempts_assessment_score', 'attempts',
+        ['assessment_id', sa.text('score DESC'), 'submitted_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attempts_assessment_score', table_name='attempts')
@@ -0,0 +1,63 @@
+"""question bank filter and full-text search indexes
+
+Revision ID: f1b6d2c8a943
+Revises: e4a7c3d91b25
+Create Date: 2026-10-18 18:20:47.503112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d2c8a943'
+down_revision: Union[str, None] = 'e4a7c3d91b25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_questions_bank_filters', 'questions', ['created_by', 'topic', 'difficulty', 'id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.create_index(
+            'ix_questions_text_search', 'questions',
+            [sa.text("to_tsvector('english', question_text)")], unique=False, postgresql_using='gin'
+        )
+    elif dialect == 'sqlite':
+        # Same objects as SQLITE_FTS_DDL in app/models/question.py
+        op.execute(
+            "CREATE VIRTUAL TABLE questions_fts USING fts5("
+            "question_text, content='questions', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER questions_fts_ai AFTER INSERT ON questions BEGIN "
+            "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER questions_fts_ad AFTER DELETE ON questions BEGIN "
+            "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER questions_fts_au AFTER UPDATE OF question_text ON questions BEGIN "
+            "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); "
+            "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END"
+        )
+        # Index the existing questions
+        op.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_questions_text_search', table_name='questions')
+    elif dialect == 'sqlite':
+        # Dropping the virtual table does not drop triggers that live on questions
+        for trigger in ('questions_fts_ai', 'questions_fts_ad', 'questions_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS questions_fts")
+    op.drop_index('ix_questions_bank_filters', table_name='questions')
@@ -0,0 +1,143 @@
+"""
+Classical test theory item analysis over an assessment's response matrix.
+
+Input is the flat (attempt, question, selected option, correctness) rows of an assessment,
+as returned by one query. They are scattered into an attempts x questions 0/1 score matrix,
+and every statistic is then a vectorized reduction over that matrix:
+
+- option distribution: counts per (question, option)
+- difficulty: p-value, the share of attempts answering the question correctly
+- discrimination: p-value in the top 27% of total scores minus p-value in the bottom 27%
+- point-biserial: correlation between the item score and the total score
+- KR-20: internal consistency of the whole test
+
+Unanswered questions score 0. Statistics that are undefined for the data (no variance,
+too few attempts) come back as NaN.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+DISCRIMINATION_GROUP = 0.27
+
+
+@dataclass
+class ItemAnalysis:
+    n_attempts: int
+    option_counts: np.ndarray    # (n_questions, max_options), int
+    difficulty: np.ndarray       # (n_questions,)
+    discrimination: np.ndarray   # (n_questions,)
+    point_biserial: np.ndarray   # (n_questions,)
+    kr20: float
+
+
+def encode_rows(
+    rows: Sequence[Tuple[int, Optional[int], Optional[str], Optional[bool]]],
+    question_ids: Sequence[int],
+    options: Sequence[Sequence[str]],
+):
+    """
+    Turn (attempt_id, question_id, selected_answer, is_correct) rows into index arrays.
+
+    Rows with a NULL question_id stand for submitted attempts without answers; they only
+    count towards the number of attempts. Answers to questions outside `question_ids`
+    are dropped, selections that match none of the question's options get option -1.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if not rows:
+        return 0, empty, empty, empty, np.zeros(0, dtype=bool)
+
+    # Column by column: cheaper than zip(*rows), which builds four million-element tuples
+    _, attempt_idx = np.unique(np.asarray([r[0] for r in rows], dtype=np.int64), return_inverse=True)
+    n_attempts = int(attempt_idx.max()) + 1
+    if not question_ids:
+        return n_attempts, empty, empty, empty, np.zeros(0, dtype=bool)
+
+    question_col = np.asarray([r[1] for r in rows], dtype=object)
+    answered = question_col != None
+    question_arr = np.where(answered, question_col, 0).astype(np.int64)
+
+    order = np.argsort(np.asarray(question_ids, dtype=np.int64))
+    sorted_ids = np.asarray(question_ids, dtype=np.int64)[order]
+    pos = np.minimum(np.searchsorted(sorted_ids, question_arr), len(sorted_ids) - 1)
+    known = answered & (sorted_ids[pos] == question_arr)
+    question_idx = order[pos]
+
+    # Selected strings become codes with one dict lookup each; a small (code x question) table maps codes
+    # to option slots. Unknown selections get code -1, which hits the table's trailing all -1 row.
+    code_of: Dict[str, int] = {}
+    for question_options in options:
+        for option in question_options:
+            code_of.setdefault(option, len(code_of))
+    answer_codes = np.asarray([code_of.get(r[2], -1) for r in rows], dtype=np.int64)
+    option_table = np.full((len(code_of) + 1, len(question_ids)), -1, dtype=np.int64)
+    for q_index, question_options in enumerate(options):
+        for o_index, option in enumerate(question_options):
+            option_table[code_of[option], q_index] = o_index
+    option_idx = option_table[answer_codes, question_idx]
+
+    correct = np.asarray([bool(r[3]) for r in rows], dtype=bool)
+    return n_attempts, attempt_idx[known], question_idx[known], option_idx[known], correct[known]
+
+
+def analyze(
+    n_attempts: int,
+    attempt_idx: np.ndarray,
+    question_idx: np.ndarray,
+    option_idx: np.ndarray,
+    correct: np.ndarray,
+    n_questions: int,
+    max_options: int,
+) -> ItemAnalysis:
+    max_options = max(max_options, 1)
+    chosen = option_idx >= 0
+    option_counts = np.bincount(
+        question_idx[chosen] * max_options + option_idx[chosen], minlength=n_questions * max_options
+    ).reshape(n_questions, max_options)
+
+    scores = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    scores[attempt_idx[correct], question_idx[correct]] = 1.0
+
+    nan = np.full(n_questions, np.nan)
+    if n_attempts == 0:
+        return ItemAnalysis(0, option_counts, nan, nan.copy(), nan.copy(), float("nan"))
+
+    totals = scores.sum(axis=1)
+    difficulty = scores.mean(axis=0)
+    item_var = difficulty * (1.0 - difficulty)
+    total_var = totals.var()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (totals @ scores) / n_attempts - difficulty * totals.mean()
+        point_biserial = covariance / np.sqrt(item_var * total_var)
+        point_biserial[(item_var == 0) | (total_var == 0)] = np.nan
+
+    group = int(round(DISCRIMINATION_GROUP * n_attempts))
+    if group >= 1 and n_attempts >= 2:
+        ranked = np.argsort(totals, kind="stable")
+        discrimination = scores[ranked[-group:]].mean(axis=0) - scores[ranked[:group]].mean(axis=0)
+    else:
+        discrimination = nan.copy()
+
+    if n_questions > 1 and total_var > 0:
+        kr20 = float(n_questions / (n_questions - 1) * (1.0 - item_var.sum() / total_var))
+    else:
+        kr20 = float("nan")
+
+    return ItemAnalysis(n_attempts, option_counts, difficulty, discrimination, point_biserial, kr20)
+
+
+def analyze_rows(
+    rows: Sequence[Tuple[int, Optional[int], Optional[str], Optional[bool]]],
+    question_ids: Sequence[int],
+    options: Sequence[Sequence[str]],
+) -> ItemAnalysis:
+    n_attempts, attempt_idx, question_idx, option_idx, correct = encode_rows(rows, question_ids, options)
+    max_options = max((len(o) for o in options), default=0)
+    return analyze(n_attempts, attempt_idx, question_idx, option_idx, correct, len(question_ids), max_options)
+
+
+def finite_or_none(value) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
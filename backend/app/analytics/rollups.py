@@ -0,0 +1,134 @@
+"""
+Analytics rollups: per-assessment score aggregates and per-question option counts.
+
+Attempt submission adds to them in its own transaction, so dashboards read a few
+pre-aggregated rows instead of re-aggregating attempts and answers. If they ever drift
+(manual DB edits, data imported before the tables existed), rebuild them from the raw rows:
+
+    python -m app.analytics.rollups [--assessment-id ID]
+
+Rebuild while no attempts are being submitted for the assessments involved.
+"""
+import argparse
+from typing import List, Optional, Sequence
+
+from sqlalchemy import case, delete, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from app.database import get_engine
+from app.models.analytics import AssessmentScoreRollup, QuestionOptionRollup
+from app.models.attempt import Attempt, AttemptAnswer
+
+
+def _insert(dialect: str):
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+
+def score_rollup_upsert(dialect: str, assessment_id: int, scores: Sequence[float]):
+    """Fold newly submitted scores into the assessment's score rollup."""
+    statement = _insert(dialect)(AssessmentScoreRollup).values(
+        assessment_id=assessment_id,
+        attempt_count=len(scores),
+        score_sum=sum(scores),
+        highest_score=max(scores),
+        lowest_score=min(scores)
+    )
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=[AssessmentScoreRollup.assessment_id],
+        set_={
+            "attempt_count": AssessmentScoreRollup.attempt_count + excluded.attempt_count,
+            "score_sum": AssessmentScoreRollup.score_sum + excluded.score_sum,
+            "highest_score": case(
+                (or_(AssessmentScoreRollup.highest_score == None, excluded.highest_score > AssessmentScoreRollup.highest_score),
+                 excluded.highest_score),
+                else_=AssessmentScoreRollup.highest_score
+            ),
+            "lowest_score": case(
+                (or_(AssessmentScoreRollup.lowest_score == None, excluded.lowest_score < AssessmentScoreRollup.lowest_score),
+                 excluded.lowest_score),
+                else_=AssessmentScoreRollup.lowest_score
+            ),
+        }
+    )
+
+
+def option_rollup_upsert(dialect: str, attempt_ids: Sequence[int]):
+    """Add the answers of newly submitted attempts to the option rollup, counted in the same INSERT ... SELECT."""
+    counts = (
+        select(Attempt.assessment_id, AttemptAnswer.question_id, AttemptAnswer.selected_answer, func.count(AttemptAnswer.id))
+        .join(Attempt, AttemptAnswer.attempt_id == Attempt.id)
+        .where(AttemptAnswer.attempt_id.in_(attempt_ids))
+        .group_by(Attempt.assessment_id, AttemptAnswer.question_id, AttemptAnswer.selected_answer)
+    )
+    statement = _insert(dialect)(QuestionOptionRollup).from_select(
+        ["assessment_id", "question_id", "selected_answer", "selected_count"], counts
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[QuestionOptionRollup.assessment_id, QuestionOptionRollup.question_id, QuestionOptionRollup.selected_answer],
+        set_={"selected_count": QuestionOptionRollup.selected_count + statement.excluded.selected_count}
+    )
+
+
+def submission_rollup_statements(dialect: str, assessment_id: int, attempts: Sequence) -> list:
+    """
+    The statements that add freshly scored attempts (anything with .id and .score) to the
+    rollups. They need no results back, so the sync and async submit paths just execute them.
+    """
+    return [
+        score_rollup_upsert(dialect, assessment_id, [a.score for a in attempts]),
+        option_rollup_upsert(dialect, [a.id for a in attempts]),
+    ]
+
+
+def record_submissions(session: Session, assessment_id: int, attempts: List[Attempt]):
+    """Add freshly scored attempts to the rollups. Runs inside the caller's transaction; the caller commits."""
+    if not attempts:
+        return
+    for statement in submission_rollup_statements(session.get_bind().dialect.name, assessment_id, attempts):
+        session.exec(statement)
+
+
+def rebuild_rollups(session: Session, assessment_id: Optional[int] = None):
+    """Recompute the rollups from submitted attempts, for one assessment or all of them."""
+    clear_scores = delete(AssessmentScoreRollup)
+    clear_options = delete(QuestionOptionRollup)
+    scores = (
+        select(Attempt.assessment_id, func.count(Attempt.id), func.sum(Attempt.score), func.max(Attempt.score), func.min(Attempt.score))
+        .where(Attempt.submitted_at != None)
+        .group_by(Attempt.assessment_id)
+    )
+    options = (
+        select(Attempt.assessment_id, AttemptAnswer.question_id, AttemptAnswer.selected_answer, func.count(AttemptAnswer.id))
+        .join(Attempt, AttemptAnswer.attempt_id == Attempt.id)
+        .where(Attempt.submitted_at != None)
+        .group_by(Attempt.assessment_id, AttemptAnswer.question_id, AttemptAnswer.selected_answer)
+    )
+    if assessment_id is not None:
+        clear_scores = clear_scores.where(AssessmentScoreRollup.assessment_id == assessment_id)
+        clear_options = clear_options.where(QuestionOptionRollup.assessment_id == assessment_id)
+        scores = scores.where(Attempt.assessment_id == assessment_id)
+        options = options.where(Attempt.assessment_id == assessment_id)
+
+    session.exec(clear_scores)
+    session.exec(clear_options)
+    session.exec(AssessmentScoreRollup.__table__.insert().from_select(
+        ["assessment_id", "attempt_count", "score_sum", "highest_score", "lowest_score"], scores
+    ))
+    session.exec(QuestionOptionRollup.__table__.insert().from_select(
+        ["assessment_id", "question_id", "selected_answer", "selected_count"], options
+    ))
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from attempts and answers.")
+    parser.add_argument("--assessment-id", type=int, help="only this assessment (default: all)")
+    args = parser.parse_args()
+    with Session(get_engine()) as session:
+        rebuild_rollups(session, args.assessment_id)
+
+
+if __name__ == "__main__":
+    main()
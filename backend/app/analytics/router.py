@@ -1,33 +1,71 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
 
-from app.database import get_engine
-from app.models.user import User
+from app.database import get_session
+from app.auth.schemas import Principal
 from app.auth.dependencies import teacher_only
-from app.analytics.schemas import AssessmentAnalyticsSummary, QuestionAnalytics
-from app.analytics.service import get_assessment_summary_service, get_assessment_questions_analytics_service
+from app.responses import fast_json
+from app.analytics.schemas import AssessmentAnalyticsSummary, QuestionAnalytics, ItemAnalysisReport, Distribution
+from app.analytics.service import (
+    get_assessment_summary_service,
+    get_assessment_questions_analytics_service,
+    get_item_analysis_service,
+    get_score_distribution_service,
+    get_time_distribution_service
+)
 
 router = APIRouter(prefix="/teacher/analytics", tags=["analytics"])
 
-def get_session():
-    from sqlmodel import Session
-    from app.database import get_engine
-    with Session(get_engine()) as session:
-        yield session
-
 @router.get("/assessment/{assessment_id}/summary", response_model=AssessmentAnalyticsSummary)
 def get_assessment_summary(
     assessment_id: int,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
-    return get_assessment_summary_service(session, assessment_id, current_user.id)
+    return fast_json(get_assessment_summary_service(session, assessment_id, current_user.id))
 
 @router.get("/assessment/{assessment_id}/questions", response_model=List[QuestionAnalytics])
 def get_assessment_questions_analytics(
     assessment_id: int,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return fast_json(get_assessment_questions_analytics_service(session, assessment_id, current_user.id))
+
+@router.get("/assessment/{assessment_id}/item-analysis", response_model=ItemAnalysisReport)
+def get_item_analysis(
+    assessment_id: int,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return fast_json(get_item_analysis_service(session, assessment_id, current_user.id))
+
+@router.get("/assessment/{assessment_id}/score-distribution", response_model=Distribution)
+def get_score_distribution(
+    assessment_id: int,
+    bins: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return fast_json(get_score_distribution_service(session, assessment_id, current_user.id, bins))
+
+@router.get("/assessment/{assessment_id}/time-distribution", response_model=Distribution)
+def get_time_distribution(
+    assessment_id: int,
+    bins: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    # Time taken per answer, across all questions of the assessment
+    return fast_json(get_time_distribution_service(session, assessment_id, current_user.id, bins))
+
+@router.get("/assessment/{assessment_id}/questions/{question_id}/time-distribution", response_model=Distribution)
+def get_question_time_distribution(
+    assessment_id: int,
+    question_id: int,
+    bins: int = Query(10, ge=1, le=100),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
-    return get_assessment_questions_analytics_service(session, assessment_id, current_user.id)
+    return fast_json(get_time_distribution_service(session, assessment_id, current_user.id, bins, question_id))
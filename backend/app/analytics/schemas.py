@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlmodel import SQLModel
 
 class OptionAnalytics(SQLModel):
@@ -10,9 +10,30 @@ class QuestionAnalytics(SQLModel):
     question_id: int
     question_text: str
     options: List[OptionAnalytics]
+    difficulty: Optional[float] = None # share of submitted attempts answering correctly
+    discrimination: Optional[float] = None # upper 27% minus lower 27% difficulty
+    point_biserial: Optional[float] = None
+
+class ItemAnalysisReport(SQLModel):
+    assessment_id: int
+    total_attempts: int
+    kr20: Optional[float] = None
+    questions: List[QuestionAnalytics]
 
 class AssessmentAnalyticsSummary(SQLModel):
     total_attempts: int
     average_score: float
     highest_score: float
     lowest_score: float
+
+class HistogramBin(SQLModel):
+    lower: float
+    upper: float
+    count: int
+
+class Distribution(SQLModel):
+    count: int
+    min: Optional[float] = None
+    max: Optional[float] = None
+    percentiles: Dict[str, Optional[float]] # p10 ... p99, estimated from a quantile sketch
+    histogram: List[HistogramBin]
@@ -1,11 +1,14 @@
-from typing import List
-from sqlmodel import Session, select, func, col
+from typing import List, Optional
+from sqlmodel import Session, select
 from fastapi import HTTPException
 
-from app.models.assessment import Assessment, AssessmentQuestion
+from app.models.assessment import Assessment
 from app.models.attempt import Attempt, AttemptAnswer
-from app.models.question import Question
-from app.analytics.schemas import AssessmentAnalyticsSummary, QuestionAnalytics, OptionAnalytics
+from app.models.analytics import AssessmentScoreRollup, QuestionOptionRollup
+from app.assessments.snapshot import load_ordered_questions
+from app.analytics.item_analysis import analyze_rows, finite_or_none
+from app.analytics.sketches import distribution_index
+from app.analytics.schemas import AssessmentAnalyticsSummary, QuestionAnalytics, OptionAnalytics, ItemAnalysisReport, Distribution
 
 def get_assessment_summary_service(session: Session, assessment_id: int, user_id: int) -> AssessmentAnalyticsSummary:
     # 1. Verify access (must be creator of assessment)
@@ -13,81 +16,112 @@ def get_assessment_summary_service(session: Session, assessment_id: int, user_id
     if not assessment or assessment.created_by != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view analytics")
 
-    # 2. Aggregate Queries
-    # Filter only submitted attempts
-    query = select(
-        func.count(Attempt.id),
-        func.avg(Attempt.score),
-        func.max(Attempt.score),
-        func.min(Attempt.score)
-    ).where(
-        Attempt.assessment_id == assessment_id,
-        Attempt.submitted_at != None
-    )
-    
-    result = session.exec(query).first()
-    
-    count, avg, max_score, min_score = result
-    
+    # 2. Read the score rollup maintained at submit time
+    rollup = session.get(AssessmentScoreRollup, assessment_id)
+    if not rollup or not rollup.attempt_count:
+        return AssessmentAnalyticsSummary(total_attempts=0, average_score=0.0, highest_score=0.0, lowest_score=0.0)
+
     return AssessmentAnalyticsSummary(
-        total_attempts=count or 0,
-        average_score=float(avg) if avg else 0.0,
-        highest_score=float(max_score) if max_score else 0.0,
-        lowest_score=float(min_score) if min_score else 0.0
+        total_attempts=rollup.attempt_count,
+        average_score=rollup.score_sum / rollup.attempt_count,
+        highest_score=rollup.highest_score or 0.0,
+        lowest_score=rollup.lowest_score or 0.0
+    )
+
+def item_analysis_rows_query(assessment_id: int):
+    # Submitted attempts with their answers; attempts without answers still come back once, with NULLs
+    return (
+        select(Attempt.id, AttemptAnswer.question_id, AttemptAnswer.selected_answer, AttemptAnswer.is_correct)
+        .outerjoin(AttemptAnswer, AttemptAnswer.attempt_id == Attempt.id)
+        .where(
+            Attempt.assessment_id == assessment_id,
+            Attempt.submitted_at != None
+        )
     )
 
+def build_item_analysis(session: Session, assessment_id: int):
+    questions = load_ordered_questions(session, assessment_id)
+    rows = session.exec(item_analysis_rows_query(assessment_id)).all()
+    analysis = analyze_rows(rows, [q.id for q in questions], [q.options for q in questions])
+
+    results = []
+    for index, question in enumerate(questions):
+        results.append(QuestionAnalytics(
+            question_id=question.id,
+            question_text=question.question_text,
+            options=[
+                OptionAnalytics(
+                    option_text=opt,
+                    selected_count=int(analysis.option_counts[index, o_index]),
+                    is_correct=(opt == question.correct_answer)
+                )
+                for o_index, opt in enumerate(question.options)
+            ],
+            difficulty=finite_or_none(analysis.difficulty[index]),
+            discrimination=finite_or_none(analysis.discrimination[index]),
+            point_biserial=finite_or_none(analysis.point_biserial[index])
+        ))
+    return analysis, results
+
 def get_assessment_questions_analytics_service(session: Session, assessment_id: int, user_id: int) -> List[QuestionAnalytics]:
     # 1. Verify access
     assessment = session.get(Assessment, assessment_id)
     if not assessment or assessment.created_by != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view analytics")
 
-    # 2. Get all questions in order
-    links = session.exec(
-        select(AssessmentQuestion).where(AssessmentQuestion.assessment_id == assessment_id).order_by(AssessmentQuestion.question_order)
-    ).all()
-    
-    results = []
-    
-    for link in links:
-        question = session.get(Question, link.question_id)
-        if not question:
-            continue
-            
-        # Get answer distribution for this question within this assessment's attempts
-        # Note: We must join with Attempt to ensure we only count answers from *this* assessment's attempts
-        # (Though currently AttemptAnswer links to Attempt which links to Assessment, so filtering by Attempt's assessment_id is key)
-        
-        # Count selections per option
-        # We can do this in python for simplicity if dataset is small, or SQL.
-        # Let's do a SQL Group By for efficiency.
-        
-        answer_counts = session.exec(
-            select(AttemptAnswer.selected_answer, func.count(AttemptAnswer.id))
-            .join(Attempt)
-            .where(
-                Attempt.assessment_id == assessment_id,
-                AttemptAnswer.question_id == question.id,
-                Attempt.submitted_at != None # Only count submitted attempts
-            )
-            .group_by(AttemptAnswer.selected_answer)
+    # 2. Questions plus their pre-aggregated option counts; difficulty follows from the correct option's count
+    questions = load_ordered_questions(session, assessment_id)
+    rollup = session.get(AssessmentScoreRollup, assessment_id)
+    attempt_count = rollup.attempt_count if rollup else 0
+    option_counts = {
+        (q_id, answer): count
+        for q_id, answer, count in session.exec(
+            select(QuestionOptionRollup.question_id, QuestionOptionRollup.selected_answer, QuestionOptionRollup.selected_count)
+            .where(QuestionOptionRollup.assessment_id == assessment_id)
         ).all()
-        
-        # Convert to dict for lookup
-        counts_map = {ans: count for ans, count in answer_counts}
-        
-        option_analytics = []
-        for opt in question.options:
-            option_analytics.append(OptionAnalytics(
-                option_text=opt,
-                selected_count=counts_map.get(opt, 0),
-                is_correct=(opt == question.correct_answer)
-            ))
-            
+    }
+
+    results = []
+    for question in questions:
+        correct_count = option_counts.get((question.id, question.correct_answer), 0)
         results.append(QuestionAnalytics(
             question_id=question.id,
             question_text=question.question_text,
-            options=option_analytics
+            options=[
+                OptionAnalytics(
+                    option_text=opt,
+                    selected_count=option_counts.get((question.id, opt), 0),
+                    is_correct=(opt == question.correct_answer)
+                )
+                for opt in question.options
+            ],
+            difficulty=correct_count / attempt_count if attempt_count else None
         ))
-        
     return results
+
+def get_item_analysis_service(session: Session, assessment_id: int, user_id: int) -> ItemAnalysisReport:
+    assessment = session.get(Assessment, assessment_id)
+    if not assessment or assessment.created_by != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view analytics")
+
+    analysis, results = build_item_analysis(session, assessment_id)
+    return ItemAnalysisReport(
+        assessment_id=assessment_id,
+        total_attempts=analysis.n_attempts,
+        kr20=finite_or_none(analysis.kr20),
+        questions=results
+    )
+
+def get_score_distribution_service(session: Session, assessment_id: int, user_id: int, bins: int) -> Distribution:
+    assessment = session.get(Assessment, assessment_id)
+    if not assessment or assessment.created_by != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view analytics")
+
+    return Distribution(**distribution_index.score_distribution(session, assessment_id, bins))
+
+def get_time_distribution_service(session: Session, assessment_id: int, user_id: int, bins: int, question_id: Optional[int] = None) -> Distribution:
+    assessment = session.get(Assessment, assessment_id)
+    if not assessment or assessment.created_by != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view analytics")
+
+    return Distribution(**distribution_index.time_distribution(session, assessment_id, question_id, bins))
@@ -0,0 +1,277 @@
+"""
+Streaming quantile sketches for score and time-taken distributions.
+
+KLLSketch is a KLL (Karnin-Lang-Liberty) sketch: a stack of compactors where level h holds
+items of weight 2^h. When the sketch is full, the lowest full level is sorted and every other
+item (random offset) is promoted a level up. Memory stays around 3k items however many values
+are fed in, rank error is roughly 1/k, and two sketches merge by concatenating their levels.
+
+DistributionIndex keeps, per assessment, a score sketch and one time_taken sketch per question.
+They are fed when attempts are submitted (answers are final then; autosaves would overwrite
+earlier values a sketch cannot remove) and seeded from the DB the first time an assessment is
+read in this process. Reads walk the sketch only, so their cost does not grow with the cohort.
+Each read checks the score sketch's count against the rollup's attempt_count, and seeds again
+when another worker has recorded submissions this one never saw.
+"""
+import bisect
+import math
+import os
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlmodel import Session, select
+
+from app.models.analytics import AssessmentScoreRollup
+from app.models.attempt import Attempt, AttemptAnswer
+
+SKETCH_K = int(os.getenv("SKETCH_K", "200"))
+DISTRIBUTION_CACHE_SIZE = int(os.getenv("DISTRIBUTION_CACHE_SIZE", "256"))
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+
+class KLLSketch:
+    def __init__(self, k: int = SKETCH_K, c: float = 2 / 3):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.compactors: List[List[float]] = [[]]
+        self._rng = random.Random()
+        self._cdf: Optional[Tuple[List[float], List[int]]] = None
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * self.c ** depth)))
+
+    def _size(self) -> int:
+        return sum(len(c) for c in self.compactors)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float):
+        self.compactors[0].append(value)
+        self.n += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._cdf = None
+        if self._size() >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        if other.n == 0:
+            return
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._cdf = None
+        self._compress()
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for level in range(len(self.compactors)):
+                if len(self.compactors[level]) >= self._capacity(level):
+                    if level + 1 == len(self.compactors):
+                        self.compactors.append([])
+                    items = sorted(self.compactors[level])
+                    leftover = [items.pop()] if len(items) % 2 else []
+                    self.compactors[level + 1].extend(items[self._rng.randrange(2)::2])
+                    self.compactors[level] = leftover
+                    break
+
+    def _weighted_cdf(self) -> Tuple[List[float], List[int]]:
+        if self._cdf is None:
+            weighted = sorted(
+                (value, 1 << level) for level, items in enumerate(self.compactors) for value in items
+            )
+            values, cumulative, total = [], [], 0
+            for value, weight in weighted:
+                total += weight
+                values.append(value)
+                cumulative.append(total)
+            self._cdf = (values, cumulative)
+        return self._cdf
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        values, cumulative = self._weighted_cdf()
+        index = bisect.bisect_left(cumulative, q * cumulative[-1])
+        return values[min(index, len(values) - 1)]
+
+    def rank(self, value: float) -> int:
+        """Estimated number of fed values <= value."""
+        if self.n == 0:
+            return 0
+        values, cumulative = self._weighted_cdf()
+        index = bisect.bisect_right(values, value)
+        below = cumulative[index - 1] if index else 0
+        # Promoted weights are approximate; scale to the exact total
+        return round(below * self.n / cumulative[-1])
+
+
+def describe(sketch: KLLSketch, bins: int) -> dict:
+    """Count, extremes, standard percentiles and an equal-width histogram of a sketch."""
+    summary = {
+        "count": sketch.n,
+        "min": sketch.min,
+        "max": sketch.max,
+        "percentiles": {f"p{p}": sketch.quantile(p / 100) for p in PERCENTILES},
+        "histogram": [],
+    }
+    if sketch.n == 0:
+        return summary
+    low, high = sketch.min, sketch.max
+    width = (high - low) / bins if high > low else 1.0
+    previous = 0
+    for index in range(bins if high > low else 1):
+        lower = low + index * width
+        upper = high if index == bins - 1 or high == low else lower + width
+        below = sketch.n if upper >= high else sketch.rank(upper)
+        summary["histogram"].append({"lower": lower, "upper": upper, "count": max(0, below - previous)})
+        previous = max(previous, below)
+    return summary
+
+
+class _AssessmentDistributions:
+    def __init__(self):
+        # Submissions between prepare() and record_submission(); while any started before the seed
+        # finished, the seeded attempt ids are kept to tell whether the seed already counted them
+        self.in_flight = 0
+        self.reset()
+
+    def reset(self):
+        """Empties the sketches so the next read seeds them again; in-flight submissions are kept."""
+        self.loaded = False
+        self.scores = KLLSketch()
+        self.times: Dict[int, KLLSketch] = {}
+        # Submissions that committed while the DB seed was running, applied after it unless the seed had them
+        self.pending: List[Tuple[int, float, Sequence[Tuple[int, int]]]] = []
+        self.seeded_ids: Optional[set] = None
+
+    def add(self, score: float, times: Iterable[Tuple[int, int]]):
+        self.scores.update(score)
+        for question_id, time_taken in times:
+            sketch = self.times.get(question_id)
+            if sketch is None:
+                sketch = self.times[question_id] = KLLSketch()
+            sketch.update(time_taken)
+
+
+class DistributionIndex:
+    def __init__(self, max_size: int = DISTRIBUTION_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[int, _AssessmentDistributions]" = OrderedDict()
+
+    def _state(self, session: Session, assessment_id: int) -> _AssessmentDistributions:
+        rollup = session.get(AssessmentScoreRollup, assessment_id)
+        submitted = rollup.attempt_count if rollup is not None else 0
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                state = _AssessmentDistributions()
+                self._states[assessment_id] = state
+                while len(self._states) > self.max_size:
+                    self._states.popitem(last=False)
+            self._states.move_to_end(assessment_id)
+            if state.loaded:
+                if state.scores.n == submitted:
+                    return state
+                # Submissions served by another worker are missing here; a sketch cannot take them one by one
+                state.reset()
+
+        scores = session.exec(
+            select(Attempt.id, Attempt.score).where(
+                Attempt.assessment_id == assessment_id,
+                Attempt.submitted_at != None
+            )
+        ).all()
+        times = session.exec(
+            select(AttemptAnswer.attempt_id, AttemptAnswer.question_id, AttemptAnswer.time_taken)
+            .join(Attempt, AttemptAnswer.attempt_id == Attempt.id)
+            .where(
+                Attempt.assessment_id == assessment_id,
+                Attempt.submitted_at != None
+            )
+        ).all()
+
+        with self._lock:
+            if not state.loaded:
+                times_by_attempt: Dict[int, List[Tuple[int, int]]] = {}
+                for attempt_id, question_id, time_taken in times:
+                    times_by_attempt.setdefault(attempt_id, []).append((question_id, time_taken))
+                seeded = set()
+                for attempt_id, score in scores:
+                    seeded.add(attempt_id)
+                    state.add(score, times_by_attempt.get(attempt_id, ()))
+                for attempt_id, score, attempt_times in state.pending:
+                    if attempt_id not in seeded:
+                        state.add(score, attempt_times)
+                state.pending = []
+                state.seeded_ids = seeded if state.in_flight else None
+                state.loaded = True
+        return state
+
+    def score_distribution(self, session: Session, assessment_id: int, bins: int) -> dict:
+        state = self._state(session, assessment_id)
+        with self._lock:
+            return describe(state.scores, bins)
+
+    def time_distribution(self, session: Session, assessment_id: int, question_id: Optional[int], bins: int) -> dict:
+        """time_taken of one question, or of all the assessment's questions merged when question_id is None."""
+        state = self._state(session, assessment_id)
+        with self._lock:
+            if question_id is not None:
+                return describe(state.times.get(question_id) or KLLSketch(), bins)
+            merged = KLLSketch()
+            for sketch in state.times.values():
+                merged.merge(sketch)
+            return describe(merged, bins)
+
+    def prepare(self, assessment_id: int) -> Optional[_AssessmentDistributions]:
+        """
+        Called before an attempt's submission commits. Returns the state to pass to
+        record_submission(), or None when the assessment is not loaded; its first read then
+        seeds from the DB after the commit, so the attempt needs no recording.
+        """
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is not None:
+                state.in_flight += 1
+            return state
+
+    def record_submission(self, state: _AssessmentDistributions, attempt_id: int, score: float, times: Sequence[Tuple[int, int]]):
+        """Called after the submission committed, with the attempt's (question_id, time_taken) pairs."""
+        with self._lock:
+            state.in_flight -= 1
+            if not state.loaded:
+                state.pending.append((attempt_id, score, times))
+            elif state.seeded_ids is None or attempt_id not in state.seeded_ids:
+                state.add(score, times)
+            if state.loaded and not state.in_flight:
+                state.seeded_ids = None
+
+    def release(self, state: Optional[_AssessmentDistributions]):
+        """Called instead of record_submission() when the submission did not commit."""
+        if state is None:
+            return
+        with self._lock:
+            state.in_flight -= 1
+            if state.loaded and not state.in_flight:
+                state.seeded_ids = None
+
+
+distribution_index = DistributionIndex()
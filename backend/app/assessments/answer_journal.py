@@ -0,0 +1,309 @@
+"""
+Write-behind buffer for answer autosaves (ANSWER_WRITE_BEHIND=true).
+
+An autosave is acknowledged once it has been appended to a local journal and fsync'd; the row
+reaches attempt_answers later. Pending answers are coalesced in memory per (attempt, question),
+last write wins, so a student changing an answer ten times between flushes costs one row. A
+flusher thread writes whatever is pending every ANSWER_FLUSH_INTERVAL_SECONDS (sooner once
+ANSWER_FLUSH_BATCH_SIZE rows are waiting) as batched upserts, each in one transaction with the
+attempts' answer counters. Appends that arrive together share one fsync.
+
+The journal is a series of segment files in ANSWER_JOURNAL_DIR. A full flush starts a new
+segment and, once its rows are committed, deletes the older ones. At startup the segments left
+over are replayed and flushed before requests are served.
+
+Reads that must be exact flush their attempts first: submitting (so the score counts every
+answer), the attempt detail page and deadline auto-submission. Flushes lock the attempt rows
+and drop answers for attempts already submitted, so an autosave racing a submit cannot change
+a final score. The monitor's progress counts trail by up to one flush interval.
+
+Write-behind needs a single worker process. Each worker only sees its own pending answers, so
+a submit handled by another worker would score without them, and a shared directory would have
+one worker delete the other's live segment. start() therefore takes an exclusive lock on the
+directory and, on PostgreSQL, a session advisory lock held for the life of the process; a second
+worker fails at startup instead of losing acknowledged answers.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.database import get_engine
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ANSWER_WRITE_BEHIND = os.getenv("ANSWER_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+ANSWER_JOURNAL_DIR = os.getenv("ANSWER_JOURNAL_DIR", "answer-journal")
+ANSWER_FLUSH_INTERVAL_SECONDS = float(os.getenv("ANSWER_FLUSH_INTERVAL_SECONDS", "0.5"))
+ANSWER_FLUSH_BATCH_SIZE = int(os.getenv("ANSWER_FLUSH_BATCH_SIZE", "1000"))
+
+SEGMENT_SUFFIX = ".log"
+LOCK_FILE = "journal.lock"
+# Key of the advisory lock the write-behind process holds on PostgreSQL ("ansj")
+ADVISORY_LOCK_KEY = 0x616E736A
+
+# attempt_id, question_id, selected_answer, time_taken, is_correct
+AnswerRow = Tuple[int, int, str, int, bool]
+
+journal_fsync = registry.histogram(
+    "answer_journal_fsync_seconds", "Time spent in fsync by answer journal appends",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+
+
+def _fsync_directory(path: str):
+    # Makes a new segment's directory entry durable; not possible (nor needed) on Windows
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _lock_file(path: str) -> int:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            # A POSIX record lock belongs to this process; forked children (the hashing pool) do not hold it
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        raise RuntimeError(
+            f"{path} is locked by another process; ANSWER_WRITE_BEHIND needs a single worker"
+        )
+    return fd
+
+
+def _lock_database():
+    """Advisory lock on PostgreSQL, kept on a connection of its own until stop()."""
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        return None
+    connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    if not connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar():
+        connection.close()
+        raise RuntimeError("Another process already runs the answer journal; ANSWER_WRITE_BEHIND needs a single worker")
+    return connection
+
+
+class AnswerJournal:
+    def __init__(self):
+        # Lock order: _flush_lock, then _sync_lock, then _lock
+        self._lock = threading.Lock()        # appends, the pending map and the current segment
+        self._sync_lock = threading.Lock()   # one fsync at a time; appends made meanwhile ride on the next
+        self._flush_lock = threading.Lock()  # one database write at a time, so an older row never lands after a newer one
+        self._pending: Dict[int, Dict[int, AnswerRow]] = {}  # attempt_id -> question_id -> row
+        self._pending_rows = 0
+        self._directory: Optional[str] = None
+        self._lock_fd: Optional[int] = None
+        self._db_lock = None
+        self._segment = 0
+        self._fd: Optional[int] = None
+        self._segment_dirty = False
+        self._appended = 0
+        self._synced = 0
+        self._write: Optional[Callable[[Session, List[AnswerRow]], None]] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def active(self) -> bool:
+        return self._fd is not None
+
+    def __len__(self) -> int:
+        return self._pending_rows
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self._directory, f"{number:012d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(self._directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _open_segment(self, number: int):
+        self._fd = os.open(self._segment_path(number), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        _fsync_directory(self._directory)
+        self._segment = number
+        self._segment_dirty = False
+
+    def _add_pending(self, row: AnswerRow, replace: bool = True):
+        questions = self._pending.setdefault(row[0], {})
+        if row[1] not in questions:
+            self._pending_rows += 1
+        elif not replace:
+            return
+        questions[row[1]] = row
+
+    def start(self, directory: str, write: Callable[[Session, List[AnswerRow]], None]):
+        """Replays what an earlier run left in the journal, flushes it and starts the flusher thread."""
+        self._directory = directory
+        self._write = write
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = _lock_file(os.path.join(directory, LOCK_FILE))
+        try:
+            self._db_lock = _lock_database()
+        except Exception:
+            self._release_locks()
+            raise
+        segments = self._segments()
+        replayed = 0
+        for number in segments:
+            with open(self._segment_path(number), "rb") as f:
+                for line in f:
+                    try:
+                        row = tuple(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        # Only an append cut short by the crash can be torn, and it was never acknowledged
+                        continue
+                    self._add_pending(row)
+                    replayed += 1
+        self._open_segment(segments[-1] + 1 if segments else 1)
+        # So the flush below deletes the old segments even when they held nothing
+        self._segment_dirty = bool(segments)
+        if replayed:
+            logger.info("Replaying %d journaled answers (%d after coalescing)", replayed, self._pending_rows)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing replayed answers failed, the flusher will retry")
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="answer-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final flush of %d buffered answers failed, they stay in the journal", len(self))
+        with self._sync_lock, self._lock:
+            os.close(self._fd)
+            self._fd = None
+        self._release_locks()
+
+    def _release_locks(self):
+        if self._db_lock is not None:
+            self._db_lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            self._db_lock.close()
+            self._db_lock = None
+        if self._lock_fd is not None:
+            # Closing the descriptor releases the lock
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def record(self, rows: Iterable[AnswerRow]):
+        """Appends answers to the journal and returns once they are on disk."""
+        rows = list(rows)
+        data = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+        with self._lock:
+            os.write(self._fd, data)
+            self._segment_dirty = True
+            self._appended += 1
+            ticket = self._appended
+            for row in rows:
+                self._add_pending(row)
+            full = self._pending_rows >= ANSWER_FLUSH_BATCH_SIZE
+        self._sync(ticket)
+        if full:
+            self._wake.set()
+
+    def _sync(self, ticket: int):
+        with self._sync_lock:
+            if self._synced >= ticket:
+                return
+            with self._lock:
+                target, fd = self._appended, self._fd
+            started = time.perf_counter()
+            os.fsync(fd)
+            journal_fsync.observe(time.perf_counter() - started)
+            self._synced = target
+
+    def _restore(self, rows: List[AnswerRow]):
+        # Put back rows whose write failed, unless a newer answer to the same question arrived meanwhile
+        with self._lock:
+            for row in rows:
+                self._add_pending(row, replace=False)
+
+    def _write_rows(self, rows: List[AnswerRow]):
+        with Session(get_engine()) as session:
+            for start in range(0, len(rows), ANSWER_FLUSH_BATCH_SIZE):
+                try:
+                    self._write(session, rows[start:start + ANSWER_FLUSH_BATCH_SIZE])
+                except Exception:
+                    session.rollback()
+                    self._restore(rows[start:])
+                    raise
+
+    def flush(self):
+        """Writes everything pending, then deletes the segments that held nothing else."""
+        with self._flush_lock:
+            with self._sync_lock, self._lock:
+                if not self._pending and not self._segment_dirty:
+                    return
+                taken, self._pending, self._pending_rows = self._pending, {}, 0
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._synced = self._appended
+                self._open_segment(self._segment + 1)
+                current = self._segment
+            rows = [row for questions in taken.values() for row in questions.values()]
+            if rows:
+                self._write_rows(rows)
+            for number in self._segments():
+                if number < current:
+                    os.remove(self._segment_path(number))
+
+    def flush_attempts(self, attempt_ids: Iterable[int]) -> int:
+        """
+        Writes the pending answers of these attempts now and returns how many there were; the
+        journal keeps them until the next full flush.
+        """
+        if not self.active:
+            return 0
+        with self._flush_lock:
+            rows = []
+            with self._lock:
+                for attempt_id in attempt_ids:
+                    questions = self._pending.pop(attempt_id, None)
+                    if questions:
+                        self._pending_rows -= len(questions)
+                        rows.extend(questions.values())
+            if rows:
+                self._write_rows(rows)
+            return len(rows)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(ANSWER_FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing %d buffered answers failed, retrying", len(self))
+
+
+answer_journal = AnswerJournal()
+
+registry.gauge("answer_journal_pending_rows", "Autosaved answers waiting to be written to attempt_answers", lambda: len(answer_journal))
@@ -0,0 +1,104 @@
+"""
+Per-assessment answer-key index: question_id -> correct option.
+
+Grading and "does this question belong to the attempt's assessment" checks read this
+instead of loading the Question row on every answer. Keys are put here when an
+assessment goes LIVE and loaded with one query on a miss; ORM events on questions and
+assessment links drop stale entries.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.metrics import registry
+from app.models.assessment import AssessmentQuestion
+from app.models.question import Question
+
+ANSWER_KEY_CACHE_SIZE = int(os.getenv("ANSWER_KEY_CACHE_SIZE", "1024"))
+
+answer_key_hits = registry.counter("answer_key_hits_total", "Answer gradings served from the in-memory key index")
+answer_key_misses = registry.counter("answer_key_misses_total", "Answer key loads from the database")
+
+
+def answer_key_query(assessment_id: int):
+    return (
+        select(AssessmentQuestion.question_id, Question.correct_answer)
+        .join(Question, Question.id == AssessmentQuestion.question_id)
+        .where(AssessmentQuestion.assessment_id == assessment_id)
+    )
+
+
+class AnswerKeyIndex:
+    def __init__(self, max_size: int = ANSWER_KEY_CACHE_SIZE):
+        self.max_size = max_size
+        self._keys: "OrderedDict[int, Dict[int, str]]" = OrderedDict()
+        self._assessments_by_question: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, assessment_id: int) -> Optional[Dict[int, str]]:
+        with self._lock:
+            key = self._keys.get(assessment_id)
+            if key is not None:
+                self._keys.move_to_end(assessment_id)
+        if key is None:
+            answer_key_misses.inc()
+        else:
+            answer_key_hits.inc()
+        return key
+
+    def put(self, assessment_id: int, key: Dict[int, str]):
+        with self._lock:
+            self._drop(assessment_id)
+            self._keys[assessment_id] = dict(key)
+            for question_id in key:
+                self._assessments_by_question.setdefault(question_id, set()).add(assessment_id)
+            while len(self._keys) > self.max_size:
+                self._drop(next(iter(self._keys)))
+
+    def get(self, session: Session, assessment_id: int) -> Dict[int, str]:
+        key = self.lookup(assessment_id)
+        if key is None:
+            key = dict(session.exec(answer_key_query(assessment_id)).all())
+            self.put(assessment_id, key)
+        return key
+
+    def invalidate_assessment(self, assessment_id: int):
+        with self._lock:
+            self._drop(assessment_id)
+
+    def invalidate_question(self, question_id: int):
+        with self._lock:
+            for assessment_id in list(self._assessments_by_question.get(question_id, ())):
+                self._drop(assessment_id)
+
+    def _drop(self, assessment_id: int):
+        key = self._keys.pop(assessment_id, None)
+        if key is None:
+            return
+        for question_id in key:
+            assessments = self._assessments_by_question.get(question_id)
+            if assessments is not None:
+                assessments.discard(assessment_id)
+                if not assessments:
+                    del self._assessments_by_question[question_id]
+
+
+answer_key_index = AnswerKeyIndex()
+
+
+# Invalidation hooks: edited questions and changed question links drop the affected keys
+
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _invalidate_question(mapper, connection, target):
+    answer_key_index.invalidate_question(target.id)
+
+@event.listens_for(AssessmentQuestion, "after_insert")
+@event.listens_for(AssessmentQuestion, "after_update")
+@event.listens_for(AssessmentQuestion, "after_delete")
+def _invalidate_assessment(mapper, connection, target):
+    answer_key_index.invalidate_assessment(target.assessment_id)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import get_async_session
+from app.auth.schemas import Principal
+from app.auth.dependencies import student_only
+from app.assessments.schemas import AttemptRead, AnswerSubmit, AnswerBatchSubmit, AnswerBatchResult
+from app.assessments.async_service import (
+    start_attempt_service,
+    submit_answer_service,
+    submit_answers_batch_service,
+    submit_attempt_service
+)
+
+# Mounted ahead of the sync assessments router when USE_ASYNC_DB is on, so these paths win
+router = APIRouter(prefix="/assessments", tags=["assessments"])
+
+@router.post("/{assessment_id}/attempt", response_model=AttemptRead)
+async def start_attempt_async(
+    assessment_id: int,
+    current_user: Principal = Depends(student_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await start_attempt_service(session, assessment_id, current_user.id, current_user.name)
+
+@router.post("/attempts/{attempt_id}/answer")
+async def submit_answer_async(
+    attempt_id: int,
+    answer_in: AnswerSubmit,
+    current_user: Principal = Depends(student_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await submit_answer_service(
+        session, attempt_id, answer_in.question_id, answer_in.selected_answer, answer_in.time_taken, current_user.id
+    )
+
+@router.post("/attempts/{attempt_id}/answers", response_model=AnswerBatchResult)
+async def submit_answers_async(
+    attempt_id: int,
+    batch_in: AnswerBatchSubmit,
+    current_user: Principal = Depends(student_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await submit_answers_batch_service(session, attempt_id, batch_in.answers, current_user.id)
+
+@router.post("/attempts/{attempt_id}/submit", response_model=AttemptRead)
+async def submit_attempt_async(
+    attempt_id: int,
+    current_user: Principal = Depends(student_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await submit_attempt_service(session, attempt_id, current_user.id, current_user.name)
@@ -0,0 +1,227 @@
+"""
+Async versions of the hot attempt services, used by async_router when USE_ASYNC_DB is on.
+
+They follow the sync services in service.py step for step; only the session calls are awaited.
+Grading, the rollup statements and the in-memory hooks after a submission are the helpers the
+sync services use, so the two paths cannot drift apart.
+"""
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.models.assessment import Assessment, AssessmentStatus, AssessmentType
+from app.models.attempt import Attempt, AttemptAnswer
+from app.models.user import User
+from app.monitor.registry import monitor_registry
+from app.analytics.rollups import submission_rollup_statements
+from app.analytics.sketches import distribution_index
+from app.assessments.answer_key import answer_key_index, answer_key_query
+from app.assessments.deadlines import deadline_scheduler, attempt_deadline
+from app.assessments.answer_journal import answer_journal
+from app.assessments.schemas import AttemptRead, AnswerSubmit, AnswerResult, AnswerBatchResult
+from app.assessments.service import (
+    attempt_score, journal_answers, check_answer_batch, grade_answers, answered_query, answer_counter_deltas,
+    attempt_answers_upsert, apply_counter_deltas, announce_answers, submission_times_query, publish_submissions
+)
+
+async def _get_answer_key(session: AsyncSession, assessment_id: int) -> dict:
+    answer_key = answer_key_index.lookup(assessment_id)
+    if answer_key is None:
+        answer_key = dict((await session.exec(answer_key_query(assessment_id))).all())
+        answer_key_index.put(assessment_id, answer_key)
+    return answer_key
+
+async def _get_attempt_for_update(session: AsyncSession, attempt_id: int) -> Optional[Attempt]:
+    return (await session.exec(
+        select(Attempt).where(Attempt.id == attempt_id).with_for_update()
+    )).first()
+
+async def _student_display_name(session: AsyncSession, user_id: int, claimed: Optional[str]) -> str:
+    # See service.student_display_name
+    if claimed:
+        return claimed
+    user = await session.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user.name
+
+async def start_attempt_service(session: AsyncSession, assessment_id: int, user_id: int, student_name: Optional[str] = None) -> AttemptRead:
+    assessment = await session.get(Assessment, assessment_id)
+    if not assessment:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+
+    if assessment.status != AssessmentStatus.LIVE:
+        raise HTTPException(status_code=400, detail="Assessment is not live")
+
+    # Check time window for homework
+    if assessment.type == AssessmentType.HOMEWORK:
+        now = datetime.utcnow()
+        if assessment.start_time and now < assessment.start_time:
+            raise HTTPException(status_code=400, detail="Assessment not started yet")
+        if assessment.end_time and now > assessment.end_time:
+            raise HTTPException(status_code=400, detail="Assessment expired")
+
+    existing = (await session.exec(
+        select(Attempt).where(
+            Attempt.assessment_id == assessment_id,
+            Attempt.student_id == user_id
+        )
+    )).first()
+
+    if existing:
+        if existing.submitted_at:
+            raise HTTPException(status_code=403, detail="Assessment already submitted")
+
+        # Hydrate answers for resume
+        if answer_journal.active and await run_in_threadpool(answer_journal.flush_attempts, [existing.id]):
+            await session.refresh(existing)
+        answers_db = (await session.exec(
+            select(AttemptAnswer).where(AttemptAnswer.attempt_id == existing.id)
+        )).all()
+        existing_dict = existing.dict()
+        existing_dict["answers"] = [{"question_id": a.question_id, "selected_answer": a.selected_answer} for a in answers_db]
+        return AttemptRead(**existing_dict)
+
+    student_name = await _student_display_name(session, user_id, student_name)
+    attempt = Attempt(
+        assessment_id=assessment_id,
+        student_id=user_id,
+        started_at=datetime.utcnow(),
+        total_questions=len(await _get_answer_key(session, assessment_id))
+    )
+    session.add(attempt)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # A concurrent request created this student's attempt first; resume that one
+        await session.rollback()
+        return await start_attempt_service(session, assessment_id, user_id, student_name)
+    await session.refresh(attempt)
+    deadline_scheduler.schedule(attempt.id, attempt_deadline(
+        attempt.started_at, attempt.total_questions, assessment.time_per_question, assessment.end_time
+    ))
+
+    if monitor_registry.is_watched(assessment_id):
+        monitor_registry.attempt_started(
+            assessment_id, user_id, student_name, attempt.started_at, attempt.total_questions
+        )
+
+    return AttemptRead(**attempt.dict(), answers=[])
+
+async def _journal_answers(session: AsyncSession, attempt_id: int, latest: dict, user_id: int) -> List[AnswerResult]:
+    attempt = await session.get(Attempt, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+    answer_key = await _get_answer_key(session, attempt.assessment_id)
+    await session.rollback()
+    # The fsync blocks, so it waits in the threadpool rather than on the event loop
+    return await run_in_threadpool(journal_answers, attempt_id, answer_key, latest)
+
+async def submit_answer_service(session: AsyncSession, attempt_id: int, question_id: int, answer: str, time: int, user_id: int):
+    if answer_journal.active:
+        result, = await _journal_answers(
+            session, attempt_id, {question_id: AnswerSubmit(question_id=question_id, selected_answer=answer, time_taken=time)}, user_id
+        )
+        if result.status != "recorded":
+            raise HTTPException(status_code=404, detail=result.detail)
+        return {"status": "recorded", "is_correct": result.is_correct}
+
+    attempt = await _get_attempt_for_update(session, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+
+    # Grade against the in-memory answer key; also rejects questions from other assessments
+    answer_key = await _get_answer_key(session, attempt.assessment_id)
+    if question_id not in answer_key:
+        raise HTTPException(status_code=404, detail="Question not found in this assessment")
+
+    is_correct = (answer == answer_key[question_id])
+
+    existing_answer = (await session.exec(
+        select(AttemptAnswer).where(
+            AttemptAnswer.attempt_id == attempt_id,
+            AttemptAnswer.question_id == question_id
+        )
+    )).first()
+
+    if existing_answer:
+        correct_delta = int(is_correct) - int(existing_answer.is_correct)
+        existing_answer.selected_answer = answer
+        existing_answer.time_taken = time
+        existing_answer.is_correct = is_correct
+        session.add(existing_answer)
+        apply_counter_deltas(session, attempt, 0, correct_delta)
+    else:
+        session.add(AttemptAnswer(
+            attempt_id=attempt_id,
+            question_id=question_id,
+            selected_answer=answer,
+            time_taken=time,
+            is_correct=is_correct
+        ))
+        apply_counter_deltas(session, attempt, 1, int(is_correct))
+
+    assessment_id = attempt.assessment_id
+    await session.commit()
+    monitor_registry.answer_recorded(assessment_id, user_id, is_new=existing_answer is None)
+    return {"status": "recorded", "is_correct": is_correct}
+
+async def submit_answers_batch_service(session: AsyncSession, attempt_id: int, answers: List[AnswerSubmit], user_id: int) -> AnswerBatchResult:
+    latest = check_answer_batch(answers)
+    if answer_journal.active:
+        return AnswerBatchResult(results=await _journal_answers(session, attempt_id, latest, user_id))
+
+    attempt = await _get_attempt_for_update(session, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+
+    answer_key = await _get_answer_key(session, attempt.assessment_id)
+    already_answered = dict((await session.exec(answered_query(attempt_id, list(latest)))).all())
+    rows, results = grade_answers(attempt_id, answer_key, latest)
+    if rows:
+        await session.exec(attempt_answers_upsert(session.bind.dialect.name, rows))
+    apply_counter_deltas(session, attempt, *answer_counter_deltas(rows, already_answered))
+    assessment_id = attempt.assessment_id
+    await session.commit()
+
+    announce_answers(assessment_id, user_id, rows, already_answered)
+    return AnswerBatchResult(results=results)
+
+async def submit_attempt_service(session: AsyncSession, attempt_id: int, user_id: int, student_name: Optional[str] = None) -> Attempt:
+    if answer_journal.active:
+        await run_in_threadpool(answer_journal.flush_attempts, [attempt_id])
+    attempt = await _get_attempt_for_update(session, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=403, detail="Attempt already submitted")
+    student_name = await _student_display_name(session, user_id, student_name)
+
+    attempt.score = attempt_score(attempt)
+    attempt.submitted_at = datetime.utcnow()
+    session.add(attempt)
+    for statement in submission_rollup_statements(session.bind.dialect.name, attempt.assessment_id, [attempt]):
+        await session.exec(statement)
+    distributions = distribution_index.prepare(attempt.assessment_id)
+    try:
+        await session.commit()
+    except Exception:
+        distribution_index.release(distributions)
+        raise
+    await session.refresh(attempt)
+    deadline_scheduler.cancel(attempt.id)
+    times = submission_times_query([attempt], [distributions])
+    publish_submissions(
+        [attempt], [distributions], {user_id: student_name}, (await session.exec(times)).all() if times is not None else ()
+    )
+    return attempt
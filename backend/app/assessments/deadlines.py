@@ -0,0 +1,198 @@
+"""
+Server-side deadlines: attempts still open when their time runs out are auto-submitted.
+
+An attempt's deadline is started_at + time_per_question x total_questions (or the assessment's
+end_time, if that comes first), plus DEADLINE_GRACE_SECONDS for answers still in flight. Pending
+deadlines sit in a min-heap served by one background thread. When the earliest falls due, the
+thread waits DEADLINE_BATCH_WINDOW_SECONDS more, then hands every attempt due by then to the
+finalize callback (at most DEADLINE_BATCH_SIZE per call), which submits them in one UPDATE.
+
+If a batch fails, it is split in halves and each half is finalized again, down to single
+attempts, so one attempt that cannot be submitted does not hold back the others. An attempt that
+fails on its own is retried after DEADLINE_RETRY_SECONDS, doubling on each further failure up to
+DEADLINE_RETRY_MAX_SECONDS; after DEADLINE_MAX_RETRIES failures the scheduler gives up on it
+(counted in deadline_finalize_abandoned_total) until the heap is next rebuilt at startup.
+
+Submitting an attempt cancels its entry lazily: the heap keeps the tuple and the pop skips it.
+The heap is rebuilt from open attempts at startup, so deadlines that passed while the server
+was down are finalized right away. Every worker process runs its own scheduler (turn it off
+with DEADLINE_SCHEDULER=false); finalizing only touches attempts that are still open, so
+overlapping workers do not double-submit.
+"""
+import heapq
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.database import get_engine
+from app.metrics import registry
+from app.models.assessment import Assessment
+from app.models.attempt import Attempt
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_SCHEDULER = os.getenv("DEADLINE_SCHEDULER", "true").lower() in ("1", "true", "yes")
+DEADLINE_GRACE_SECONDS = float(os.getenv("DEADLINE_GRACE_SECONDS", "5"))
+DEADLINE_BATCH_WINDOW_SECONDS = float(os.getenv("DEADLINE_BATCH_WINDOW_SECONDS", "1"))
+DEADLINE_BATCH_SIZE = int(os.getenv("DEADLINE_BATCH_SIZE", "500"))
+DEADLINE_RETRY_SECONDS = float(os.getenv("DEADLINE_RETRY_SECONDS", "5"))
+DEADLINE_RETRY_MAX_SECONDS = float(os.getenv("DEADLINE_RETRY_MAX_SECONDS", "300"))
+DEADLINE_MAX_RETRIES = int(os.getenv("DEADLINE_MAX_RETRIES", "10"))
+
+finalize_failures = registry.counter(
+    "deadline_finalize_failures_total", "Expired attempts whose auto-submit failed on its own and was rescheduled or abandoned"
+)
+finalize_abandoned = registry.counter(
+    "deadline_finalize_abandoned_total", "Expired attempts the scheduler stopped retrying after DEADLINE_MAX_RETRIES failures"
+)
+
+
+def attempt_deadline(
+    started_at: datetime,
+    total_questions: int,
+    time_per_question: Optional[int],
+    end_time: Optional[datetime]
+) -> Optional[datetime]:
+    deadline = None
+    if time_per_question and total_questions:
+        deadline = started_at + timedelta(seconds=time_per_question * total_questions)
+    if end_time and (deadline is None or end_time < deadline):
+        deadline = end_time
+    if deadline is None:
+        return None
+    return deadline + timedelta(seconds=DEADLINE_GRACE_SECONDS)
+
+
+def open_attempts_query():
+    return select(
+        Attempt.id, Attempt.started_at, Attempt.total_questions, Assessment.time_per_question, Assessment.end_time
+    ).join(Assessment, Attempt.assessment_id == Assessment.id).where(Attempt.submitted_at == None)
+
+
+class DeadlineScheduler:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[datetime, int]] = []
+        # Live entries; a heap tuple whose deadline no longer matches here was cancelled or moved
+        self._deadlines: Dict[int, datetime] = {}
+        # Consecutive auto-submit failures of attempts that failed on their own
+        self._failures: Dict[int, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, attempt_id: int, deadline: Optional[datetime]):
+        if deadline is None:
+            return
+        with self._cond:
+            self._deadlines[attempt_id] = deadline
+            heapq.heappush(self._heap, (deadline, attempt_id))
+            if self._heap[0] == (deadline, attempt_id):
+                self._cond.notify()
+
+    def cancel(self, attempt_id: int):
+        with self._cond:
+            self._deadlines.pop(attempt_id, None)
+            self._failures.pop(attempt_id, None)
+
+    def rebuild(self, session: Session):
+        deadlines = {}
+        for attempt_id, started_at, total_questions, time_per_question, end_time in session.exec(open_attempts_query()):
+            deadline = attempt_deadline(started_at, total_questions, time_per_question, end_time)
+            if deadline is not None:
+                deadlines[attempt_id] = deadline
+        with self._cond:
+            # Keep anything scheduled by requests served while the rows were read
+            deadlines.update(self._deadlines)
+            self._deadlines = deadlines
+            self._heap = [(deadline, attempt_id) for attempt_id, deadline in deadlines.items()]
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def start(self, finalize: Callable[[Session, List[int]], int]):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, args=(finalize,), name="deadline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _next_due(self) -> Optional[List[int]]:
+        """Blocks until a batch is due and returns it, or None when stopping. Caller holds the lock."""
+        window = timedelta(seconds=DEADLINE_BATCH_WINDOW_SECONDS)
+        while not self._stopping:
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._cond.wait()
+                continue
+            now = datetime.utcnow()
+            # Hold the earliest deadline for the batch window so ones falling due together share an UPDATE
+            wait = (self._heap[0][0] + window - now).total_seconds()
+            if wait > 0:
+                self._cond.wait(wait)
+                continue
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < DEADLINE_BATCH_SIZE:
+                deadline, attempt_id = heapq.heappop(self._heap)
+                if self._deadlines.get(attempt_id) == deadline:
+                    del self._deadlines[attempt_id]
+                    due.append(attempt_id)
+            if due:
+                return due
+        return None
+
+    def _run(self, finalize: Callable[[Session, List[int]], int]):
+        while True:
+            with self._cond:
+                due = self._next_due()
+            if due is None:
+                return
+            self._finalize(finalize, due)
+
+    def _finalize(self, finalize: Callable[[Session, List[int]], int], attempt_ids: List[int]):
+        try:
+            with Session(get_engine()) as session:
+                finalize(session, attempt_ids)
+        except Exception:
+            if len(attempt_ids) > 1:
+                logger.warning("Auto-submitting %d expired attempts failed, splitting the batch", len(attempt_ids), exc_info=True)
+                middle = len(attempt_ids) // 2
+                self._finalize(finalize, attempt_ids[:middle])
+                self._finalize(finalize, attempt_ids[middle:])
+            else:
+                self._failed(attempt_ids[0])
+            return
+        with self._cond:
+            for attempt_id in attempt_ids:
+                self._failures.pop(attempt_id, None)
+
+    def _failed(self, attempt_id: int):
+        finalize_failures.inc()
+        with self._cond:
+            failures = self._failures.get(attempt_id, 0) + 1
+            if failures >= DEADLINE_MAX_RETRIES:
+                self._failures.pop(attempt_id, None)
+            else:
+                self._failures[attempt_id] = failures
+        if failures >= DEADLINE_MAX_RETRIES:
+            finalize_abandoned.inc()
+            logger.exception("Auto-submitting attempt %d failed %d times, giving up", attempt_id, failures)
+            return
+        delay = min(DEADLINE_RETRY_SECONDS * 2 ** (failures - 1), DEADLINE_RETRY_MAX_SECONDS)
+        logger.exception("Auto-submitting attempt %d failed, retrying in %.0fs", attempt_id, delay)
+        self.schedule(attempt_id, datetime.utcnow() + timedelta(seconds=delay))
+
+
+deadline_scheduler = DeadlineScheduler()
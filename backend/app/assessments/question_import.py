@@ -0,0 +1,170 @@
+"""
+Parsing and validation for bulk question imports.
+
+The upload is read from its spooled file a chunk or a line at a time: CSV through csv.DictReader,
+NDJSON line by line, and a JSON array element by element with JSONDecoder.raw_decode, so a
+large bank is never held as one string. Each record is validated on its own; a bad record
+becomes a per-row error and the rest of the file still imports.
+
+CSV columns: question_text, correct_option, and either `options` ("|"-separated) or one
+column per option (option_1, option_2, ...); question_order, topic and difficulty are optional.
+JSON and NDJSON records use the same field names, with `options` as a list.
+"""
+import csv
+import json
+import os
+from enum import Enum
+from typing import IO, Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+
+QUESTION_IMPORT_BATCH_SIZE = int(os.getenv("QUESTION_IMPORT_BATCH_SIZE", "500"))
+QUESTION_IMPORT_MAX_ROWS = int(os.getenv("QUESTION_IMPORT_MAX_ROWS", "10000"))
+
+READ_CHUNK = 64 * 1024
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/json": ImportFormat.JSON,
+    "application/x-ndjson": ImportFormat.NDJSON,
+}
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> ImportFormat:
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("csv", "json", "ndjson", "jsonl"):
+        return ImportFormat.NDJSON if extension == "jsonl" else ImportFormat(extension)
+    if content_type in CONTENT_TYPES:
+        return CONTENT_TYPES[content_type]
+    raise HTTPException(status_code=400, detail="Cannot tell the file format, pass ?format=csv|json|ndjson")
+
+
+def _csv_records(text: IO[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(text)
+    columns = reader.fieldnames or []
+    option_columns = [c for c in columns if c.startswith("option_")]
+    try:
+        for row, record in enumerate(reader, start=1):
+            if "options" in record and record["options"] is not None:
+                options = [o.strip() for o in record["options"].split("|")]
+            else:
+                options = [record[c].strip() for c in option_columns if record.get(c)]
+            order = (record.get("question_order") or "").strip()
+            yield row, {
+                "question_text": record.get("question_text"),
+                "options": options,
+                "correct_option": (record.get("correct_option") or "").strip(),
+                "question_order": int(order) if order.isdigit() else (order or None),
+                "topic": record.get("topic") or None,
+                "difficulty": record.get("difficulty") or None,
+            }
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Malformed CSV at line {reader.line_num}: {e}")
+
+
+def _ndjson_records(text: IO[str]) -> Iterator[Tuple[int, object]]:
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            # Lines are independent; a broken one is that row's error
+            yield row, None
+
+
+def _json_array_records(text: IO[str]) -> Iterator[Tuple[int, object]]:
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    expecting = "["  # then "value", "," (or "]"), and finally "end"
+    row = 0
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                break
+            chunk = text.read(READ_CHUNK)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        char = buffer[pos]
+        if expecting == "[":
+            if char != "[":
+                raise HTTPException(status_code=400, detail="Expected a JSON array of questions")
+            pos += 1
+            expecting = "value"
+        elif (expecting == "," and char in ",]") or (expecting == "value" and char == "]" and row == 0):
+            pos += 1
+            expecting = "value" if char == "," else "end"
+        elif expecting == "value":
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise HTTPException(status_code=400, detail=f"Malformed JSON after record {row}")
+                # The element continues in the next chunk
+                chunk = text.read(READ_CHUNK)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            row += 1
+            pos = end
+            expecting = ","
+            yield row, value
+        else:
+            raise HTTPException(status_code=400, detail=f"Malformed JSON after record {row}")
+    if expecting != "end":
+        raise HTTPException(status_code=400, detail=f"Malformed JSON after record {row}")
+
+
+def iter_records(text: IO[str], fmt: ImportFormat) -> Iterator[Tuple[int, object]]:
+    """(row number, raw record) pairs; rows are 1-based and the CSV header is not counted."""
+    if fmt == ImportFormat.CSV:
+        return _csv_records(text)
+    if fmt == ImportFormat.NDJSON:
+        return _ndjson_records(text)
+    return _json_array_records(text)
+
+
+def validate_record(record) -> Tuple[Optional[dict], Optional[str]]:
+    """Question row values for a raw record, or the reason it is rejected."""
+    if not isinstance(record, dict):
+        return None, "Expected a question object"
+    text = record.get("question_text")
+    if not isinstance(text, str) or not text.strip():
+        return None, "question_text is required"
+    options = record.get("options")
+    if not isinstance(options, list) or not all(isinstance(o, str) and o for o in options):
+        return None, "options must be a list of non-empty strings"
+    if len(options) < 2:
+        return None, "At least two options are required"
+    if len(set(options)) != len(options):
+        return None, "Options must be distinct"
+    correct = record.get("correct_option")
+    if correct not in options:
+        return None, "correct_option must be one of the options"
+    order = record.get("question_order")
+    if order is not None and (isinstance(order, bool) or not isinstance(order, int) or order < 1):
+        return None, "question_order must be a positive integer"
+    for field in ("topic", "difficulty"):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return None, f"{field} must be a string"
+    return {
+        "question_text": text.strip(),
+        "options": options,
+        "correct_answer": correct,
+        "question_order": order,
+        "topic": record.get("topic") or "General",
+        "difficulty": record.get("difficulty") or "Medium",
+    }, None
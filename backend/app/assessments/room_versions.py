@@ -0,0 +1,93 @@
+"""
+Per-room versions behind the ETag of the room assessment list.
+
+A room's version is a column on rooms, bumped in the same transaction as any change that
+inserted, updated or deleted one of its assessments, changed a membership, or submitted an
+attempt on one of its assessments. The ETag combines the version with the requesting user
+(students see their own submission flags). Checking a tag costs a primary key read, and every
+worker sees the same version.
+
+ORM events collect the rooms a flush touched; the bump runs once the flush has finished, so
+the room row stays locked only from there to the commit. Bulk UPDATE/DELETE statements bypass
+these events and should call bump_room_versions() themselves before committing.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.models.assessment import Assessment
+from app.models.attempt import Attempt
+from app.models.class_room import Room, RoomMember
+
+_PENDING_KEY = "room_versions_pending"
+
+
+def room_version(session, room_id: int) -> int:
+    return session.scalar(select(Room.version).where(Room.id == room_id)) or 0
+
+
+def room_etag(room_id: int, version: int, user_id: int) -> str:
+    return f'W/"{room_id}.{version}.{user_id}"'
+
+
+def bump_room_versions(session, room_ids: Iterable[Optional[int]]):
+    room_ids = sorted({room_id for room_id in room_ids if room_id is not None})
+    if room_ids:
+        # In id order, so transactions bumping several rooms cannot deadlock on them
+        session.execute(
+            update(Room).where(Room.id.in_(room_ids)).values(version=Room.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison: a W/ prefix on either side is ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _mark(target, room_id: Optional[int]):
+    session = object_session(target)
+    if session is not None and room_id is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(room_id)
+
+@event.listens_for(Assessment, "after_insert")
+@event.listens_for(Assessment, "after_update")
+@event.listens_for(Assessment, "after_delete")
+def _assessment_changed(mapper, connection, target):
+    _mark(target, target.room_id)
+
+@event.listens_for(RoomMember, "after_insert")
+@event.listens_for(RoomMember, "after_update")
+@event.listens_for(RoomMember, "after_delete")
+def _membership_changed(mapper, connection, target):
+    _mark(target, target.room_id)
+
+def _mark_attempt(connection, target):
+    room_id = connection.execute(
+        select(Assessment.room_id).where(Assessment.id == target.assessment_id)
+    ).scalar()
+    _mark(target, room_id)
+
+@event.listens_for(Attempt, "after_update")
+def _attempt_updated(mapper, connection, target):
+    # Answer autosaves update the counters on every request; only the submission flips is_submitted
+    if inspect(target).attrs.submitted_at.history.has_changes():
+        _mark_attempt(connection, target)
+
+@event.listens_for(Attempt, "after_delete")
+def _attempt_deleted(mapper, connection, target):
+    _mark_attempt(connection, target)
+
+@event.listens_for(Session, "after_flush_postexec")
+def _bump_flushed(session, flush_context):
+    room_ids = session.info.pop(_PENDING_KEY, None)
+    if room_ids:
+        bump_room_versions(session, room_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,11 +1,12 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import List, Optional
+import io
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Response, UploadFile, status
 from sqlmodel import Session
 
-from app.database import get_engine
-from app.models.user import User
+from app.database import get_session
+from app.auth.schemas import Principal
 from app.auth.dependencies import get_current_user, teacher_only, student_only
-from app.assessments.schemas import AssessmentCreate, AssessmentRead, QuestionAdd, AttemptStart, AttemptRead, AnswerSubmit, AttemptDetail, QuestionCreate, AssessmentDetail, AssessmentWithAttempt
+from app.assessments.schemas import AssessmentCreate, AssessmentRead, QuestionAdd, AttemptStart, AttemptRead, AnswerSubmit, AnswerBatchSubmit, AnswerBatchResult, AttemptDetail, QuestionCreate, AssessmentDetail, AssessmentWithAttempt, QuestionImportResult
 from app.assessments.service import (
     create_assessment_service,
     add_question_service,
@@ -13,23 +14,25 @@ from app.assessments.service import (
     get_room_assessments_service,
     start_attempt_service,
     submit_answer_service,
+    submit_answers_batch_service,
     submit_attempt_service,
-    get_assessment_detail_service,
-    create_question_service
+    get_assessment_detail_payload_service,
+    get_attempt_detail_service,
+    create_question_service,
+    import_questions_service
 )
+from app.assessments.question_import import ImportFormat, detect_format, iter_records
+from app.assessments.room_versions import room_version, room_etag, etag_matches
+from app.responses import fast_json
 
 router = APIRouter(prefix="/assessments", tags=["assessments"])
 
-def get_session():
-    with Session(get_engine()) as session:
-        yield session
-
 # Teacher Endpoints
 
 @router.post("", response_model=AssessmentRead, status_code=status.HTTP_201_CREATED)
 def create_assessment(
     assessment_in: AssessmentCreate,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
     return create_assessment_service(session, assessment_in, current_user.id)
@@ -38,7 +41,7 @@ def create_assessment(
 def add_question(
     assessment_id: int,
     link_in: QuestionAdd,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
     add_question_service(
@@ -49,25 +52,45 @@ def add_question(
 @router.get("/{assessment_id}", response_model=AssessmentDetail)
 def get_assessment_details(
     assessment_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    return get_assessment_detail_service(session, assessment_id, current_user.id)
+    payload = get_assessment_detail_payload_service(session, assessment_id, current_user.id)
+    return Response(content=payload, media_type="application/json")
 
 @router.post("/{assessment_id}/questions/create", status_code=status.HTTP_201_CREATED)
 def create_and_add_question(
     assessment_id: int,
     question_in: QuestionCreate,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
     create_question_service(session, assessment_id, question_in, current_user.id)
     return {"status": "created"}
 
+@router.post("/{assessment_id}/questions/import", response_model=QuestionImportResult)
+def import_questions(
+    assessment_id: int,
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = None,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    """Bulk-create questions from a CSV, JSON array or NDJSON file; rejected rows are listed in `errors`."""
+    fmt = format or detect_format(file.filename, file.content_type)
+    # The upload is spooled to disk by Starlette; decode it lazily rather than reading it whole
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_questions_service(session, assessment_id, iter_records(text, fmt), current_user.id)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="The file must be UTF-8 encoded")
+    finally:
+        text.detach()
+
 @router.patch("/{assessment_id}/start", response_model=AssessmentRead)
 def start_assessment(
     assessment_id: int,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
     return start_assessment_service(session, assessment_id, current_user.id)
@@ -77,44 +100,60 @@ def start_assessment(
 @router.get("/room/{room_id}", response_model=List[AssessmentWithAttempt])
 def get_room_assessments(
     room_id: int,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
-    from app.assessments.schemas import AssessmentWithAttempt
-    return get_room_assessments_service(session, room_id, current_user.id)
+    # Tagged before the query: a change committed meanwhile bumps the version, so the tag can only be older than the rows
+    etag = room_etag(room_id, room_version(session, room_id), current_user.id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return fast_json(get_room_assessments_service(session, room_id, current_user.id), headers)
 
 @router.post("/{assessment_id}/attempt", response_model=AttemptRead)
 def start_attempt(
     assessment_id: int,
-    current_user: User = Depends(student_only),
+    current_user: Principal = Depends(student_only),
     session: Session = Depends(get_session)
 ):
-    return start_attempt_service(session, assessment_id, current_user.id)
+    return start_attempt_service(session, assessment_id, current_user.id, current_user.name)
 
 @router.post("/attempts/{attempt_id}/answer")
 def submit_answer(
     attempt_id: int,
     answer_in: AnswerSubmit,
-    current_user: User = Depends(student_only),
+    current_user: Principal = Depends(student_only),
     session: Session = Depends(get_session)
 ):
     return submit_answer_service(
         session, attempt_id, answer_in.question_id, answer_in.selected_answer, answer_in.time_taken, current_user.id
     )
 
+@router.post("/attempts/{attempt_id}/answers", response_model=AnswerBatchResult)
+def submit_answers(
+    attempt_id: int,
+    batch_in: AnswerBatchSubmit,
+    current_user: Principal = Depends(student_only),
+    session: Session = Depends(get_session)
+):
+    return submit_answers_batch_service(session, attempt_id, batch_in.answers, current_user.id)
+
 @router.post("/attempts/{attempt_id}/submit", response_model=AttemptRead)
 def submit_attempt(
     attempt_id: int,
-    current_user: User = Depends(student_only),
+    current_user: Principal = Depends(student_only),
     session: Session = Depends(get_session)
 ):
-    return submit_attempt_service(session, attempt_id, current_user.id)
+    return submit_attempt_service(session, attempt_id, current_user.id, current_user.name)
 
 @router.get("/attempts/{attempt_id}", response_model=AttemptDetail)
 def get_attempt(
     attempt_id: int,
-    current_user: User = Depends(student_only),
+    current_user: Principal = Depends(student_only),
     session: Session = Depends(get_session)
 ):
-    from app.assessments.service import get_attempt_detail_service
-    return get_attempt_detail_service(session, attempt_id, current_user.id)
+    payload = get_attempt_detail_service(session, attempt_id, current_user.id)
+    return Response(content=payload, media_type="application/json")
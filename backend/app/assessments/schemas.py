@@ -34,6 +34,18 @@ class QuestionCreate(SQLModel):
     options: List[str]
     correct_option: str
     question_order: int = 1
+    topic: str = "General"
+    difficulty: str = "Medium"
+
+class QuestionImportError(SQLModel):
+    row: int # 1-based record number in the upload, CSV header not counted
+    detail: str
+
+class QuestionImportResult(SQLModel):
+    imported: int
+    rejected: int
+    question_ids: List[int]
+    errors: List[QuestionImportError]
 
 class AttemptStart(SQLModel):
     assessment_id: int
@@ -49,6 +61,8 @@ class AttemptRead(SQLModel):
     score: Optional[float] = None
     started_at: datetime
     submitted_at: Optional[datetime] = None
+    answered_count: int = 0
+    total_questions: int = 0
     answers: List[AnswerRead] = []
 
 class AnswerSubmit(SQLModel):
@@ -56,6 +70,18 @@ class AnswerSubmit(SQLModel):
     selected_answer: str
     time_taken: int
 
+class AnswerBatchSubmit(SQLModel):
+    answers: List[AnswerSubmit]
+
+class AnswerResult(SQLModel):
+    question_id: int
+    status: str # "recorded" or "rejected"
+    is_correct: Optional[bool] = None
+    detail: Optional[str] = None
+
+class AnswerBatchResult(SQLModel):
+    results: List[AnswerResult]
+
 class QuestionClientRead(SQLModel):
     id: int
     question_text: str
@@ -69,7 +95,7 @@ class QuestionRead(SQLModel):
     id: int
     question_text: str
     options: List[str]
-    correct_answer: str
+    correct_answer: Optional[str] = None # only sent to the assessment's owner
 
 class AssessmentDetail(AssessmentRead):
     questions: List[QuestionRead] = []
@@ -1,13 +1,34 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
-from sqlmodel import Session, select, and_
+from sqlalchemy import Float, bindparam, cast, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, and_, func
 
 from app.models.assessment import Assessment, AssessmentQuestion, AssessmentStatus, AssessmentType
 from app.models.attempt import Attempt, AttemptAnswer
 from app.models.question import Question
 from app.models.class_room import Room, RoomMember
-from app.assessments.schemas import AssessmentCreate, AssessmentRead, QuestionCreate, AssessmentDetail, QuestionRead, AssessmentWithAttempt
+from app.models.user import User
+from app.auth.cache import user_cache
+from app.monitor.registry import monitor_registry
+from app.reports.leaderboard import leaderboard_index
+from app.analytics.rollups import record_submissions
+from app.analytics.sketches import distribution_index
+from app.assessments.answer_key import answer_key_index
+from app.assessments.answer_journal import answer_journal, AnswerRow
+from app.assessments.deadlines import deadline_scheduler, attempt_deadline
+from app.assessments.room_versions import bump_room_versions
+from app.assessments.snapshot import (
+    snapshot_cache, get_snapshot, compile_snapshot, load_ordered_questions, encode_json
+)
+from app.assessments.question_import import (
+    QUESTION_IMPORT_BATCH_SIZE, QUESTION_IMPORT_MAX_ROWS, validate_record
+)
+from app.assessments.schemas import AssessmentCreate, AssessmentRead, QuestionCreate, AssessmentDetail, QuestionRead, QuestionClientRead, AssessmentWithAttempt, AttemptRead, AnswerSubmit, AnswerResult, AnswerBatchResult, QuestionImportError, QuestionImportResult
+
+MAX_ANSWER_BATCH = 200
 
 def create_assessment_service(session: Session, assessment_in: AssessmentCreate, user_id: int) -> Assessment:
     # Verify room ownership
@@ -45,15 +66,20 @@ def add_question_service(session: Session, assessment_id: int, question_id: int,
         question_id=question_id,
         question_order=order
     )
+    session.add(link)
     session.commit()
     return link
 
-def create_question_service(session: Session, assessment_id: int, question_in: QuestionCreate, user_id: int):
+def get_editable_assessment(session: Session, assessment_id: int, user_id: int) -> Assessment:
     assessment = session.get(Assessment, assessment_id)
     if not assessment or assessment.created_by != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     if assessment.status != AssessmentStatus.DRAFT:
          raise HTTPException(status_code=400, detail="Cannot modify live/closed assessment")
+    return assessment
+
+def create_question_service(session: Session, assessment_id: int, question_in: QuestionCreate, user_id: int):
+    get_editable_assessment(session, assessment_id, user_id)
     
     # Create Question
     # Note: Using JSON for options as per Question model
@@ -61,13 +87,14 @@ def create_question_service(session: Session, assessment_id: int, question_in: Q
         question_text=question_in.question_text,
         options=question_in.options,
         correct_answer=question_in.correct_option,
+        topic=question_in.topic,
+        difficulty=question_in.difficulty,
         created_by=user_id
     )
     session.add(question)
-    session.commit()
-    session.refresh(question)
+    session.flush()
     
-    # Link
+    # Link, committed together with the question
     link = AssessmentQuestion(
         assessment_id=assessment_id,
         question_id=question.id,
@@ -77,45 +104,133 @@ def create_question_service(session: Session, assessment_id: int, question_in: Q
     session.commit()
     return question
 
+def _insert_question_batch(session: Session, assessment_id: int, user_id: int, batch: List[dict]) -> List[int]:
+    # One batched INSERT ... RETURNING for the questions, then one for their links
+    now = datetime.utcnow()
+    question_ids = session.execute(
+        insert(Question).returning(Question.id, sort_by_parameter_order=True),
+        [
+            {
+                "question_text": values["question_text"],
+                "options": values["options"],
+                "correct_answer": values["correct_answer"],
+                "topic": values["topic"],
+                "difficulty": values["difficulty"],
+                "created_by": user_id,
+                "created_at": now,
+            }
+            for values in batch
+        ]
+    ).scalars().all()
+    session.execute(insert(AssessmentQuestion).values([
+        {"assessment_id": assessment_id, "question_id": question_id, "question_order": values["question_order"]}
+        for question_id, values in zip(question_ids, batch)
+    ]))
+    return question_ids
+
+def import_questions_service(session: Session, assessment_id: int, records, user_id: int) -> QuestionImportResult:
+    """
+    Create and link questions from parsed (row, record) pairs. Valid rows are inserted in batches of
+    QUESTION_IMPORT_BATCH_SIZE and committed once at the end; invalid rows are reported, not inserted.
+    """
+    get_editable_assessment(session, assessment_id, user_id)
+
+    # Rows without a question_order are appended after the assessment's current last question
+    next_order = session.exec(
+        select(func.coalesce(func.max(AssessmentQuestion.question_order), 0)).where(
+            AssessmentQuestion.assessment_id == assessment_id
+        )
+    ).one() + 1
+
+    question_ids = []
+    errors = []
+    batch = []
+    for row, record in records:
+        if row > QUESTION_IMPORT_MAX_ROWS:
+            session.rollback()
+            raise HTTPException(status_code=413, detail=f"At most {QUESTION_IMPORT_MAX_ROWS} questions per import")
+        values, error = validate_record(record)
+        if error:
+            errors.append(QuestionImportError(row=row, detail=error))
+            continue
+        if values["question_order"] is None:
+            values["question_order"] = next_order
+        next_order = max(next_order, values["question_order"]) + 1
+        batch.append(values)
+        if len(batch) >= QUESTION_IMPORT_BATCH_SIZE:
+            question_ids.extend(_insert_question_batch(session, assessment_id, user_id, batch))
+            batch = []
+    if batch:
+        question_ids.extend(_insert_question_batch(session, assessment_id, user_id, batch))
+    session.commit()
+
+    # Core INSERTs skip the mapper events that keep these in step
+    answer_key_index.invalidate_assessment(assessment_id)
+    snapshot_cache.invalidate(assessment_id)
+
+    return QuestionImportResult(
+        imported=len(question_ids),
+        rejected=len(errors),
+        question_ids=question_ids,
+        errors=errors
+    )
+
+def _is_room_member(session: Session, room_id: int, user_id: int) -> bool:
+    member = session.exec(
+        select(RoomMember).where(
+            RoomMember.room_id == room_id,
+            RoomMember.student_id == user_id,
+            RoomMember.left_at == None
+        )
+    ).first()
+    return member is not None
+
 def get_assessment_detail_service(session: Session, assessment_id: int, user_id: int) -> AssessmentDetail:
     assessment = session.get(Assessment, assessment_id)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     # Check access (Teacher owns it, or Student in room?)
-    if assessment.created_by != user_id:
-         # Check membership
-        member = session.exec(
-            select(RoomMember).where(
-                RoomMember.room_id == assessment.room_id,
-                RoomMember.student_id == user_id,
-                RoomMember.left_at == None
-            )
-        ).first()
-        if not member:
-             raise HTTPException(status_code=403, detail="Not authorized")
-
-    # Get questions
-    links = session.exec(
-        select(AssessmentQuestion).where(AssessmentQuestion.assessment_id == assessment_id).order_by(AssessmentQuestion.question_order)
-    ).all()
-    
-    questions = []
-    for link in links:
-        q = session.get(Question, link.question_id)
-        if q:
-            questions.append(QuestionRead(
-                id=q.id,
-                question_text=q.question_text,
-                options=q.options,
-                correct_answer=q.correct_answer
-            ))
+    is_owner = assessment.created_by == user_id
+    if not is_owner and not _is_room_member(session, assessment.room_id, user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    questions = [
+        QuestionRead(
+            id=q.id,
+            question_text=q.question_text,
+            options=q.options,
+            correct_answer=q.correct_answer if is_owner else None
+        )
+        for q in load_ordered_questions(session, assessment_id)
+    ]
             
     return AssessmentDetail(
         **assessment.dict(),
         questions=questions
     )
 
+def get_assessment_detail_payload_service(session: Session, assessment_id: int, user_id: int) -> bytes:
+    """
+    Serialized AssessmentDetail. Once the assessment is LIVE this comes straight from its
+    snapshot: no question queries and no encoding, only the room membership check for students.
+    """
+    snapshot = snapshot_cache.get(assessment_id)
+    if snapshot is None:
+        assessment = session.get(Assessment, assessment_id)
+        if not assessment:
+            raise HTTPException(status_code=404, detail="Assessment not found")
+        snapshot = get_snapshot(session, assessment)
+        if snapshot is None:
+            # Still a DRAFT, the question set may change
+            return encode_json(get_assessment_detail_service(session, assessment_id, user_id))
+
+    if snapshot.created_by == user_id:
+        return snapshot.teacher_payload
+    if not _is_room_member(session, snapshot.room_id, user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return snapshot.student_payload
+
 def start_assessment_service(session: Session, assessment_id: int, user_id: int):
     assessment = session.get(Assessment, assessment_id)
     if not assessment or assessment.created_by != user_id:
@@ -129,58 +244,75 @@ def start_assessment_service(session: Session, assessment_id: int, user_id: int)
     session.add(assessment)
     session.commit()
     session.refresh(assessment)
+
+    # The question set is frozen from here on, compile the snapshot served to students
+    snapshot = compile_snapshot(session, assessment)
+    snapshot_cache.put(snapshot)
+    answer_key_index.put(assessment.id, snapshot.answer_key)
     return assessment
 
-def get_room_assessments_service(session: Session, room_id: int, user_id: int) -> List[Assessment]:
+def assessment_read_columns():
+    return [getattr(Assessment, name) for name in AssessmentRead.model_fields]
+
+def room_assessments_query(room_id: int, student_id: int):
+    # LIVE assessments of the room with the student's submission flag, via one LEFT JOIN on
+    # uq_attempts_assessment_student instead of an Attempt lookup per assessment
+    return (
+        select(*assessment_read_columns(), (Attempt.submitted_at != None).label("is_submitted"))
+        .outerjoin(Attempt, and_(Attempt.assessment_id == Assessment.id, Attempt.student_id == student_id))
+        .where(
+            Assessment.room_id == room_id,
+            Assessment.status == AssessmentStatus.LIVE
+        )
+    )
+
+def get_room_assessments_service(session: Session, room_id: int, user_id: int) -> List[dict]:
+    """Rows for AssessmentWithAttempt, as plain column mappings (no ORM objects are loaded)."""
     # Check if teacher
     room = session.get(Room, room_id)
     if room and room.teacher_id == user_id:
         # Teacher: Return all assessments
-        statement = select(Assessment).where(Assessment.room_id == room_id)
-        assessments = session.exec(statement).all()
-        return [AssessmentWithAttempt(**a.dict(), is_submitted=False) for a in assessments]
+        statement = select(*assessment_read_columns()).where(Assessment.room_id == room_id)
+        return [dict(row._mapping, is_submitted=False) for row in session.exec(statement)]
 
     # Check membership (Student)
-    member = session.exec(
-        select(RoomMember).where(
-            RoomMember.room_id == room_id,
-            RoomMember.student_id == user_id,
-            RoomMember.left_at == None
-        )
-    ).first()
-    if not member:
+    if not _is_room_member(session, room_id, user_id):
          raise HTTPException(status_code=403, detail="Not a member of this room")
     
     # Student: Return non-draft (unless we want to hide future homeworks?)
     # Requirement said "Show Live tests, Pending homework, Completed assessments"
     # So basically everything except DRAFT?
-    statement = select(Assessment).where(
-        Assessment.room_id == room_id,
-        Assessment.status == AssessmentStatus.LIVE
+    return [dict(row._mapping) for row in session.exec(room_assessments_query(room_id, user_id))]
+
+def get_attempt_detail_service(session: Session, attempt_id: int, user_id: int) -> bytes:
+    """Serialized AttemptDetail; the question list is spliced in from the assessment snapshot."""
+    # A resumed attempt must show every acknowledged answer
+    answer_journal.flush_attempts([attempt_id])
+    attempt = session.get(Attempt, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+
+    snapshot = snapshot_cache.get(attempt.assessment_id)
+    if snapshot is None:
+        snapshot = get_snapshot(session, session.get(Assessment, attempt.assessment_id))
+    if snapshot is not None:
+        questions_payload = snapshot.questions_payload
+    else:
+        questions_payload = encode_json([
+            QuestionClientRead(id=q.id, question_text=q.question_text, options=q.options)
+            for q in load_ordered_questions(session, attempt.assessment_id)
+        ])
+
+    answers = session.exec(
+        select(AttemptAnswer.question_id, AttemptAnswer.selected_answer).where(AttemptAnswer.attempt_id == attempt_id)
+    ).all()
+    attempt_read = AttemptRead(
+        **attempt.dict(),
+        answers=[{"question_id": q_id, "selected_answer": selected} for q_id, selected in answers]
     )
-    assessments = session.exec(statement).all()
-    results = []
-    
-    # Check if student has submitted
-    for assessment in assessments:
-        # Check attempts
-        attempt = session.exec(
-            select(Attempt).where(
-                Attempt.assessment_id == assessment.id,
-                Attempt.student_id == user_id
-            )
-        ).first()
-        
-        is_submitted = (attempt is not None and attempt.submitted_at is not None)
-        
-        results.append(AssessmentWithAttempt(
-            **assessment.dict(),
-            is_submitted=is_submitted
-        ))
-        
-    return results
+    return encode_json(attempt_read)[:-1] + b',"questions":' + questions_payload + b"}"
 
-def start_attempt_service(session: Session, assessment_id: int, user_id: int) -> Attempt:
+def start_attempt_service(session: Session, assessment_id: int, user_id: int, student_name: Optional[str] = None) -> Attempt:
     assessment = session.get(Assessment, assessment_id)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
@@ -209,6 +341,8 @@ def start_attempt_service(session: Session, assessment_id: int, user_id: int) ->
              raise HTTPException(status_code=403, detail="Assessment already submitted")
         
         # Hydrate answers for resume
+        if answer_journal.flush_attempts([existing.id]):
+            session.refresh(existing)
         answers_db = session.exec(
             select(AttemptAnswer).where(AttemptAnswer.attempt_id == existing.id)
         ).all()
@@ -227,32 +361,189 @@ def start_attempt_service(session: Session, assessment_id: int, user_id: int) ->
         from app.assessments.schemas import AttemptRead, AnswerRead
         return AttemptRead(**existing_dict)
 
+    student_name = student_display_name(session, user_id, student_name)
     attempt = Attempt(
         assessment_id=assessment_id,
         student_id=user_id,
-        started_at=datetime.utcnow()
+        started_at=datetime.utcnow(),
+        total_questions=len(answer_key_index.get(session, assessment_id))
     )
+    # Read before the commit expires the assessment
+    time_per_question, end_time = assessment.time_per_question, assessment.end_time
     session.add(attempt)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent request created this student's attempt first; resume that one
+        session.rollback()
+        return start_attempt_service(session, assessment_id, user_id, student_name)
     session.refresh(attempt)
+    deadline_scheduler.schedule(attempt.id, attempt_deadline(
+        attempt.started_at, attempt.total_questions, time_per_question, end_time
+    ))
+
+    if monitor_registry.is_watched(assessment_id):
+        monitor_registry.attempt_started(
+            assessment_id, user_id, student_name, attempt.started_at, attempt.total_questions
+        )
     
     # New attempt has no answers
     from app.assessments.schemas import AttemptRead
     return AttemptRead(**attempt.dict(), answers=[])
 
-def submit_answer_service(session: Session, attempt_id: int, question_id: int, answer: str, time: int, user_id: int):
+def student_display_name(session: Session, user_id: int, claimed: Optional[str]) -> str:
+    """
+    The name the monitor and leaderboard show: the token's name claim, or the users row for
+    tokens issued before the claim existed. Resolved before anything is committed, so a token
+    whose account is gone is turned away without side effects.
+    """
+    if claimed:
+        return claimed
+    user = user_cache.get(session, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user.name
+
+def _get_attempt_for_update(session: Session, attempt_id: int) -> Optional[Attempt]:
+    # Row lock serializes writes to one attempt, keeping its running counters consistent
+    return session.exec(
+        select(Attempt).where(Attempt.id == attempt_id).with_for_update()
+    ).first()
+
+def apply_counter_deltas(session: Session, attempt: Attempt, answered_delta: int, correct_delta: int):
+    if answered_delta or correct_delta:
+        attempt.answered_count = Attempt.answered_count + answered_delta
+        attempt.correct_count = Attempt.correct_count + correct_delta
+        session.add(attempt)
+
+def check_answer_batch(answers: List[AnswerSubmit]) -> dict:
+    if len(answers) > MAX_ANSWER_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ANSWER_BATCH} answers per batch")
+    # Last write wins when the same question appears more than once in a batch
+    return {answer_in.question_id: answer_in for answer_in in answers}
+
+def grade_answers(attempt_id: int, answer_key: dict, latest: dict) -> Tuple[List[AnswerRow], List[AnswerResult]]:
+    """Grades answers against the answer key: rows for the accepted ones, and a result per question."""
+    rows = []
+    results = []
+    for question_id, answer_in in latest.items():
+        if question_id not in answer_key:
+            results.append(AnswerResult(question_id=question_id, status="rejected", detail="Question not found in this assessment"))
+            continue
+        is_correct = (answer_in.selected_answer == answer_key[question_id])
+        rows.append((attempt_id, question_id, answer_in.selected_answer, answer_in.time_taken, is_correct))
+        results.append(AnswerResult(question_id=question_id, status="recorded", is_correct=is_correct))
+    return rows, results
+
+def answered_query(attempt_id: int, question_ids: List[int]):
+    return select(AttemptAnswer.question_id, AttemptAnswer.is_correct).where(
+        AttemptAnswer.attempt_id == attempt_id,
+        AttemptAnswer.question_id.in_(question_ids)
+    )
+
+def answer_counter_deltas(rows: List[AnswerRow], already_answered: dict) -> Tuple[int, int]:
+    """answered_count and correct_count changes for upserting rows over already_answered (question_id -> is_correct)."""
+    answered_delta = sum(1 for row in rows if row[1] not in already_answered)
+    correct_delta = sum(int(row[4]) - int(already_answered.get(row[1], False)) for row in rows)
+    return answered_delta, correct_delta
+
+def announce_answers(assessment_id: int, user_id: int, rows: List[AnswerRow], already_answered: dict):
+    for row in rows:
+        monitor_registry.answer_recorded(assessment_id, user_id, is_new=row[1] not in already_answered)
+
+def journal_answers(attempt_id: int, answer_key: dict, latest: dict) -> List[AnswerResult]:
+    """Grades answers and appends the accepted ones to the answer journal (write-behind mode)."""
+    rows, results = grade_answers(attempt_id, answer_key, latest)
+    if rows:
+        answer_journal.record(rows)
+    return results
+
+def _journal_answers(session: Session, attempt_id: int, latest: dict, user_id: int) -> List[AnswerResult]:
+    # No row lock: the row and the counters are written by the flusher, which takes it
     attempt = session.get(Attempt, attempt_id)
     if not attempt or attempt.student_id != user_id:
         raise HTTPException(status_code=404, detail="Attempt not found")
     if attempt.submitted_at:
         raise HTTPException(status_code=400, detail="Attempt already submitted")
+    answer_key = answer_key_index.get(session, attempt.assessment_id)
+    # Give the connection back before waiting on the fsync
+    session.rollback()
+    return journal_answers(attempt_id, answer_key, latest)
 
-    # Determine correctness
-    question = session.get(Question, question_id)
-    if not question:
-         raise HTTPException(status_code=404, detail="Question not found")
-    
-    is_correct = (answer == question.correct_answer)
+def write_journaled_answers(session: Session, rows: List[tuple]):
+    """
+    Flusher side of the answer journal: upserts journaled answers and moves their attempts'
+    counters, in one transaction. Takes the attempt row locks, in id order, like
+    submit_attempt_service; answers to attempts submitted meanwhile are dropped.
+    """
+    open_attempts = {
+        attempt_id: (assessment_id, student_id) for attempt_id, assessment_id, student_id in session.exec(
+            select(Attempt.id, Attempt.assessment_id, Attempt.student_id)
+            .where(Attempt.id.in_({row[0] for row in rows}), Attempt.submitted_at == None)
+            .order_by(Attempt.id)
+            .with_for_update()
+        )
+    }
+    rows = [row for row in rows if row[0] in open_attempts]
+    if not rows:
+        session.rollback()
+        return
+
+    already_answered = {
+        (attempt_id, question_id): is_correct for attempt_id, question_id, is_correct in session.exec(
+            select(AttemptAnswer.attempt_id, AttemptAnswer.question_id, AttemptAnswer.is_correct)
+            .where(AttemptAnswer.attempt_id.in_({row[0] for row in rows}))
+        )
+    }
+    deltas = {}
+    for attempt_id, question_id, _, _, is_correct in rows:
+        delta = deltas.setdefault(attempt_id, [0, 0])
+        previous = already_answered.get((attempt_id, question_id))
+        delta[0] += previous is None
+        delta[1] += int(is_correct) - int(bool(previous))
+    upsert_attempt_answers(session, rows)
+    changed = [
+        {"b_id": attempt_id, "b_answered": answered, "b_correct": correct}
+        for attempt_id, (answered, correct) in deltas.items() if answered or correct
+    ]
+    if changed:
+        attempts = Attempt.__table__
+        session.execute(
+            update(attempts).where(attempts.c.id == bindparam("b_id")).values(
+                answered_count=attempts.c.answered_count + bindparam("b_answered"),
+                correct_count=attempts.c.correct_count + bindparam("b_correct")
+            ),
+            changed
+        )
+    session.commit()
+
+    for attempt_id, question_id, _, _, _ in rows:
+        assessment_id, student_id = open_attempts[attempt_id]
+        monitor_registry.answer_recorded(
+            assessment_id, student_id, is_new=(attempt_id, question_id) not in already_answered
+        )
+
+def submit_answer_service(session: Session, attempt_id: int, question_id: int, answer: str, time: int, user_id: int):
+    if answer_journal.active:
+        result, = _journal_answers(
+            session, attempt_id, {question_id: AnswerSubmit(question_id=question_id, selected_answer=answer, time_taken=time)}, user_id
+        )
+        if result.status != "recorded":
+            raise HTTPException(status_code=404, detail=result.detail)
+        return {"status": "recorded", "is_correct": result.is_correct}
+
+    attempt = _get_attempt_for_update(session, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+
+    # Grade against the in-memory answer key; also rejects questions from other assessments
+    answer_key = answer_key_index.get(session, attempt.assessment_id)
+    if question_id not in answer_key:
+        raise HTTPException(status_code=404, detail="Question not found in this assessment")
+
+    is_correct = (answer == answer_key[question_id])
     
     # Check if answer exists (update) or create
     existing_answer = session.exec(
@@ -263,10 +554,12 @@ def submit_answer_service(session: Session, attempt_id: int, question_id: int, a
     ).first()
     
     if existing_answer:
+        correct_delta = int(is_correct) - int(existing_answer.is_correct)
         existing_answer.selected_answer = answer
         existing_answer.time_taken = time
         existing_answer.is_correct = is_correct
         session.add(existing_answer)
+        apply_counter_deltas(session, attempt, 0, correct_delta)
     else:
         new_answer = AttemptAnswer(
             attempt_id=attempt_id,
@@ -276,30 +569,162 @@ def submit_answer_service(session: Session, attempt_id: int, question_id: int, a
             is_correct=is_correct
         )
         session.add(new_answer)
+        apply_counter_deltas(session, attempt, 1, int(is_correct))
     
+    assessment_id = attempt.assessment_id
     session.commit()
+    monitor_registry.answer_recorded(assessment_id, user_id, is_new=existing_answer is None)
     return {"status": "recorded", "is_correct": is_correct} # Maybe hide correctness?
 
-def submit_attempt_service(session: Session, attempt_id: int, user_id: int):
-    attempt = session.get(Attempt, attempt_id)
+def attempt_answers_upsert(dialect: str, rows: List[AnswerRow]):
+    """INSERT ... ON CONFLICT (attempt_id, question_id) DO UPDATE for a list of answer rows, in one statement."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    statement = insert(AttemptAnswer).values([
+        {"attempt_id": attempt_id, "question_id": question_id, "selected_answer": selected,
+         "time_taken": time_taken, "is_correct": is_correct}
+        for attempt_id, question_id, selected, time_taken, is_correct in rows
+    ])
+    return statement.on_conflict_do_update(
+        index_elements=[AttemptAnswer.attempt_id, AttemptAnswer.question_id],
+        set_={
+            "selected_answer": statement.excluded.selected_answer,
+            "time_taken": statement.excluded.time_taken,
+            "is_correct": statement.excluded.is_correct,
+        }
+    )
+
+def upsert_attempt_answers(session: Session, rows: List[AnswerRow]):
+    if rows:
+        session.exec(attempt_answers_upsert(session.get_bind().dialect.name, rows))
+
+def submit_answers_batch_service(session: Session, attempt_id: int, answers: List[AnswerSubmit], user_id: int) -> AnswerBatchResult:
+    latest = check_answer_batch(answers)
+    if answer_journal.active:
+        return AnswerBatchResult(results=_journal_answers(session, attempt_id, latest, user_id))
+
+    attempt = _get_attempt_for_update(session, attempt_id)
+    if not attempt or attempt.student_id != user_id:
+        raise HTTPException(status_code=404, detail="Attempt not found")
+    if attempt.submitted_at:
+        raise HTTPException(status_code=400, detail="Attempt already submitted")
+
+    answer_key = answer_key_index.get(session, attempt.assessment_id)
+    already_answered = dict(session.exec(answered_query(attempt_id, list(latest))).all())
+    rows, results = grade_answers(attempt_id, answer_key, latest)
+    upsert_attempt_answers(session, rows)
+    apply_counter_deltas(session, attempt, *answer_counter_deltas(rows, already_answered))
+    assessment_id = attempt.assessment_id
+    session.commit()
+
+    announce_answers(assessment_id, user_id, rows, already_answered)
+    return AnswerBatchResult(results=results)
+
+# Final score of an attempt; finalize_expired_attempts applies the same rule in SQL
+def attempt_score(attempt: Attempt) -> float:
+    return float(attempt.correct_count) # Raw score or percentage? Let's do raw count for now.
+
+ATTEMPT_SCORE_SQL = cast(Attempt.correct_count, Float)
+
+def submission_times_query(attempts, distributions):
+    """
+    Answer times of the submitted attempts whose assessment keeps sketches in this process,
+    for publish_submissions(); None when there are none to read.
+    """
+    attempt_ids = [attempt.id for attempt, state in zip(attempts, distributions) if state is not None]
+    if not attempt_ids:
+        return None
+    return select(AttemptAnswer.attempt_id, AttemptAnswer.question_id, AttemptAnswer.time_taken).where(
+        AttemptAnswer.attempt_id.in_(attempt_ids)
+    )
+
+def publish_submissions(attempts, distributions, student_names: dict, times=()):
+    """
+    In-memory hooks for committed submissions: monitor, score/time sketches and leaderboard.
+    `times` are the rows of submission_times_query().
+    """
+    for attempt in attempts:
+        monitor_registry.attempt_submitted(attempt.assessment_id, attempt.student_id)
+    times_by_attempt = {}
+    for attempt_id, question_id, time_taken in times:
+        times_by_attempt.setdefault(attempt_id, []).append((question_id, time_taken))
+    for attempt, state in zip(attempts, distributions):
+        if state is not None:
+            distribution_index.record_submission(state, attempt.id, attempt.score, times_by_attempt.get(attempt.id, []))
+    for attempt in attempts:
+        leaderboard_index.record(attempt, student_names[attempt.student_id])
+
+def _publish_submissions(session: Session, attempts, distributions, student_names: dict):
+    times = submission_times_query(attempts, distributions)
+    publish_submissions(attempts, distributions, student_names, session.exec(times).all() if times is not None else ())
+
+def submit_attempt_service(session: Session, attempt_id: int, user_id: int, student_name: Optional[str] = None):
+    # Journaled answers must reach the counters before they are scored
+    answer_journal.flush_attempts([attempt_id])
+    attempt = _get_attempt_for_update(session, attempt_id)
     if not attempt or attempt.student_id != user_id:
         raise HTTPException(status_code=404, detail="Attempt not found")
     if attempt.submitted_at:
         raise HTTPException(status_code=403, detail="Attempt already submitted")
+    student_name = student_display_name(session, user_id, student_name)
     
-    # Calculate score
-    answers = session.exec(
-        select(AttemptAnswer).where(AttemptAnswer.attempt_id == attempt_id)
-    ).all()
-    
-    correct_count = sum(1 for a in answers if a.is_correct)
-    total_questions = len(answers) 
-    # NOTE: Ideally total questions should count from AssessmentQuestion linkage to account for unanswered ones.
-    # For now, simplistic score based on answers derived.
-    
-    attempt.score = float(correct_count) # Raw score or percentage? Let's do raw count for now.
+    # correct_count is maintained as answers arrive, so finalizing needs no answer scan
+    attempt.score = attempt_score(attempt)
     attempt.submitted_at = datetime.utcnow()
     session.add(attempt)
-    session.commit()
+    record_submissions(session, attempt.assessment_id, [attempt])
+    distributions = distribution_index.prepare(attempt.assessment_id)
+    try:
+        session.commit()
+    except Exception:
+        distribution_index.release(distributions)
+        raise
     session.refresh(attempt)
+    deadline_scheduler.cancel(attempt.id)
+    _publish_submissions(
+        session, [attempt], [distributions], {user_id: student_name}
+    )
     return attempt
+
+def finalize_expired_attempts(session: Session, attempt_ids: List[int]) -> int:
+    """
+    Auto-submit attempts whose deadline passed, scored like submit_attempt_service, in one
+    UPDATE for the batch. Attempts submitted in the meantime no longer match and are left alone.
+    Returns how many attempts were finalized.
+    """
+    answer_journal.flush_attempts(attempt_ids)
+    finalized = session.execute(
+        update(Attempt)
+        .where(Attempt.id.in_(attempt_ids), Attempt.submitted_at == None)
+        .values(score=ATTEMPT_SCORE_SQL, submitted_at=datetime.utcnow())
+        .returning(
+            Attempt.id, Attempt.assessment_id, Attempt.student_id, Attempt.score, Attempt.started_at, Attempt.submitted_at
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not finalized:
+        session.rollback()
+        return 0
+
+    by_assessment = {}
+    for attempt in finalized:
+        by_assessment.setdefault(attempt.assessment_id, []).append(attempt)
+    for assessment_id, attempts in by_assessment.items():
+        record_submissions(session, assessment_id, attempts)
+    # The bulk UPDATE bypasses the ORM events that bump room versions
+    bump_room_versions(session, session.exec(select(Assessment.room_id).where(Assessment.id.in_(list(by_assessment)))).all())
+    student_names = dict(session.exec(
+        select(User.id, User.name).where(User.id.in_({attempt.student_id for attempt in finalized}))
+    ).all())
+    distributions = [
+        distribution_index.prepare(assessment_id) for assessment_id, attempts in by_assessment.items() for _ in attempts
+    ]
+    try:
+        session.commit()
+    except Exception:
+        for state in distributions:
+            distribution_index.release(state)
+        raise
+
+    ordered = [attempt for attempts in by_assessment.values() for attempt in attempts]
+    _publish_submissions(session, ordered, distributions, student_names)
+    return len(finalized)
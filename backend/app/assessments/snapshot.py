@@ -0,0 +1,128 @@
+"""
+Frozen snapshots of assessments that have gone LIVE.
+
+Once an assessment leaves DRAFT its question set can no longer change, so everything the
+exam pages need is compiled once (ordered questions, options, answer key) and kept in a
+bounded in-process LRU together with its serialized JSON. Detail requests are then served
+from bytes, without loading questions or re-encoding them per student.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models.assessment import Assessment, AssessmentQuestion, AssessmentStatus
+from app.models.question import Question
+from app.assessments.schemas import AssessmentDetail, QuestionRead, QuestionClientRead
+from app.responses import dumps
+
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "256"))
+
+
+def encode_json(data) -> bytes:
+    return dumps(data)
+
+
+def load_ordered_questions(session: Session, assessment_id: int) -> List[Question]:
+    """The assessment's questions in question_order, in one joined query."""
+    return session.exec(
+        select(Question)
+        .join(AssessmentQuestion, AssessmentQuestion.question_id == Question.id)
+        .where(AssessmentQuestion.assessment_id == assessment_id)
+        .order_by(AssessmentQuestion.question_order)
+    ).all()
+
+
+@dataclass(frozen=True)
+class AssessmentSnapshot:
+    assessment_id: int
+    room_id: int
+    created_by: int
+    question_ids: Tuple[int, ...]
+    answer_key: Dict[int, str]  # question_id -> correct option, never sent to students
+    student_payload: bytes      # AssessmentDetail without correct answers
+    teacher_payload: bytes      # AssessmentDetail with correct answers
+    questions_payload: bytes    # List[QuestionClientRead], spliced into attempt details
+
+    @property
+    def num_questions(self) -> int:
+        return len(self.question_ids)
+
+
+def compile_snapshot(session: Session, assessment: Assessment) -> AssessmentSnapshot:
+    questions = load_ordered_questions(session, assessment.id)
+    client_questions = [
+        QuestionClientRead(id=q.id, question_text=q.question_text, options=q.options) for q in questions
+    ]
+    teacher_questions = [
+        QuestionRead(id=q.id, question_text=q.question_text, options=q.options, correct_answer=q.correct_answer)
+        for q in questions
+    ]
+    header = assessment.dict()
+    return AssessmentSnapshot(
+        assessment_id=assessment.id,
+        room_id=assessment.room_id,
+        created_by=assessment.created_by,
+        question_ids=tuple(q.id for q in questions),
+        answer_key={q.id: q.correct_answer for q in questions},
+        student_payload=encode_json(AssessmentDetail(**header, questions=[
+            QuestionRead(**q.dict()) for q in client_questions
+        ])),
+        teacher_payload=encode_json(AssessmentDetail(**header, questions=teacher_questions)),
+        questions_payload=encode_json(client_questions),
+    )
+
+
+class SnapshotCache:
+    def __init__(self, max_size: int = SNAPSHOT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, AssessmentSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, assessment_id: int) -> Optional[AssessmentSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(assessment_id)
+            if snapshot is not None:
+                self._entries.move_to_end(assessment_id)
+            return snapshot
+
+    def put(self, snapshot: AssessmentSnapshot):
+        with self._lock:
+            self._entries[snapshot.assessment_id] = snapshot
+            self._entries.move_to_end(snapshot.assessment_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, assessment_id: int):
+        with self._lock:
+            self._entries.pop(assessment_id, None)
+
+    def invalidate_question(self, question_id: int):
+        with self._lock:
+            stale = [a_id for a_id, snap in self._entries.items() if question_id in snap.question_ids]
+            for assessment_id in stale:
+                del self._entries[assessment_id]
+
+
+snapshot_cache = SnapshotCache()
+
+
+def get_snapshot(session: Session, assessment: Assessment) -> Optional[AssessmentSnapshot]:
+    """Cached snapshot for a LIVE/CLOSED assessment, compiled on a miss. DRAFT assessments have none."""
+    if assessment.status == AssessmentStatus.DRAFT:
+        return None
+    snapshot = snapshot_cache.get(assessment.id)
+    if snapshot is None:
+        snapshot = compile_snapshot(session, assessment)
+        snapshot_cache.put(snapshot)
+    return snapshot
+
+
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _invalidate_question(mapper, connection, target):
+    snapshot_cache.invalidate_question(target.id)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.metrics import registry
+from app.models.user import User
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+
+user_cache_hits = registry.counter("user_cache_hits_total", "User rows served from the in-process cache")
+user_cache_misses = registry.counter("user_cache_misses_total", "User rows loaded from the users table")
+
+
+class UserCache:
+    """
+    Bounded LRU cache of user rows with a TTL, in front of `session.get(User, ...)`.
+
+    Entries are detached copies, so callers may read them freely but must not add them to a session.
+    """
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl_seconds: float = USER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, user_id: int) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                user_cache_hits.inc()
+                return entry[1]
+
+        user_cache_misses.inc()
+        user = session.get(User, user_id)
+        if user is None:
+            return None
+        cached = User(**user.dict())
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl_seconds, cached)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def hit_rate(self) -> float:
+        total = user_cache_hits.value + user_cache_misses.value
+        return user_cache_hits.value / total if total else 0.0
+
+
+user_cache = UserCache()
+
+registry.gauge("user_cache_hit_ratio", "Share of user lookups served from the cache", user_cache.hit_rate)
+
+
+# Invalidation hooks: any ORM update or delete of a user drops its cached row.
+# Bulk UPDATE/DELETE statements bypass these events and should call user_cache.invalidate() themselves.
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
@@ -1,61 +1,50 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlmodel import Session, select
-from typing import Optional
 
-from app.database import get_engine
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.auth.service import SECRET_KEY, ALGORITHM
-from app.auth.schemas import TokenData
+from app.auth.schemas import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_session():
-    with Session(get_engine()) as session:
-        yield session
-
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str) -> Principal:
     try:
-        # print(f"DEBUG AUTH: verifying token {token[:10]}...")
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        role: str = payload.get("role")
+        user_id = payload.get("sub")
+        role = payload.get("role")
         if user_id is None or role is None:
-            print("DEBUG AUTH: user_id or role missing in payload")
-            raise credentials_exception
-        token_data = TokenData(user_id=user_id, role=role)
-    except JWTError as e:
-        print(f"DEBUG AUTH: JWTError: {e}")
-        raise credentials_exception
-    
-    user = session.get(User, token_data.user_id)
-    if user is None:
-        print(f"DEBUG AUTH: User {token_data.user_id} not found in DB")
-        raise credentials_exception
-    return user
-
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+            raise _credentials_exception()
+        # Tokens issued before the name claim existed still validate, with an empty name
+        return Principal(id=int(user_id), role=role, name=payload.get("name", ""))
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    # Resolved from the signed token claims alone: no DB round trip and no pooled connection
+    return decode_token(token)
+
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     # In the future, check if user is active (e.g. email verified)
     return current_user
 
-def teacher_only(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role != UserRole.TEACHER:
+def _require_role(current_user: Principal, role: UserRole) -> Principal:
+    if current_user.role != role:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
         )
     return current_user
 
-def student_only(current_user: User = Depends(get_current_active_user)) -> User:
-    if current_user.role != UserRole.STUDENT:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this resource"
-        )
-    return current_user
+async def teacher_only(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    return _require_role(current_user, UserRole.TEACHER)
+
+async def student_only(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+    return _require_role(current_user, UserRole.STUDENT)
@@ -0,0 +1,113 @@
+"""
+Argon2 password hashing off the request threads.
+
+Hashes and verifications run in a dedicated process pool. Admission is bounded: once
+HASH_QUEUE_LIMIT jobs are running or queued, new login/register requests are rejected
+with 503 instead of piling up behind a login storm. A request that gives up after
+HASH_TIMEOUT_SECONDS answers 503 too, but its job keeps its slot until the pool has
+actually finished or dropped it.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.metrics import registry
+
+# Argon2 cost parameters. Changing them makes existing hashes "deprecated": they are
+# still accepted and are transparently re-hashed with the new parameters on next login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))  # 0 hashes inline
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(max(1, HASH_WORKERS) * 8)))
+HASH_TIMEOUT_SECONDS = float(os.getenv("HASH_TIMEOUT_SECONDS", "10"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+hash_rejections = registry.counter("password_hash_rejected_total", "Hash jobs refused because the queue was full")
+hash_rehashes = registry.counter("password_rehash_total", "Logins whose hash was upgraded to the current parameters")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class HashPool:
+    def __init__(self, workers: int = HASH_WORKERS, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            hash_rejections.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            # Never queued, so no done callback will give the slot back
+            self._slots.release()
+            raise
+        # cancel() cannot stop a job that is already running, so the slot follows the job, not this request
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=HASH_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hash_pool = HashPool()
+
+
+def hash_password(password: str) -> str:
+    return hash_pool.run(_hash, password)
+
+
+def verify_and_update_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+    valid, new_hash = hash_pool.run(_verify_and_update, password, hashed)
+    if new_hash:
+        hash_rehashes.inc()
+    return valid, new_hash
@@ -3,22 +3,18 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.database import get_engine
+from app.database import get_session
 from app.models.user import User, UserRole
 from app.auth.schemas import UserCreate, UserLogin, Token
 from app.auth.service import (
     get_password_hash,
-    verify_password,
+    verify_and_update_password,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-def get_session():
-    with Session(get_engine()) as session:
-        yield session
-
 @router.post("/register", response_model=Token)
 def register(user_in: UserCreate, session: Session = Depends(get_session)):
     # Check if user already exists
@@ -45,7 +41,7 @@ def register(user_in: UserCreate, session: Session = Depends(get_session)):
     # Generate token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(new_user.id), "role": new_user.role.value},
+        data={"sub": str(new_user.id), "role": new_user.role.value, "name": new_user.name},
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -55,16 +51,28 @@ def login(user_in: UserLogin, session: Session = Depends(get_session)):
     statement = select(User).where(User.email == user_in.email)
     user = session.exec(statement).first()
     
-    if not user or not verify_password(user_in.password, user.password_hash):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    valid, new_hash = verify_and_update_password(user_in.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Argon2 parameters changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        session.add(user)
+        session.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role.value},
+        data={"sub": str(user.id), "role": user.role.value, "name": user.name},
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -19,3 +19,9 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[int] = None
     role: Optional[UserRole] = None
+
+class Principal(BaseModel):
+    """The authenticated caller, resolved from token claims."""
+    id: int
+    role: UserRole
+    name: str = ""
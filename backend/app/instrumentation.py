@@ -0,0 +1,148 @@
+"""
+Per-request timing: latency, SQL statement count, database time and pool waits for every request.
+
+RequestMetricsMiddleware runs the request inside count_statements(), which puts a RequestStats in
+a context variable for the life of the block (it is usable on its own too, e.g. to hold a code
+path to a query budget). Engine-wide cursor events add each statement and its duration to it,
+and the pool's timed checkout adds its waits. Context variables follow the request into the
+threadpool, the async stack's greenlets and streaming generators, so queries from sessions
+those open themselves still count. When the response has been sent, the totals go into
+histograms labelled with the route template (not the raw path, which would make a series per
+id). A request that ran more than N_PLUS_ONE_QUERY_THRESHOLD statements is logged as an N+1
+suspect.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_QUERY_THRESHOLD = int(os.getenv("N_PLUS_ONE_QUERY_THRESHOLD", "25"))
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+UNMATCHED_ROUTE = "<unmatched>"
+
+request_duration = registry.histogram_family(
+    "http_request_duration_seconds", "Time from request start to the last byte of the response",
+    ("method", "route", "status")
+)
+request_queries = registry.histogram_family(
+    "http_request_db_statements", "SQL statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+request_db_time = registry.histogram_family(
+    "http_request_db_seconds", "Time per request spent executing SQL statements", ("method", "route")
+)
+statements_total = registry.counter("db_statements_total", "SQL statements executed, in requests or not")
+n_plus_one_suspects = registry.counter(
+    "http_n_plus_one_suspects_total", "Requests that ran more than N_PLUS_ONE_QUERY_THRESHOLD statements"
+)
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    sql: Optional[List[str]] = None  # the statements themselves, when asked for
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+@contextmanager
+def count_statements(record_sql: bool = False) -> Iterator[RequestStats]:
+    """Counts the SQL statements run inside the block, including threads and tasks started from it."""
+    outer = current_request.get()
+    stats = RequestStats(sql=[] if record_sql else None)
+    token = current_request.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request.reset(token)
+        # Nested blocks also count toward the enclosing one
+        if outer is not None:
+            outer.statements += stats.statements
+            outer.db_seconds += stats.db_seconds
+            outer.pool_wait_seconds += stats.pool_wait_seconds
+            if outer.sql is not None:
+                outer.sql.extend(stats.sql or ())
+
+
+def add_pool_wait(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+_STARTED_KEY = "statement_started"
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+    statements_total.inc()
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if stats.sql is not None:
+            stats.sql.append(statement)
+
+@event.listens_for(Engine, "handle_error")
+def _execute_failed(exception_context):
+    started = exception_context.connection.info.get(_STARTED_KEY) if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI so streaming responses are timed to their last chunk, not to the headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with count_statements() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                self._record(scope, status, stats, time.perf_counter() - started)
+
+    def _record(self, scope, status: int, stats: RequestStats, elapsed: float):
+        method = scope["method"]
+        # The router stores the matched route in the scope it was handed, which is this one
+        route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+        request_duration.labels(method, route, status).observe(elapsed)
+        request_queries.labels(method, route).observe(stats.statements)
+        request_db_time.labels(method, route).observe(stats.db_seconds)
+        if stats.statements > N_PLUS_ONE_QUERY_THRESHOLD:
+            n_plus_one_suspects.inc()
+            logger.warning(
+                "N+1 suspect: %s %s ran %d SQL statements (%.1f ms in the database, %.1f ms waiting for a connection, %.1f ms total)",
+                method, scope["path"], stats.statements, stats.db_seconds * 1000, stats.pool_wait_seconds * 1000, elapsed * 1000
+            )
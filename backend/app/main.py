@@ -4,16 +4,46 @@ import os
 # Add the parent directory (backend) to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.auth.router import router as auth_router
 from app.rooms.router import router as rooms_router
 from app.assessments.router import router as assessments_router
 from app.reports.router import router as reports_router
 from app.analytics.router import router as analytics_router
 from app.monitor.router import router as monitor_router
+from app.questions.router import router as questions_router
+from sqlmodel import Session
+from app.database import USE_ASYNC_DB, get_engine
+from app.metrics import registry as metrics_registry, PROMETHEUS_CONTENT_TYPE
+from app.instrumentation import RequestMetricsMiddleware
+from app.responses import GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+from app.auth.hashing import hash_pool
+from app.reports.leaderboard import leaderboard_index
+from app.assessments.deadlines import deadline_scheduler, DEADLINE_SCHEDULER
+from app.assessments.answer_journal import answer_journal, ANSWER_WRITE_BEHIND, ANSWER_JOURNAL_DIR
+from app.assessments.service import finalize_expired_attempts, write_journaled_answers
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Answers acknowledged before a restart reach the database before anything reads them
+    if ANSWER_WRITE_BEHIND:
+        answer_journal.start(ANSWER_JOURNAL_DIR, write_journaled_answers)
+    with Session(get_engine()) as session:
+        leaderboard_index.rebuild(session)
+        if DEADLINE_SCHEDULER:
+            deadline_scheduler.rebuild(session)
+    if DEADLINE_SCHEDULER:
+        deadline_scheduler.start(finalize_expired_attempts)
+    yield
+    deadline_scheduler.stop()
+    answer_journal.stop()
+    hash_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +52,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if GZIP_MINIMUM_SIZE:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+# Added last so it is outermost and times the whole stack
+app.add_middleware(RequestMetricsMiddleware)
+
+if USE_ASYNC_DB:
+    # Async handlers for the hot attempt/monitor paths; registered first so they take precedence
+    from app.assessments.async_router import router as assessments_async_router
+    from app.monitor.async_router import router as monitor_async_router
+    app.include_router(assessments_async_router)
+    app.include_router(monitor_async_router)
 
 app.include_router(auth_router)
 app.include_router(rooms_router)
@@ -29,7 +70,14 @@ app.include_router(assessments_router)
 app.include_router(reports_router)
 app.include_router(analytics_router)
 app.include_router(monitor_router)
+app.include_router(questions_router)
 
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
+
+@app.get("/metrics")
+def read_metrics(format: str = Query("prometheus", pattern="^(prometheus|json)$")):
+    if format == "json":
+        return metrics_registry.snapshot()
+    return PlainTextResponse(metrics_registry.exposition(), media_type=PROMETHEUS_CONTENT_TYPE)
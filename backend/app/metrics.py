@@ -0,0 +1,204 @@
+"""
+Tiny in-process metrics registry (counters, gauges and histograms), exposed at GET /metrics
+in the Prometheus text format (or as JSON with ?format=json).
+
+Kept dependency-free on purpose; values are per worker process.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _label_string(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _header(name: str, description: str, kind: str) -> List[str]:
+    return [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> dict:
+        return {"type": "counter", "description": self.description, "value": self._value}
+
+    def exposition(self) -> List[str]:
+        return _header(self.name, self.description, "counter") + [f"{self.name} {self._value}"]
+
+
+class Gauge:
+    """Read at snapshot time from a callback, e.g. the current pool occupancy."""
+
+    def __init__(self, name: str, description: str, read: Callable[[], float]):
+        self.name = name
+        self.description = description
+        self._read = read
+
+    @property
+    def value(self) -> float:
+        return self._read()
+
+    def snapshot(self) -> dict:
+        return {"type": "gauge", "description": self.description, "value": self._read()}
+
+    def exposition(self) -> List[str]:
+        return _header(self.name, self.description, "gauge") + [f"{self.name} {self._read()}"]
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def _read(self) -> Tuple[List[dict], float, int]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = []
+        running = 0
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+            running += bucket_count
+            cumulative.append({"le": bound, "count": running})
+        return cumulative, total, count
+
+    def snapshot(self) -> dict:
+        cumulative, total, count = self._read()
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": count,
+            "sum": total,
+            "buckets": cumulative,
+        }
+
+    def samples(self, labels: Optional[Dict[str, object]] = None) -> List[str]:
+        cumulative, total, count = self._read()
+        labels = labels or {}
+        lines = [
+            f"{self.name}_bucket{_label_string({**labels, 'le': bucket['le']})} {bucket['count']}"
+            for bucket in cumulative
+        ]
+        lines.append(f"{self.name}_sum{_label_string(labels)} {total}")
+        lines.append(f"{self.name}_count{_label_string(labels)} {count}")
+        return lines
+
+    def exposition(self) -> List[str]:
+        return _header(self.name, self.description, "histogram") + self.samples()
+
+
+class HistogramFamily:
+    """Histograms sharing a name and buckets, one per combination of label values (e.g. per route)."""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, Histogram(self.name, self.description, self.buckets))
+        return child
+
+    def _items(self) -> List[Tuple[Dict[str, str], Histogram]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in sorted(children)]
+
+    def snapshot(self) -> dict:
+        series = []
+        for labels, child in self._items():
+            data = child.snapshot()
+            series.append({"labels": labels, "count": data["count"], "sum": data["sum"], "buckets": data["buckets"]})
+        return {"type": "histogram", "description": self.description, "series": series}
+
+    def exposition(self) -> List[str]:
+        lines = _header(self.name, self.description, "histogram")
+        for labels, child in self._items():
+            lines.extend(child.samples(labels))
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, description, read))
+
+    def histogram(self, name: str, description: str, buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(name, description, buckets or DEFAULT_BUCKETS))
+
+    def histogram_family(
+        self, name: str, description: str, labelnames: Sequence[str], buckets: Optional[Sequence[float]] = None
+    ) -> HistogramFamily:
+        return self._register(HistogramFamily(name, description, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def _all(self) -> List:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> dict:
+        return {metric.name: metric.snapshot() for metric in self._all()}
+
+    def exposition(self) -> str:
+        """Every metric in the Prometheus text format."""
+        lines = []
+        for metric in self._all():
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -3,3 +3,4 @@ from .class_room import Room, RoomMember
 from .question import Question
 from .assessment import Assessment, AssessmentQuestion
 from .attempt import Attempt, AttemptAnswer
+from .analytics import AssessmentScoreRollup, QuestionOptionRollup
@@ -0,0 +1,25 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field, UniqueConstraint
+
+# Pre-aggregated analytics, maintained when attempts are submitted (see app/analytics/rollups.py)
+
+class AssessmentScoreRollup(SQLModel, table=True):
+    __tablename__ = "assessment_score_rollups"
+
+    assessment_id: int = Field(foreign_key="assessments.id", primary_key=True)
+    attempt_count: int = 0
+    score_sum: float = 0.0
+    highest_score: Optional[float] = None
+    lowest_score: Optional[float] = None
+
+class QuestionOptionRollup(SQLModel, table=True):
+    __tablename__ = "question_option_rollups"
+    __table_args__ = (
+        UniqueConstraint("assessment_id", "question_id", "selected_answer", name="uq_question_option_rollups"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    assessment_id: int = Field(foreign_key="assessments.id")
+    question_id: int = Field(foreign_key="questions.id")
+    selected_answer: str
+    selected_count: int = 0
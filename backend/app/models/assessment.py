@@ -1,5 +1,6 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from enum import Enum
 
@@ -15,6 +16,9 @@ class AssessmentStatus(str, Enum):
 
 class Assessment(SQLModel, table=True):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_room_id", "room_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     room_id: Optional[int] = Field(default=None, foreign_key="rooms.id")
@@ -29,6 +33,9 @@ class Assessment(SQLModel, table=True):
 
 class AssessmentQuestion(SQLModel, table=True):
     __tablename__ = "assessment_questions"
+    __table_args__ = (
+        Index("ix_assessment_questions_assessment_order", "assessment_id", "question_order"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     assessment_id: int = Field(foreign_key="assessments.id")
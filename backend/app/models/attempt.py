@@ -1,9 +1,13 @@
 from typing import Optional
 from datetime import datetime
-from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field, UniqueConstraint
 
 class Attempt(SQLModel, table=True):
     __tablename__ = "attempts"
+    __table_args__ = (
+        UniqueConstraint("assessment_id", "student_id", name="uq_attempts_assessment_student"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     assessment_id: int = Field(foreign_key="assessments.id")
@@ -11,9 +15,19 @@ class Attempt(SQLModel, table=True):
     score: float = 0.0
     started_at: datetime = Field(default_factory=datetime.utcnow)
     submitted_at: Optional[datetime] = None
+    # Running counters maintained by answer submission, so scoring and progress need no answer scan
+    answered_count: int = 0
+    correct_count: int = 0
+    total_questions: int = 0
+
+# Teacher report in score order, paged by keyset; declared here since it needs a DESC column
+Index("ix_attempts_assessment_score", Attempt.assessment_id, Attempt.score.desc(), Attempt.submitted_at, Attempt.id)
 
 class AttemptAnswer(SQLModel, table=True):
     __tablename__ = "attempt_answers"
+    __table_args__ = (
+        UniqueConstraint("attempt_id", "question_id", name="uq_attempt_answers_attempt_question"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     attempt_id: int = Field(foreign_key="attempts.id")
@@ -1,18 +1,28 @@
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 class Room(SQLModel, table=True):
     __tablename__ = "rooms"
+    __table_args__ = (
+        Index("ix_rooms_teacher_id", "teacher_id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     code: str = Field(unique=True, index=True)
     teacher_id: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped with every change to the room's assessment list (app/assessments/room_versions.py)
+    version: int = 0
 
 class RoomMember(SQLModel, table=True):
     __tablename__ = "room_members"
+    __table_args__ = (
+        Index("ix_room_members_room_student_left", "room_id", "student_id", "left_at"),
+        Index("ix_room_members_student_left", "student_id", "left_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     room_id: int = Field(foreign_key="rooms.id")
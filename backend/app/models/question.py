@@ -1,9 +1,18 @@
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import DDL, Index, event, text
 from sqlmodel import SQLModel, Field, JSON
 
 class Question(SQLModel, table=True):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Question bank: a teacher's questions by topic/difficulty; id makes sampling an index-only scan
+        Index("ix_questions_bank_filters", "created_by", "topic", "difficulty", "id"),
+        # Full-text search on PostgreSQL; SQLite gets the questions_fts table below instead
+        Index(
+            "ix_questions_text_search", text("to_tsvector('english', question_text)"), postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     question_text: str
@@ -13,3 +22,22 @@ class Question(SQLModel, table=True):
     difficulty: str = "Medium"
     created_by: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# SQLite (development): an external-content FTS5 index over question_text, kept in step by
+# triggers so Core bulk inserts are indexed too. The migration creates the same objects.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+    "question_text, content='questions', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ai AFTER INSERT ON questions BEGIN "
+    "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_ad AFTER DELETE ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); END",
+    "CREATE TRIGGER IF NOT EXISTS questions_fts_au AFTER UPDATE OF question_text ON questions BEGIN "
+    "INSERT INTO questions_fts(questions_fts, rowid, question_text) VALUES ('delete', old.id, old.question_text); "
+    "INSERT INTO questions_fts(rowid, question_text) VALUES (new.id, new.question_text); END",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Question.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Question.__table__, "before_drop", DDL("DROP TABLE IF EXISTS questions_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,33 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import get_async_session
+from app.auth.schemas import Principal
+from app.auth.dependencies import teacher_only
+from app.monitor.schemas import MonitorPage, StudentMonitorItem
+from app.pagination import PAGE_SIZE, MAX_PAGE_SIZE
+from app.responses import fast_json
+from app.monitor.async_service import get_assessment_monitor_service, get_assessment_monitor_page_service
+
+# Mounted ahead of the sync monitor router when USE_ASYNC_DB is on, so these paths win
+router = APIRouter(prefix="/teacher/monitor", tags=["monitor"])
+
+@router.get("/assessment/{assessment_id}", response_model=List[StudentMonitorItem])
+async def get_assessment_monitor_async(
+    assessment_id: int,
+    current_user: Principal = Depends(teacher_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return fast_json(await get_assessment_monitor_service(session, assessment_id, current_user.id))
+
+@router.get("/assessment/{assessment_id}/page", response_model=MonitorPage)
+async def get_assessment_monitor_page_async(
+    assessment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    current_user: Principal = Depends(teacher_only),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return fast_json(await get_assessment_monitor_page_service(session, assessment_id, current_user.id, cursor, limit, include_total))
@@ -0,0 +1,37 @@
+"""Async version of the monitor service, used by async_router when USE_ASYNC_DB is on."""
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.assessment import Assessment
+from app.monitor.schemas import MonitorPage, StudentMonitorItem
+from app.monitor.service import (
+    monitor_items_query, monitor_page_query, monitor_count_query, build_monitor_items, build_monitor_page
+)
+from app.pagination import PAGE_SIZE, decode_cursor
+
+async def _get_monitored_assessment(session: AsyncSession, assessment_id: int, user_id: int) -> Assessment:
+    assessment = await session.get(Assessment, assessment_id)
+    if not assessment or assessment.created_by != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to monitor this assessment")
+    return assessment
+
+async def get_assessment_monitor_service(session: AsyncSession, assessment_id: int, user_id: int) -> List[StudentMonitorItem]:
+    assessment = await _get_monitored_assessment(session, assessment_id, user_id)
+    results = (await session.exec(monitor_items_query(assessment_id))).all()
+    return build_monitor_items(results, assessment.time_per_question, assessment.end_time)
+
+async def get_assessment_monitor_page_service(
+    session: AsyncSession,
+    assessment_id: int,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    include_total: bool = False
+) -> MonitorPage:
+    assessment = await _get_monitored_assessment(session, assessment_id, user_id)
+    after = decode_cursor(cursor, (int,))
+
+    results = (await session.exec(monitor_page_query(assessment_id, after, limit))).all()
+    total = (await session.exec(monitor_count_query(assessment_id))).one() if include_total else None
+    return build_monitor_page(results, limit, assessment, total)
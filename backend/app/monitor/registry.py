@@ -0,0 +1,204 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.assessments.deadlines import attempt_deadline
+
+
+class MonitorSubscriber:
+    """One open monitor stream. Events are handed over from worker threads to the stream's event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = 1000):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        # Set when the queue overflowed; the stream then re-sends a full snapshot
+        self.stale = False
+
+    def push_snapshot(self):
+        self.loop.call_soon_threadsafe(self._put, {"type": "snapshot"})
+
+    def push(self, event: dict):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.stale = True
+
+
+class _AssessmentState:
+    def __init__(self):
+        self.time_per_question: Optional[int] = None
+        self.end_time: Optional[datetime] = None
+        self.seeded = False
+        self.students: Dict[int, dict] = {}
+        # Change counter; touched maps a student to the count at their last change
+        self.sequence = 0
+        self.touched: Dict[int, int] = {}
+        self.synced_at: Optional[datetime] = None
+        self.subscribers: Set[MonitorSubscriber] = set()
+
+
+def _render(item: dict, now: datetime) -> dict:
+    item = dict(item)
+    deadline = item.get("deadline")
+    if item.get("status") == "in_progress" and deadline is not None:
+        item["remaining_time_seconds"] = max(0, int((deadline - now).total_seconds()))
+    return item
+
+
+class MonitorRegistry:
+    """
+    In-process attempt state for assessments that currently have a teacher watching.
+
+    State for an assessment is seeded from the DB when the first monitor stream opens and
+    is dropped when the last one closes. In between, the attempt services push changes here
+    and every subscriber gets them as deltas.
+
+    Only requests served by this process push changes, so with several workers the state is
+    re-read from the DB every MONITOR_RESYNC_SECONDS (one query per watched assessment, see
+    claim_resync()) and subscribers get a fresh snapshot.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[int, _AssessmentState] = {}
+
+    def is_watched(self, assessment_id: int) -> bool:
+        return assessment_id in self._states
+
+    def subscribe(self, assessment_id: int, subscriber: MonitorSubscriber) -> bool:
+        """
+        Start receiving changes for an assessment. Returns False when its state still has to
+        be seeded from the DB (see seed()); changes pushed in the meantime are kept.
+        """
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                state = _AssessmentState()
+                self._states[assessment_id] = state
+            state.subscribers.add(subscriber)
+            return state.seeded
+
+    def seed(self, assessment_id: int, time_per_question: Optional[int], end_time: Optional[datetime], items: List[dict]):
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                return
+            # Anything pushed while the DB snapshot was being read is newer, keep it
+            self._load(state, time_per_question, end_time, items, since=0)
+
+    def claim_resync(self, assessment_id: int, interval: float) -> Optional[int]:
+        """
+        Returns the change counter to pass to resync() if the assessment's state is due to be
+        re-read from the DB, else None. The first stream to ask claims it, so it runs once per interval.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None or not state.seeded or (now - state.synced_at).total_seconds() < interval:
+                return None
+            state.synced_at = now
+            return state.sequence
+
+    def resync(
+        self,
+        assessment_id: int,
+        time_per_question: Optional[int],
+        end_time: Optional[datetime],
+        items: List[dict],
+        since: int
+    ):
+        """Replaces the state with a DB snapshot and has every subscriber re-send it."""
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                return
+            # Students changed here after the read began keep their newer state
+            self._load(state, time_per_question, end_time, items, since)
+            subscribers = list(state.subscribers)
+        for subscriber in subscribers:
+            subscriber.push_snapshot()
+
+    @staticmethod
+    def _load(state: _AssessmentState, time_per_question: Optional[int], end_time: Optional[datetime], items: List[dict], since: int):
+        state.time_per_question = time_per_question
+        state.end_time = end_time
+        for item in items:
+            if state.touched.get(item["student_id"], 0) <= since:
+                state.students[item["student_id"]] = item
+        state.seeded = True
+        state.synced_at = datetime.utcnow()
+
+    def unsubscribe(self, assessment_id: int, subscriber: MonitorSubscriber):
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                return
+            state.subscribers.discard(subscriber)
+            if not state.subscribers:
+                del self._states[assessment_id]
+
+    def snapshot(self, assessment_id: int) -> List[dict]:
+        now = datetime.utcnow()
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                return []
+            return [_render(item, now) for item in state.students.values()]
+
+    def deadline_for(self, assessment_id: int, started_at: datetime, total_questions: int) -> Optional[datetime]:
+        state = self._states.get(assessment_id)
+        if state is None:
+            return None
+        return attempt_deadline(started_at, total_questions, state.time_per_question, state.end_time)
+
+    # Hooks called by the attempt services
+
+    def attempt_started(self, assessment_id: int, student_id: int, student_name: str, started_at: datetime, total_questions: int = 0):
+        self._update(assessment_id, student_id, {
+            "student_id": student_id,
+            "student_name": student_name,
+            "status": "in_progress",
+            "started_at": started_at,
+            "deadline": self.deadline_for(assessment_id, started_at, total_questions),
+            "answered_count": 0,
+            "total_questions": total_questions,
+        })
+
+    def answer_recorded(self, assessment_id: int, student_id: int, is_new: bool):
+        if not is_new:
+            return
+        self._update(assessment_id, student_id, None, answered_delta=1)
+
+    def attempt_submitted(self, assessment_id: int, student_id: int):
+        self._update(assessment_id, student_id, {"status": "submitted", "deadline": None, "remaining_time_seconds": None})
+
+    def _update(self, assessment_id: int, student_id: int, changes: Optional[dict], answered_delta: int = 0):
+        if assessment_id not in self._states:
+            return
+        with self._lock:
+            state = self._states.get(assessment_id)
+            if state is None:
+                return
+            item = state.students.get(student_id)
+            if item is None:
+                if changes is None or "student_name" not in changes:
+                    # Unknown student and not enough data to show it, next snapshot picks it up
+                    return
+                item = {}
+                state.students[student_id] = item
+            if changes:
+                item.update(changes)
+            item["answered_count"] = item.get("answered_count", 0) + answered_delta
+            state.sequence += 1
+            state.touched[student_id] = state.sequence
+            event = {"type": "attempt", "item": _render(item, datetime.utcnow())}
+            subscribers = list(state.subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+
+monitor_registry = MonitorRegistry()
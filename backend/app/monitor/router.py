@@ -1,18 +1,143 @@
-from typing import List
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.models.user import User
-from app.auth.dependencies import teacher_only, get_session
-from app.monitor.schemas import StudentMonitorItem
-from app.monitor.service import get_assessment_monitor_service
+from app.auth.schemas import Principal
+from app.database import get_engine, get_session
+from app.auth.dependencies import teacher_only
+from app.models.assessment import Assessment
+from app.monitor.schemas import MonitorPage, StudentMonitorItem
+from app.pagination import PAGE_SIZE, MAX_PAGE_SIZE
+from app.responses import fast_json
+from app.monitor.service import (
+    get_assessment_monitor_service,
+    get_assessment_monitor_page_service,
+    get_monitored_assessment_service,
+    get_monitor_snapshot_service
+)
+from app.monitor.registry import monitor_registry, MonitorSubscriber
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/teacher/monitor", tags=["monitor"])
 
+KEEPALIVE_SECONDS = 15
+MONITOR_RESYNC_SECONDS = float(os.getenv("MONITOR_RESYNC_SECONDS", "30"))
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def _resync(assessment_id: int, since: int):
+    # Runs between stream events, long after the request session was closed, so it opens its own
+    with Session(get_engine()) as session:
+        assessment = session.get(Assessment, assessment_id)
+        if assessment is None:
+            return
+        items = get_monitor_snapshot_service(session, assessment)
+    monitor_registry.resync(
+        assessment_id, assessment.time_per_question, assessment.end_time, [item.dict() for item in items], since
+    )
+
 @router.get("/assessment/{assessment_id}", response_model=List[StudentMonitorItem])
 def get_assessment_monitor(
     assessment_id: int,
-    current_user: User = Depends(teacher_only),
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
-    return get_assessment_monitor_service(session, assessment_id, current_user.id)
+    return fast_json(get_assessment_monitor_service(session, assessment_id, current_user.id))
+
+@router.get("/assessment/{assessment_id}/page", response_model=MonitorPage)
+def get_assessment_monitor_page(
+    assessment_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_total: bool = False,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return fast_json(get_assessment_monitor_page_service(session, assessment_id, current_user.id, cursor, limit, include_total))
+
+@router.get("/assessment/{assessment_id}/stream")
+async def stream_assessment_monitor(
+    assessment_id: int,
+    request: Request,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    """
+    Server-Sent Events feed of the monitor: one `snapshot` event, then an `attempt` event
+    per change. Items carry a `deadline` so clients count remaining time down locally.
+
+    Changes are only pushed by the worker serving them, so every MONITOR_RESYNC_SECONDS the
+    state is re-read from the DB and another `snapshot` is sent; with several workers, a
+    change made on another one shows up within that interval.
+    """
+    try:
+        assessment = await run_in_threadpool(get_monitored_assessment_service, session, assessment_id, current_user.id)
+
+        subscriber = MonitorSubscriber(asyncio.get_running_loop())
+        # If another tab already holds the live state, the access check was the only query
+        if not monitor_registry.subscribe(assessment_id, subscriber):
+            try:
+                items = await run_in_threadpool(get_monitor_snapshot_service, session, assessment)
+            except Exception:
+                monitor_registry.unsubscribe(assessment_id, subscriber)
+                raise
+            monitor_registry.seed(
+                assessment_id, assessment.time_per_question, assessment.end_time, [item.dict() for item in items]
+            )
+    finally:
+        # The request session is only torn down once the stream ends; the events need no database,
+        # so give its connection back now rather than holding it for the whole exam
+        session.close()
+
+    def snapshot_event() -> str:
+        return _sse("snapshot", {
+            "assessment_id": assessment_id,
+            "server_time": datetime.utcnow(),
+            "students": monitor_registry.snapshot(assessment_id)
+        })
+
+    async def events():
+        try:
+            yield snapshot_event()
+            while not await request.is_disconnected():
+                if subscriber.stale:
+                    subscriber.stale = False
+                    while not subscriber.queue.empty():
+                        subscriber.queue.get_nowait()
+                    yield snapshot_event()
+                since = monitor_registry.claim_resync(assessment_id, MONITOR_RESYNC_SECONDS)
+                if since is not None:
+                    try:
+                        # Its snapshot reaches every stream of this assessment through their queues
+                        await run_in_threadpool(_resync, assessment_id, since)
+                    except Exception:
+                        logger.exception("Re-reading monitor state of assessment %d failed", assessment_id)
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=min(KEEPALIVE_SECONDS, MONITOR_RESYNC_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event["type"] == "snapshot":
+                    yield snapshot_event()
+                else:
+                    yield _sse(event["type"], event["item"])
+        finally:
+            monitor_registry.unsubscribe(assessment_id, subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import SQLModel
 
 class StudentMonitorItem(SQLModel):
@@ -8,3 +8,11 @@ class StudentMonitorItem(SQLModel):
     status: str # "in_progress" or "submitted"
     started_at: datetime
     remaining_time_seconds: Optional[int] = None
+    deadline: Optional[datetime] = None # pushed to streams, clients count down locally
+    answered_count: int = 0
+    total_questions: int = 0
+
+class MonitorPage(SQLModel):
+    students: List[StudentMonitorItem]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None # attempts across all pages, only with ?include_total=true
@@ -1,60 +1,104 @@
 from datetime import datetime
-from typing import List
-from sqlmodel import Session, select
+from typing import List, Optional
+from sqlmodel import Session, select, func
 from fastapi import HTTPException
 
-from app.models.assessment import Assessment, AssessmentQuestion
+from app.assessments.deadlines import attempt_deadline
+from app.models.assessment import Assessment
 from app.models.attempt import Attempt
 from app.models.user import User
-from app.monitor.schemas import StudentMonitorItem
+from app.monitor.schemas import StudentMonitorItem, MonitorPage
+from app.pagination import PAGE_SIZE, encode_cursor, decode_cursor
 
-def get_assessment_monitor_service(session: Session, assessment_id: int, user_id: int) -> List[StudentMonitorItem]:
-    # 1. Verify access (must be creator)
+def get_monitored_assessment_service(session: Session, assessment_id: int, user_id: int) -> Assessment:
+    # Verify access (must be creator)
     assessment = session.get(Assessment, assessment_id)
     if not assessment or assessment.created_by != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to monitor this assessment")
+    return assessment
+
+def monitor_items_query(assessment_id: int):
+    # Select ALL attempts (in_progress + submitted) for this assessment; progress comes from the attempt counters.
+    # Plain columns, not Attempt entities: a page of rows is read-only and skips the identity map
+    return (
+        select(
+            Attempt.student_id, Attempt.started_at, Attempt.submitted_at, Attempt.answered_count,
+            Attempt.total_questions, User.name.label("student_name")
+        )
+        .join(User, Attempt.student_id == User.id)
+        .where(Attempt.assessment_id == assessment_id)
+    )
+
+def monitor_page_query(assessment_id: int, after: Optional[list], limit: int):
+    # Keyset on student_id, walking uq_attempts_assessment_student; one extra row tells whether another page follows
+    statement = monitor_items_query(assessment_id)
+    if after:
+        statement = statement.where(Attempt.student_id > after[0])
+    return statement.order_by(Attempt.student_id).limit(limit + 1)
 
-    # 2. Calculate Total Duration
-    # Helper to count questions
-    question_count = session.exec(
-        select(AssessmentQuestion).where(AssessmentQuestion.assessment_id == assessment_id)
-    ).all()
-    num_questions = len(question_count)
-    time_per_question = assessment.time_per_question or 0
-    total_duration_seconds = time_per_question * num_questions
-
-    print(f"DEBUG: Monitoring Assessment ID: {assessment_id}")
-    
-    # 3. Fetch all attempts with student info
-    # CRITICAL: Select ALL attempts (in_progress + submitted) for this assessment
-    # Do NOT filter by status in the query.
-    print(f"DEBUG: Monitoring Assessment ID: {assessment_id}")
-    
-    query = select(Attempt, User).join(User, Attempt.student_id == User.id).where(Attempt.assessment_id == assessment_id)
-    
-    results = session.exec(query).all()
-    print(f"DEBUG: Found {len(results)} attempts")
+def monitor_count_query(assessment_id: int):
+    # Counted from the same index, without the User join
+    return select(func.count()).select_from(Attempt).where(Attempt.assessment_id == assessment_id)
 
+def build_monitor_items(results, time_per_question: Optional[int], end_time: Optional[datetime]) -> List[StudentMonitorItem]:
     monitor_items = []
     now = datetime.utcnow()
 
-    for attempt, student in results:
+    for attempt in results:
         # Determine status based on submitted_at (READ-ONLY)
         status = "submitted" if attempt.submitted_at else "in_progress"
         remaining = None
-        
+        deadline = None
+
         if status == "in_progress":
-            # Calculate remaining time dynamically
-            elapsed = (now - attempt.started_at).total_seconds()
+            # The deadline the scheduler auto-submits at, end_time included
+            deadline = attempt_deadline(attempt.started_at, attempt.total_questions, time_per_question, end_time)
             # Prevent negative remaining time, but do NOT auto-submit here (Read-Only)
-            remaining = max(0, int(total_duration_seconds - elapsed))
-        
+            remaining = max(0, int((deadline - now).total_seconds())) if deadline else 0
+
         monitor_items.append(StudentMonitorItem(
-            student_id=student.id,
-            student_name=student.name,
+            student_id=attempt.student_id,
+            student_name=attempt.student_name,
             status=status,
             started_at=attempt.started_at,
-            remaining_time_seconds=remaining
+            remaining_time_seconds=remaining,
+            deadline=deadline,
+            answered_count=attempt.answered_count,
+            total_questions=attempt.total_questions
         ))
-        
+
     return monitor_items
+
+def build_monitor_page(results, limit: int, assessment: Assessment, total: Optional[int]) -> MonitorPage:
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor([results[-1].student_id])
+    return MonitorPage(
+        students=build_monitor_items(results, assessment.time_per_question, assessment.end_time),
+        next_cursor=next_cursor,
+        total=total
+    )
+
+def get_assessment_monitor_service(session: Session, assessment_id: int, user_id: int) -> List[StudentMonitorItem]:
+    assessment = get_monitored_assessment_service(session, assessment_id, user_id)
+    return get_monitor_snapshot_service(session, assessment)
+
+def get_assessment_monitor_page_service(
+    session: Session,
+    assessment_id: int,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    include_total: bool = False
+) -> MonitorPage:
+    assessment = get_monitored_assessment_service(session, assessment_id, user_id)
+    after = decode_cursor(cursor, (int,))
+    results = session.exec(monitor_page_query(assessment_id, after, limit)).all()
+    total = session.exec(monitor_count_query(assessment_id)).one() if include_total else None
+    return build_monitor_page(results, limit, assessment, total)
+
+def get_monitor_snapshot_service(session: Session, assessment: Assessment) -> List[StudentMonitorItem]:
+    """State for a monitor stream: one row per attempt."""
+    results = session.exec(monitor_items_query(assessment.id)).all()
+    return build_monitor_items(results, assessment.time_per_question, assessment.end_time)
@@ -0,0 +1,39 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and base64url'd. The next page
+starts strictly after that key (a bisect in memory, or `WHERE key > cursor ... LIMIT n` backed by
+an index in SQL), so page N costs the same as page 1 and rows inserted meanwhile do not shift it.
+"""
+import base64
+import binascii
+import json
+import os
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[List[Any]]:
+    """The key a cursor carries, checked against the expected component types; 400 if it is not one of ours."""
+    if cursor is None:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, list) or len(key) != len(types):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for value, expected in zip(key, types):
+        # JSON has no int/float distinction for whole numbers; bool is an int subclass, reject it
+        if isinstance(value, bool) or not isinstance(value, (int, float) if expected is float else expected):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
@@ -0,0 +1,43 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from app.database import get_session
+from app.auth.schemas import Principal
+from app.auth.dependencies import teacher_only
+from app.pagination import PAGE_SIZE, MAX_PAGE_SIZE
+from app.responses import fast_json
+from app.questions.schemas import QuestionBankPage, SampleRequest, SampleResult, QuestionLinkRequest, QuestionLinkResult
+from app.questions.service import search_questions_service, sample_questions_service, link_questions_service
+
+router = APIRouter(prefix="/questions", tags=["questions"])
+
+@router.get("", response_model=QuestionBankPage)
+def search_questions(
+    q: Optional[str] = None,
+    topic: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    """The teacher's own questions, optionally full-text searched and filtered, in id order."""
+    return fast_json(search_questions_service(session, current_user.id, q, topic, difficulty, cursor, limit))
+
+@router.post("/sample", response_model=SampleResult)
+def sample_questions(
+    sample_in: SampleRequest,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    """Random questions per (topic, difficulty) stratum, optionally linked straight into an assessment."""
+    return sample_questions_service(session, current_user.id, sample_in.strata, sample_in.assessment_id)
+
+@router.post("/link", response_model=QuestionLinkResult)
+def link_questions(
+    link_in: QuestionLinkRequest,
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return link_questions_service(session, link_in.assessment_id, link_in.question_ids, current_user.id)
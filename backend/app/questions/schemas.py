@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlmodel import SQLModel, Field
+
+class BankQuestion(SQLModel):
+    id: int
+    question_text: str
+    options: List[str]
+    correct_answer: str
+    topic: str
+    difficulty: str
+    created_at: datetime
+
+class QuestionBankPage(SQLModel):
+    questions: List[BankQuestion]
+    next_cursor: Optional[str] = None
+
+class SampleStratum(SQLModel):
+    topic: Optional[str] = None # None matches any topic
+    difficulty: Optional[str] = None
+    count: int = Field(ge=1)
+
+class SampleRequest(SQLModel):
+    strata: List[SampleStratum]
+    assessment_id: Optional[int] = None # link the sample into this draft assessment, skipping questions it already has
+
+class SampleResult(SQLModel):
+    questions: List[BankQuestion]
+    linked: int = 0
+
+class QuestionLinkRequest(SQLModel):
+    assessment_id: int
+    question_ids: List[int]
+
+class QuestionLinkResult(SQLModel):
+    linked: List[int]
+    already_linked: List[int]
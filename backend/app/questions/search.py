@@ -0,0 +1,37 @@
+"""
+Full-text matching on question_text, per dialect.
+
+PostgreSQL matches `to_tsvector('english', question_text)` against plainto_tsquery, which is
+exactly the expression of the GIN index ix_questions_text_search. SQLite (development) looks the
+words up in the questions_fts FTS5 table. Either way every word of the query must match, with
+English stemming ("equations" finds "equation"). Other databases fall back to a LIKE scan.
+"""
+import re
+
+from sqlalchemy import column, func, literal_column, select, table
+
+from app.models.question import Question
+
+_questions_fts = table("questions_fts", column("rowid"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(query: str) -> str:
+    # Quote each word so user input cannot use FTS5 operators or column filters
+    return " ".join(f'"{word}"' for word in _WORD.findall(query))
+
+
+def text_match(dialect: str, query: str):
+    """WHERE clause for questions whose text contains every word of `query`, or None if it has no words."""
+    if not _WORD.search(query):
+        return None
+    if dialect == "postgresql":
+        # The regconfig is a literal, not a bind parameter, so the planner matches the index expression
+        english = literal_column("'english'")
+        return func.to_tsvector(english, Question.question_text).op("@@")(func.plainto_tsquery(english, query))
+    if dialect == "sqlite":
+        return Question.id.in_(
+            select(_questions_fts.c.rowid).where(literal_column("questions_fts").op("MATCH")(_fts5_query(query)))
+        )
+    return Question.question_text.ilike(f"%{query}%")
@@ -0,0 +1,150 @@
+import random
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlmodel import Session, select, func
+
+from app.models.assessment import AssessmentQuestion
+from app.models.question import Question
+from app.assessments.answer_key import answer_key_index
+from app.assessments.service import get_editable_assessment
+from app.assessments.snapshot import snapshot_cache
+from app.pagination import PAGE_SIZE, encode_cursor, decode_cursor
+from app.questions.search import text_match
+from app.questions.schemas import (
+    BankQuestion, QuestionBankPage, SampleStratum, SampleResult, QuestionLinkResult
+)
+
+MAX_QUESTIONS_PER_CALL = 500
+
+def bank_query(user_id: int, topic: Optional[str] = None, difficulty: Optional[str] = None):
+    # A teacher's bank is the questions they created; served by ix_questions_bank_filters
+    statement = select(Question).where(Question.created_by == user_id)
+    if topic is not None:
+        statement = statement.where(Question.topic == topic)
+    if difficulty is not None:
+        statement = statement.where(Question.difficulty == difficulty)
+    return statement
+
+def search_questions_service(
+    session: Session,
+    user_id: int,
+    q: Optional[str] = None,
+    topic: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE
+) -> QuestionBankPage:
+    after = decode_cursor(cursor, (int,))
+    statement = bank_query(user_id, topic, difficulty)
+    if q:
+        match = text_match(session.get_bind().dialect.name, q)
+        if match is not None:
+            statement = statement.where(match)
+    if after:
+        statement = statement.where(Question.id > after[0])
+    questions = session.exec(statement.order_by(Question.id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(questions) > limit:
+        questions = questions[:limit]
+        next_cursor = encode_cursor([questions[-1].id])
+    return QuestionBankPage(
+        questions=[BankQuestion.model_validate(question) for question in questions],
+        next_cursor=next_cursor
+    )
+
+def _linked_question_ids(session: Session, assessment_id: int, question_ids: Optional[List[int]] = None) -> set:
+    statement = select(AssessmentQuestion.question_id).where(AssessmentQuestion.assessment_id == assessment_id)
+    if question_ids is not None:
+        statement = statement.where(AssessmentQuestion.question_id.in_(question_ids))
+    return set(session.exec(statement).all())
+
+def _append_links(session: Session, assessment_id: int, question_ids: List[int]):
+    """Link questions after the assessment's last one, in one multi-row INSERT. The caller commits."""
+    if not question_ids:
+        return
+    next_order = session.exec(
+        select(func.coalesce(func.max(AssessmentQuestion.question_order), 0)).where(
+            AssessmentQuestion.assessment_id == assessment_id
+        )
+    ).one() + 1
+    session.execute(insert(AssessmentQuestion).values([
+        {"assessment_id": assessment_id, "question_id": question_id, "question_order": next_order + i}
+        for i, question_id in enumerate(question_ids)
+    ]))
+
+def _links_committed(assessment_id: int):
+    # Core INSERTs skip the mapper events that keep these in step
+    answer_key_index.invalidate_assessment(assessment_id)
+    snapshot_cache.invalidate(assessment_id)
+
+def sample_questions(session: Session, user_id: int, strata: List[SampleStratum], exclude: set) -> List[int]:
+    """
+    Uniform random sample per stratum, without replacement across strata. Each stratum reads only
+    the matching ids (an index-only scan of ix_questions_bank_filters) and picks from them in
+    Python, so there is no ORDER BY random() sorting every candidate row.
+    """
+    chosen: List[int] = []
+    taken = set(exclude)
+    for index, stratum in enumerate(strata, start=1):
+        ids_query = bank_query(user_id, stratum.topic, stratum.difficulty).with_only_columns(Question.id)
+        pool = [question_id for question_id in session.exec(ids_query).all() if question_id not in taken]
+        if len(pool) < stratum.count:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Stratum {index} asks for {stratum.count} questions but only {len(pool)} are available"
+            )
+        picked = random.sample(pool, stratum.count)
+        chosen.extend(picked)
+        taken.update(picked)
+    return chosen
+
+def sample_questions_service(
+    session: Session,
+    user_id: int,
+    strata: List[SampleStratum],
+    assessment_id: Optional[int] = None
+) -> SampleResult:
+    if not strata:
+        raise HTTPException(status_code=400, detail="At least one stratum is required")
+    if sum(stratum.count for stratum in strata) > MAX_QUESTIONS_PER_CALL:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_QUESTIONS_PER_CALL} questions per sample")
+
+    exclude = set()
+    if assessment_id is not None:
+        get_editable_assessment(session, assessment_id, user_id)
+        exclude = _linked_question_ids(session, assessment_id)
+
+    question_ids = sample_questions(session, user_id, strata, exclude)
+    by_id = {q.id: q for q in session.exec(select(Question).where(Question.id.in_(question_ids))).all()}
+    questions = [BankQuestion.model_validate(by_id[question_id]) for question_id in question_ids]
+
+    linked = 0
+    if assessment_id is not None:
+        _append_links(session, assessment_id, question_ids)
+        session.commit()
+        _links_committed(assessment_id)
+        linked = len(question_ids)
+    return SampleResult(questions=questions, linked=linked)
+
+def link_questions_service(session: Session, assessment_id: int, question_ids: List[int], user_id: int) -> QuestionLinkResult:
+    """Append bank questions to a draft assessment in one call; ones it already has are skipped."""
+    if len(question_ids) > MAX_QUESTIONS_PER_CALL:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_QUESTIONS_PER_CALL} questions per call")
+    get_editable_assessment(session, assessment_id, user_id)
+
+    requested = list(dict.fromkeys(question_ids))
+    owned = set(session.exec(
+        select(Question.id).where(Question.id.in_(requested), Question.created_by == user_id)
+    ).all())
+    missing = [question_id for question_id in requested if question_id not in owned]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Questions not found in your bank: {missing}")
+
+    existing = _linked_question_ids(session, assessment_id, requested)
+    to_link = [question_id for question_id in requested if question_id not in existing]
+    _append_links(session, assessment_id, to_link)
+    session.commit()
+    _links_committed(assessment_id)
+    return QuestionLinkResult(linked=to_link, already_linked=[q for q in requested if q in existing])
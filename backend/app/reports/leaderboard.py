@@ -0,0 +1,153 @@
+"""
+In-memory ranked leaderboards, one per assessment.
+
+Each board is a sorted array of entry tuples `(-score, time_taken, attempt_id, student_id, student_name)`,
+so ordering is score descending, then fastest time, then earliest attempt. Rank lookups and
+inserts are a bisect over that array; pages are slices starting after the previous page's last
+key, found by bisect too. The boards of LIVE assessments are loaded at startup, any other on
+first read, and submit_attempt_service adds to them as attempts are submitted. At most
+LEADERBOARD_CACHE_SIZE boards are kept, least recently read dropped first.
+
+Another worker's submissions do not reach this process's boards, so each read first compares
+the board's size with the assessment's submitted-attempt count in its score rollup (a primary
+key lookup) and reloads the board when they differ. Submitted attempts are never changed or
+removed, so equal counts mean the same entries.
+"""
+import bisect
+import math
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.models.analytics import AssessmentScoreRollup
+from app.models.assessment import Assessment, AssessmentStatus
+from app.models.attempt import Attempt
+from app.models.user import User
+
+LEADERBOARD_CACHE_SIZE = int(os.getenv("LEADERBOARD_CACHE_SIZE", "256"))
+
+Entry = Tuple[float, int, int, int, str]
+# (-score, time_taken, attempt_id): the unique sort prefix of an entry, carried by page cursors
+EntryKey = Tuple[float, int, int]
+
+
+def time_taken_seconds(started_at: datetime, submitted_at: Optional[datetime]) -> int:
+    if not submitted_at or not started_at:
+        return 0
+    return int((submitted_at - started_at).total_seconds())
+
+
+def make_entry(attempt, student_name: str) -> Entry:
+    """Entry of a submitted attempt: an Attempt, or a row with its id, student_id, score, started_at and submitted_at."""
+    return (
+        -attempt.score,
+        time_taken_seconds(attempt.started_at, attempt.submitted_at),
+        attempt.id,
+        attempt.student_id,
+        student_name,
+    )
+
+
+def submitted_attempts_query():
+    return select(
+        Attempt.id, Attempt.assessment_id, Attempt.student_id, Attempt.score, Attempt.started_at,
+        Attempt.submitted_at, User.name
+    ).join(User, Attempt.student_id == User.id).where(Attempt.submitted_at != None)
+
+
+class _Board:
+    def __init__(self, rows=()):
+        self.by_student: Dict[int, Entry] = {row.student_id: make_entry(row, row.name) for row in rows}
+        self.entries: List[Entry] = sorted(self.by_student.values())
+
+    def add(self, entry: Entry):
+        student_id = entry[3]
+        previous = self.by_student.get(student_id)
+        if previous is not None:
+            del self.entries[bisect.bisect_left(self.entries, previous)]
+        bisect.insort(self.entries, entry)
+        self.by_student[student_id] = entry
+
+
+class LeaderboardIndex:
+    def __init__(self, max_size: int = LEADERBOARD_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._boards: "OrderedDict[int, _Board]" = OrderedDict()
+
+    def _put(self, assessment_id: int, board: _Board):
+        # Caller holds the lock
+        self._boards[assessment_id] = board
+        self._boards.move_to_end(assessment_id)
+        while len(self._boards) > self.max_size:
+            self._boards.popitem(last=False)
+
+    def rebuild(self, session: Session):
+        """Load the boards of LIVE assessments, in one query."""
+        rows: Dict[int, list] = {}
+        for row in session.exec(
+            submitted_attempts_query()
+            .join(Assessment, Attempt.assessment_id == Assessment.id)
+            .where(Assessment.status == AssessmentStatus.LIVE)
+        ):
+            rows.setdefault(row.assessment_id, []).append(row)
+        with self._lock:
+            self._boards = OrderedDict()
+            for assessment_id, assessment_rows in rows.items():
+                self._put(assessment_id, _Board(assessment_rows))
+
+    def _board(self, session: Session, assessment_id: int) -> _Board:
+        rollup = session.get(AssessmentScoreRollup, assessment_id)
+        submitted = rollup.attempt_count if rollup is not None else 0
+        with self._lock:
+            board = self._boards.get(assessment_id)
+            if board is not None:
+                self._boards.move_to_end(assessment_id)
+                if len(board.entries) == submitted:
+                    return board
+        fresh = _Board(session.exec(submitted_attempts_query().where(Attempt.assessment_id == assessment_id)).all())
+        with self._lock:
+            current = self._boards.get(assessment_id)
+            if current is not None:
+                # Submissions recorded while the rows were being read are at least as new, keep them
+                for student_id, entry in current.by_student.items():
+                    if student_id not in fresh.by_student:
+                        fresh.add(entry)
+            self._put(assessment_id, fresh)
+        return fresh
+
+    def page(self, session: Session, assessment_id: int, after: Optional[EntryKey], limit: int) -> Tuple[int, List[Tuple[int, Entry]]]:
+        """Total number of ranked entries and up to `limit` (rank, entry) pairs following the key `after`."""
+        board = self._board(session, assessment_id)
+        with self._lock:
+            # An entry whose key equals `after` sorts below (*after, inf), so the page starts past it
+            start = 0 if after is None else bisect.bisect_right(board.entries, (*after, math.inf))
+            return len(board.entries), list(enumerate(board.entries[start:start + limit], start=start + 1))
+
+    def rank(self, session: Session, assessment_id: int, student_id: int) -> Optional[int]:
+        board = self._board(session, assessment_id)
+        with self._lock:
+            entry = board.by_student.get(student_id)
+            if entry is None:
+                return None
+            return bisect.bisect_left(board.entries, entry) + 1
+
+    def record(self, attempt, student_name: str):
+        """Called after an attempt is submitted and committed."""
+        with self._lock:
+            board = self._boards.get(attempt.assessment_id)
+            if board is None:
+                # Not loaded yet; the first read picks the attempt up from the DB
+                return
+            board.add(make_entry(attempt, student_name))
+
+    def invalidate(self, assessment_id: int):
+        with self._lock:
+            self._boards.pop(assessment_id, None)
+
+
+leaderboard_index = LeaderboardIndex()
@@ -1,44 +1,69 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
-from app.database import get_engine
-from app.models.user import User
+from app.database import get_session
+from app.auth.schemas import Principal
 from app.auth.dependencies import get_current_user, teacher_only, student_only
-from app.reports.schemas import Leaderboard, AttemptReport, AssessmentReport
+from app.pagination import PAGE_SIZE, MAX_PAGE_SIZE
+from app.responses import fast_json
+from app.reports.schemas import Leaderboard, AttemptReport, AssessmentReport, ReportOrder
 from app.reports.service import (
     get_leaderboard_service,
     get_attempt_report_service,
-    get_assessment_report_service
+    get_assessment_report_service,
+    get_owned_assessment
 )
+from app.reports.export import ExportFormat, ExportRows, MEDIA_TYPES, stream_assessment_export
 
 router = APIRouter(tags=["reports"])
 
-def get_session():
-    with Session(get_engine()) as session:
-        yield session
-
 @router.get("/assessments/{assessment_id}/leaderboard", response_model=Leaderboard)
 def get_leaderboard(
     assessment_id: int,
-    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
     # Public for room members (TODO: verify membership if strict needed, but generic auth is okay for now)
-    return get_leaderboard_service(session, assessment_id)
+    return fast_json(get_leaderboard_service(session, assessment_id, cursor, limit))
 
 @router.get("/attempts/{attempt_id}/report", response_model=AttemptReport)
 def get_student_report(
     attempt_id: int,
-    current_user: User = Depends(student_only),
+    current_user: Principal = Depends(student_only),
     session: Session = Depends(get_session)
 ):
-    return get_attempt_report_service(session, attempt_id, current_user.id)
+    return fast_json(get_attempt_report_service(session, attempt_id, current_user.id))
 
 @router.get("/assessments/{assessment_id}/report", response_model=AssessmentReport)
 def get_teacher_report(
     assessment_id: int,
-    current_user: User = Depends(teacher_only),
+    order: ReportOrder = ReportOrder.SCORE,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(teacher_only),
+    session: Session = Depends(get_session)
+):
+    return fast_json(get_assessment_report_service(session, assessment_id, current_user.id, order, cursor, limit))
+
+@router.get("/assessments/{assessment_id}/export")
+def export_assessment_results(
+    assessment_id: int,
+    rows: ExportRows = ExportRows.STUDENTS,
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: Principal = Depends(teacher_only),
     session: Session = Depends(get_session)
 ):
-    return get_assessment_report_service(session, assessment_id, current_user.id)
+    """Per-student or per-answer results as a streamed CSV/NDJSON download."""
+    get_owned_assessment(session, assessment_id, current_user.id)
+    # The request session lives until the download finishes; the stream reads through its own
+    session.close()
+    filename = f"assessment-{assessment_id}-{rows.value}.{format.value}"
+    return StreamingResponse(
+        stream_assessment_export(assessment_id, rows, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
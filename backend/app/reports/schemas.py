@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import List, Optional
 from pydantic import BaseModel
 from app.models.assessment import AssessmentStatus
@@ -11,7 +12,9 @@ class LeaderboardEntry(BaseModel):
 class Leaderboard(BaseModel):
     assessment_id: int
     title: str
+    total_entries: int = 0
     entries: List[LeaderboardEntry]
+    next_cursor: Optional[str] = None # pass back as ?cursor= for the next page, None on the last one
 
 class QuestionReport(BaseModel):
     question_text: str
@@ -32,10 +35,16 @@ class StudentSummary(BaseModel):
     score: float
     status: str # "Completed", "In Progress", "Not Started" (if we track non-attempts, but for now mostly Completed)
 
+class ReportOrder(str, Enum):
+    SCORE = "score" # score descending, then earliest submission
+    STUDENT = "student" # student id ascending
+
 class AssessmentReport(BaseModel):
     assessment_id: int
     title: str
     average_score: float
     highest_score: float
     lowest_score: float
+    total_students: int = 0 # submitted attempts across all pages
     students: List[StudentSummary]
+    next_cursor: Optional[str] = None
@@ -1,47 +1,43 @@
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
 from sqlmodel import Session, select, func, desc
 
+from app.models.analytics import AssessmentScoreRollup
 from app.models.assessment import Assessment, AssessmentType, AssessmentQuestion
 from app.models.attempt import Attempt, AttemptAnswer
 from app.models.question import Question
 from app.models.user import User
 from app.models.class_room import Room
+from app.reports.leaderboard import leaderboard_index
+from app.pagination import PAGE_SIZE, encode_cursor, decode_cursor
 from app.reports.schemas import (
-    Leaderboard, LeaderboardEntry, AttemptReport, QuestionReport, AssessmentReport, StudentSummary
+    Leaderboard, LeaderboardEntry, AttemptReport, QuestionReport, AssessmentReport, StudentSummary, ReportOrder
 )
 
-def get_leaderboard_service(session: Session, assessment_id: int) -> Leaderboard:
+def get_leaderboard_service(session: Session, assessment_id: int, cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Leaderboard:
     assessment = session.get(Assessment, assessment_id)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Fetch all submitted attempts
-    statement = select(Attempt, User).join(User).where(
-        Attempt.assessment_id == assessment_id,
-        Attempt.submitted_at != None
-    ).order_by(desc(Attempt.score), Attempt.submitted_at)
-    
-    results = session.exec(statement).all()
-    
-    entries = []
-    for rank, (attempt, user) in enumerate(results, start=1):
-        # Calculate time taken? For now just use score and submitted order
-        time_taken = 0 # Placeholder if not strictly tracking total time
-        if attempt.submitted_at and attempt.started_at:
-             time_taken = int((attempt.submitted_at - attempt.started_at).total_seconds())
-
-        entries.append(LeaderboardEntry(
-            rank=rank,
-            student_name=user.name,
-            score=attempt.score,
-            time_taken=time_taken
-        ))
+    # Ranked from the in-memory board: a bisect and a slice, no sort and no User join per request
+    after = decode_cursor(cursor, (float, int, int))
+    total, page = leaderboard_index.page(session, assessment_id, tuple(after) if after else None, limit)
+    entries = [
+        LeaderboardEntry(rank=rank, student_name=student_name, score=-neg_score, time_taken=time_taken)
+        for rank, (neg_score, time_taken, _, _, student_name) in page
+    ]
+    next_cursor = None
+    if page and page[-1][0] < total:
+        next_cursor = encode_cursor(page[-1][1][:3])
     
     return Leaderboard(
         assessment_id=assessment_id,
         title=assessment.title,
-        entries=entries
+        total_entries=total,
+        entries=entries,
+        next_cursor=next_cursor
     )
 
 def get_attempt_report_service(session: Session, attempt_id: int, user_id: int) -> AttemptReport:
@@ -65,26 +61,7 @@ def get_attempt_report_service(session: Session, attempt_id: int, user_id: int)
             time_taken=answer.time_taken
         ))
     
-    # Calculate Rank
-    # Reuse leaderboard logic or lightweight query
-    rank = None
-    leaderboard = get_leaderboard_service(session, attempt.assessment_id)
-    for entry in leaderboard.entries:
-        if entry.student_name == session.get(User, user_id).name: # Name match might be risky if non-unique, ideally compare IDs but leaderboard schema uses name
-             # Let's verify we can get rank reliably. 
-             # Actually, simpler:
-             pass
-    
-    # Let's fix rank search by ID if possible, or just re-query count of better scores
-    better_scores = session.exec(
-        select(func.count(Attempt.id)).where(
-            Attempt.assessment_id == attempt.assessment_id,
-            Attempt.submitted_at != None,
-            Attempt.score > attempt.score
-        )
-    ).one()
-    # Tie breaking by time? simpler to just rank by score for report
-    rank = better_scores + 1
+    rank = leaderboard_index.rank(session, attempt.assessment_id, user_id) if attempt.submitted_at else None
 
     return AttemptReport(
         attempt_id=attempt_id,
@@ -93,7 +70,7 @@ def get_attempt_report_service(session: Session, attempt_id: int, user_id: int)
         questions=questions_report
     )
 
-def get_assessment_report_service(session: Session, assessment_id: int, user_id: int) -> AssessmentReport:
+def get_owned_assessment(session: Session, assessment_id: int, user_id: int) -> Assessment:
     assessment = session.get(Assessment, assessment_id)
     if not assessment:
          raise HTTPException(status_code=404, detail="Assessment not found")
@@ -102,27 +79,54 @@ def get_assessment_report_service(session: Session, assessment_id: int, user_id:
     room = session.get(Room, assessment.room_id)
     if not room or room.teacher_id != user_id:
          raise HTTPException(status_code=403, detail="Not authorized")
+    return assessment
+
+def report_rows_query(assessment_id: int, order: ReportOrder, after: Optional[list]):
+    """
+    Submitted attempts in report order, starting after the cursor key. Served by
+    ix_attempts_assessment_score (score order) or uq_attempts_assessment_student (student order).
+    """
+    statement = select(Attempt.id, Attempt.student_id, User.name, Attempt.score, Attempt.submitted_at).join(
+        User, Attempt.student_id == User.id
+    ).where(
+        Attempt.assessment_id == assessment_id,
+        Attempt.submitted_at != None
+    )
+    if order == ReportOrder.STUDENT:
+        if after:
+            statement = statement.where(Attempt.student_id > after[0])
+        return statement.order_by(Attempt.student_id)
 
-    attempts = session.exec(
-        select(Attempt, User).join(User).where(
-             Attempt.assessment_id == assessment_id,
-             Attempt.submitted_at != None
+    if after:
+        score, submitted_at, attempt_id = after
+        try:
+            submitted_at = datetime.fromisoformat(submitted_at)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Mixed sort directions rule out a row comparison; `score <= :score` is the index range, the rest breaks ties
+        statement = statement.where(
+            Attempt.score <= score,
+            or_(
+                Attempt.score < score,
+                Attempt.submitted_at > submitted_at,
+                and_(Attempt.submitted_at == submitted_at, Attempt.id > attempt_id)
+            )
         )
-    ).all()
+    return statement.order_by(Attempt.score.desc(), Attempt.submitted_at, Attempt.id)
 
-    student_summaries = []
-    scores = []
-    
-    for attempt, user in attempts:
-        scores.append(attempt.score)
-        student_summaries.append(StudentSummary(
-            student_id=user.id,
-            student_name=user.name,
-            score=attempt.score,
-            status="Completed"
-        ))
-    
-    if not scores:
+def get_assessment_report_service(
+    session: Session,
+    assessment_id: int,
+    user_id: int,
+    order: ReportOrder = ReportOrder.SCORE,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE
+) -> AssessmentReport:
+    assessment = get_owned_assessment(session, assessment_id, user_id)
+
+    # Aggregates come from the rollup maintained at submit time, not from the rows of this page
+    rollup = session.get(AssessmentScoreRollup, assessment_id)
+    if not rollup or not rollup.attempt_count:
         return AssessmentReport(
             assessment_id=assessment_id,
             title=assessment.title,
@@ -131,12 +135,35 @@ def get_assessment_report_service(session: Session, assessment_id: int, user_id:
             lowest_score=0.0,
             students=[]
         )
-        
+
+    after = decode_cursor(cursor, (int,) if order == ReportOrder.STUDENT else (float, str, int))
+    # One extra row tells whether another page follows
+    rows = session.exec(report_rows_query(assessment_id, order, after).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        attempt_id, student_id, _, score, submitted_at = rows[-1]
+        key = [student_id] if order == ReportOrder.STUDENT else [score, submitted_at.isoformat(), attempt_id]
+        next_cursor = encode_cursor(key)
+
+    student_summaries = [
+        StudentSummary(
+            student_id=student_id,
+            student_name=student_name,
+            score=score,
+            status="Completed"
+        )
+        for _, student_id, student_name, score, _ in rows
+    ]
+
     return AssessmentReport(
         assessment_id=assessment_id,
         title=assessment.title,
-        average_score=sum(scores) / len(scores),
-        highest_score=max(scores),
-        lowest_score=min(scores),
-        students=student_summaries
+        average_score=rollup.score_sum / rollup.attempt_count,
+        highest_score=rollup.highest_score or 0.0,
+        lowest_score=rollup.lowest_score or 0.0,
+        total_students=rollup.attempt_count,
+        students=student_summaries,
+        next_cursor=next_cursor
     )
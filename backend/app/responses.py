@@ -0,0 +1,50 @@
+"""
+Fast JSON responses for the hot read endpoints.
+
+Left to itself FastAPI validates a handler's return value against response_model a second
+time, walks the result with jsonable_encoder and then runs json.dumps, i.e. three passes per
+row. The read services already build their output models, or plain rows holding exactly the
+model's fields, so the hot GET routes hand the value to fast_json() instead. orjson encodes it
+in one pass, and FastAPI skips its response_model handling for a returned Response.
+response_model stays on the route for the OpenAPI schema.
+
+FAST_JSON_RESPONSES=false sends the values through FastAPI's usual path again, e.g. to compare
+the two. Large bodies are also gzip-compressed above GZIP_MINIMUM_SIZE (see main.py).
+"""
+import os
+from typing import Any, Mapping, Optional
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))  # bytes, 0 disables compression
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+
+def _default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """Compact JSON. A model goes straight through its pydantic-core serializer; rows, dicts and lists through orjson."""
+    if isinstance(data, BaseModel):
+        return data.__pydantic_serializer__.to_json(data)
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
+
+
+def fast_json(content: Any, headers: Optional[Mapping[str, str]] = None):
+    """What a hot read handler returns: its output encoded by orjson, or content itself when the fast path is off."""
+    if not FAST_JSON_RESPONSES:
+        return content
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,176 @@
+"""
+Compare the concurrency ceiling of the sync and async (USE_ASYNC_DB) attempt routes.
+
+Starts the API twice under uvicorn, once per mode, against the same database, and hammers
+POST /assessments/attempts/{id}/answer at increasing concurrency levels. Throughput that
+stops growing while latency climbs marks the ceiling. The sync routes usually flatten out
+around the threadpool size (40); point --database-url at a real Postgres for numbers that
+include network round trips.
+
+    python benchmarks/bench_async_concurrency.py --concurrency 10 50 100 200 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(database_url: str, num_students: int, num_questions: int):
+    """Create one live assessment with an open attempt per student. Returns [(token, attempt_id)], question ids."""
+    os.environ["DATABASE_URL"] = database_url
+    from sqlmodel import SQLModel, Session
+    from app.database import get_engine
+    from app.models import User, Room, Question, Assessment, AssessmentQuestion, Attempt
+    from app.models.user import UserRole
+    from app.models.assessment import AssessmentType, AssessmentStatus
+    from app.auth.service import create_access_token
+
+    engine = get_engine()
+    engine.echo = False
+    SQLModel.metadata.create_all(engine)
+    suffix = str(int(time.time() * 1000))
+    with Session(engine) as session:
+        teacher = User(name="Bench Teacher", email=f"bench-teacher-{suffix}@example.com", password_hash="x", role=UserRole.TEACHER)
+        session.add(teacher)
+        session.commit()
+        room = Room(name="Bench", code=f"B{suffix[-7:]}", teacher_id=teacher.id)
+        session.add(room)
+        session.commit()
+        assessment = Assessment(
+            room_id=room.id, created_by=teacher.id, type=AssessmentType.LIVE, title="Bench",
+            status=AssessmentStatus.LIVE, time_per_question=60
+        )
+        session.add(assessment)
+        session.commit()
+        question_ids = []
+        for i in range(num_questions):
+            question = Question(question_text=f"Q{i}", options=["a", "b", "c", "d"], correct_answer="a", created_by=teacher.id)
+            session.add(question)
+            session.commit()
+            session.add(AssessmentQuestion(assessment_id=assessment.id, question_id=question.id, question_order=i + 1))
+            question_ids.append(question.id)
+        students = [
+            User(name=f"Student {i}", email=f"bench-{suffix}-{i}@example.com", password_hash="x", role=UserRole.STUDENT)
+            for i in range(num_students)
+        ]
+        session.add_all(students)
+        session.commit()
+        attempts = [Attempt(assessment_id=assessment.id, student_id=s.id) for s in students]
+        session.add_all(attempts)
+        session.commit()
+        tokens = [
+            create_access_token({"sub": str(s.id), "role": s.role.value}) for s in students
+        ]
+        return list(zip(tokens, [a.id for a in attempts])), question_ids
+
+
+async def run_level(base_url: str, students, question_ids, concurrency: int, total: int):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def one(i):
+            nonlocal errors
+            token, attempt_id = students[i % len(students)]
+            body = {"question_id": question_ids[i % len(question_ids)], "selected_answer": "a", "time_taken": 5}
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        f"/assessments/attempts/{attempt_id}/answer", json=body,
+                        headers={"Authorization": f"Bearer {token}"}
+                    )
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def start_server(database_url: str, use_async: bool, port: int):
+    env = dict(os.environ, DATABASE_URL=database_url, USE_ASYNC_DB="true" if use_async else "false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 40, 100, 200])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per concurrency level")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+    students, question_ids = seed(database_url, args.students, args.questions)
+
+    results = {}
+    for mode, use_async in (("sync", False), ("async", True)):
+        server = start_server(database_url, use_async, args.port)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            results[mode] = [
+                asyncio.run(run_level(base_url, students, question_ids, level, args.requests))
+                for level in args.concurrency
+            ]
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'mode':<6} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode, rows in results.items():
+        for row in rows:
+            print(f"{mode:<6} {row['concurrency']:>5} {row['throughput_rps']:>9} {row['p50_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
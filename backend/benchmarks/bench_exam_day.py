@@ -0,0 +1,340 @@
+"""
+Exam-day load test: drives the real API through a whole live exam and reports per-endpoint latency.
+
+A teacher registers, creates a room and a LIVE assessment with --questions questions. --students
+students then register, log in and join the room by code, ramping up over --ramp-up seconds.
+The teacher starts the assessment, and every student starts an attempt, loads it, saves one
+answer per question with --think-time seconds (jittered) between them, and submits. While the
+exam runs, --teachers pollers fetch the monitor list, the summary, the score distribution and
+the leaderboard every --poll-interval seconds. The teacher report and item analysis are
+fetched once at the end.
+
+The target is one of:
+  * a local uvicorn started by this script (the default), on --database-url or a temporary SQLite file
+  * the app in this process (--in-process), through httpx's ASGI transport
+  * an already running server (--base-url), whose database must already be migrated
+
+For every endpoint it prints requests, throughput, error rate and p50/p95/p99 latency. --output
+saves the run as JSON (with the git commit it ran on) and --compare prints the p95 change
+against an earlier file, so runs can be lined up across commits.
+
+    python benchmarks/bench_exam_day.py --students 300 --questions 20 --think-time 2 --output run.json
+    python benchmarks/bench_exam_day.py --students 300 --questions 20 --compare run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PASSWORD = "exam-day-password"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Recorder:
+    """Latency and status of every request, keyed by route template ("POST /assessments/attempts/{id}/answer")."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)  # endpoint -> [(started, seconds, ok)]
+
+    async def call(self, client: httpx.AsyncClient, method: str, endpoint: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+        ok = response is not None and response.is_success
+        self.samples[f"{method} {endpoint}"].append((started, elapsed, ok))
+        return response if ok else None
+
+    def summary(self):
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = [elapsed for _, elapsed, _ in samples]
+            errors = sum(1 for _, _, ok in samples if not ok)
+            span = max(s + e for s, e, _ in samples) - min(s for s, _, _ in samples)
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4),
+                "throughput_rps": round(len(samples) / span, 1) if len(samples) > 1 and span > 0 else None,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "max_ms": round(max(latencies) * 1000, 1),
+            }
+        return endpoints
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def register(recorder: Recorder, client: httpx.AsyncClient, name: str, email: str, role: str):
+    response = await recorder.call(
+        client, "POST", "/auth/register", "/auth/register",
+        json={"name": name, "email": email, "password": PASSWORD, "role": role}
+    )
+    return response.json()["access_token"] if response is not None else None
+
+
+async def set_up_teacher(recorder: Recorder, client: httpx.AsyncClient, run_id: str, num_questions: int, time_per_question: int):
+    token = await register(recorder, client, "Load Teacher", f"load-teacher-{run_id}@example.com", "teacher")
+    if token is None:
+        raise RuntimeError("Could not register the teacher; is the database migrated?")
+    room = (await recorder.call(client, "POST", "/rooms", "/rooms", json={"name": f"Load {run_id}"}, headers=auth(token))).json()
+    assessment = (await recorder.call(
+        client, "POST", "/assessments", "/assessments",
+        json={"room_id": room["id"], "title": f"Load {run_id}", "type": "LIVE", "time_per_question": time_per_question},
+        headers=auth(token)
+    )).json()
+    for i in range(num_questions):
+        await recorder.call(
+            client, "POST", "/assessments/{id}/questions/create", f"/assessments/{assessment['id']}/questions/create",
+            headers=auth(token),
+            json={"question_text": f"Load question {i + 1}", "options": ["a", "b", "c", "d"], "correct_option": "a", "question_order": i + 1}
+        )
+    return token, room, assessment
+
+
+async def join(recorder: Recorder, client: httpx.AsyncClient, run_id: str, i: int, room_code: str, delay: float):
+    await asyncio.sleep(delay)
+    email = f"load-{run_id}-{i}@example.com"
+    if await register(recorder, client, f"Load Student {i}", email, "student") is None:
+        return None
+    response = await recorder.call(client, "POST", "/auth/login", "/auth/login", json={"email": email, "password": PASSWORD})
+    if response is None:
+        return None
+    token = response.json()["access_token"]
+    if await recorder.call(client, "POST", "/rooms/join", "/rooms/join", json={"code": room_code}, headers=auth(token)) is None:
+        return None
+    return token
+
+
+async def sit_exam(recorder: Recorder, client: httpx.AsyncClient, token: str, assessment_id: int, think_time: float, delay: float):
+    await asyncio.sleep(delay)
+    response = await recorder.call(client, "POST", "/assessments/{id}/attempt", f"/assessments/{assessment_id}/attempt", headers=auth(token))
+    if response is None:
+        return
+    attempt_id = response.json()["id"]
+    response = await recorder.call(client, "GET", "/assessments/attempts/{id}", f"/assessments/attempts/{attempt_id}", headers=auth(token))
+    if response is None:
+        return
+    for question in response.json()["questions"]:
+        started = time.perf_counter()
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+        await recorder.call(
+            client, "POST", "/assessments/attempts/{id}/answer", f"/assessments/attempts/{attempt_id}/answer",
+            headers=auth(token),
+            json={
+                "question_id": question["id"],
+                "selected_answer": random.choice(question["options"]),
+                "time_taken": max(1, int(time.perf_counter() - started)),
+            }
+        )
+    await recorder.call(client, "POST", "/assessments/attempts/{id}/submit", f"/assessments/attempts/{attempt_id}/submit", headers=auth(token))
+
+
+async def poll(recorder: Recorder, client: httpx.AsyncClient, token: str, assessment_id: int, interval: float, done: asyncio.Event):
+    pages = [
+        ("/teacher/monitor/assessment/{id}", f"/teacher/monitor/assessment/{assessment_id}"),
+        ("/teacher/analytics/assessment/{id}/summary", f"/teacher/analytics/assessment/{assessment_id}/summary"),
+        ("/teacher/analytics/assessment/{id}/score-distribution", f"/teacher/analytics/assessment/{assessment_id}/score-distribution"),
+        ("/assessments/{id}/leaderboard", f"/assessments/{assessment_id}/leaderboard"),
+    ]
+    # Stagger the pollers so they do not all land in the same instant
+    await asyncio.sleep(random.uniform(0, interval))
+    while not done.is_set():
+        for endpoint, url in pages:
+            await recorder.call(client, "GET", endpoint, url, headers=auth(token))
+        try:
+            await asyncio.wait_for(done.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(client: httpx.AsyncClient, args) -> dict:
+    recorder = Recorder()
+    run_id = f"{int(time.time() * 1000)}{random.randint(0, 999):03d}"
+    phases = {}
+
+    started = time.perf_counter()
+    teacher, room, assessment = await set_up_teacher(recorder, client, run_id, args.questions, args.time_per_question)
+    phases["setup_s"] = round(time.perf_counter() - started, 2)
+
+    started = time.perf_counter()
+    ramp = args.ramp_up / max(1, args.students)
+    tokens = await asyncio.gather(*(join(recorder, client, run_id, i, room["code"], i * ramp) for i in range(args.students)))
+    tokens = [t for t in tokens if t is not None]
+    phases["join_s"] = round(time.perf_counter() - started, 2)
+
+    await recorder.call(client, "PATCH", "/assessments/{id}/start", f"/assessments/{assessment['id']}/start", headers=auth(teacher))
+
+    started = time.perf_counter()
+    done = asyncio.Event()
+    pollers = [
+        asyncio.create_task(poll(recorder, client, teacher, assessment["id"], args.poll_interval, done))
+        for _ in range(args.teachers)
+    ]
+    await asyncio.gather(*(
+        sit_exam(recorder, client, token, assessment["id"], args.think_time, i * ramp) for i, token in enumerate(tokens)
+    ))
+    done.set()
+    await asyncio.gather(*pollers)
+    phases["exam_s"] = round(time.perf_counter() - started, 2)
+
+    await recorder.call(client, "GET", "/assessments/{id}/report", f"/assessments/{assessment['id']}/report", headers=auth(teacher))
+    await recorder.call(
+        client, "GET", "/teacher/analytics/assessment/{id}/item-analysis",
+        f"/teacher/analytics/assessment/{assessment['id']}/item-analysis", headers=auth(teacher)
+    )
+    return {"students_joined": len(tokens), "phases": phases, "endpoints": recorder.summary()}
+
+
+def create_tables(database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    from sqlmodel import SQLModel
+    from app.database import get_engine
+    import app.models  # noqa: F401  registers the tables
+
+    SQLModel.metadata.create_all(get_engine())
+
+
+def start_server(database_url: str, use_async: bool, port: int, workers: int):
+    env = dict(os.environ, DATABASE_URL=database_url, USE_ASYNC_DB="true" if use_async else "false", DB_ECHO="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_against(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await run(client, args)
+
+
+async def run_in_process(args) -> dict:
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            return await run(client, args)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(endpoints: dict, baseline: dict = None):
+    header = f"{'endpoint':<62} {'reqs':>6} {'rps':>7} {'err %':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header + (f" {'p95 vs base':>12}" if baseline is not None else ""))
+    for endpoint, row in endpoints.items():
+        line = (
+            f"{endpoint:<62} {row['requests']:>6} {row['throughput_rps'] or '-':>7} {row['error_rate'] * 100:>6.1f} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}"
+        )
+        if baseline is not None:
+            before = baseline.get(endpoint)
+            if before and before["p95_ms"]:
+                line += f" {(row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100:>+11.0f}%"
+            else:
+                line += f" {'new':>12}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="load an already running server instead of starting one")
+    target.add_argument("--in-process", action="store_true", help="call the app in this process through the ASGI transport")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--async-db", action="store_true", help="serve with USE_ASYNC_DB=true")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--teachers", type=int, default=1, help="concurrent monitor/analytics pollers")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which students arrive")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds between a student's answers")
+    parser.add_argument("--poll-interval", type=float, default=3.0, help="seconds between a teacher's refreshes")
+    parser.add_argument("--time-per-question", type=int, default=60)
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connection pool size")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="an earlier --output file to compare p95 latencies with")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    if args.base_url:
+        results = asyncio.run(run_against(args.base_url, args))
+    else:
+        database_url = args.database_url or f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+        # Read by app.database at import, so set before create_tables imports it
+        os.environ["USE_ASYNC_DB"] = "true" if args.async_db else "false"
+        os.environ["DB_ECHO"] = "false"
+        create_tables(database_url)
+        if args.in_process:
+            results = asyncio.run(run_in_process(args))
+        else:
+            server = start_server(database_url, args.async_db, args.port, args.workers)
+            try:
+                results = asyncio.run(run_against(f"http://127.0.0.1:{args.port}", args))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"{results['students_joined']}/{args.students} students joined; phases (s): {results['phases']}")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+    print_results(results["endpoints"], baseline)
+
+    if args.output:
+        results = {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "target": args.base_url or ("in-process" if args.in_process else "uvicorn"),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            **results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
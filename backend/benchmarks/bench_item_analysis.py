@@ -0,0 +1,112 @@
+"""
+Item analysis cost on a large synthetic assessment.
+
+Builds the flat (attempt, question, selected answer, is_correct) rows the analytics query
+returns for --attempts x --questions responses, then times the NumPy engine end to end
+(row encoding plus statistics) and, for reference, the per-question option counting the
+endpoint used to do in Python.
+
+    python benchmarks/bench_item_analysis.py --attempts 5000 --questions 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.analytics.item_analysis import analyze, analyze_rows, encode_rows
+
+
+def make_rows(attempts: int, questions: int, options: int, skip_rate: float, seed: int):
+    rng = np.random.default_rng(seed)
+    question_ids = list(range(1, questions + 1))
+    option_texts = [[f"q{q} option {o}" for o in range(options)] for q in question_ids]
+
+    ability = rng.normal(size=attempts)
+    difficulty = rng.normal(size=questions)
+    p_correct = 1.0 / (1.0 + np.exp(-(ability[:, None] - difficulty[None, :])))
+    correct = rng.random((attempts, questions)) < p_correct
+    answered = rng.random((attempts, questions)) >= skip_rate
+    wrong_choice = rng.integers(1, options, size=(attempts, questions))
+
+    rows = []
+    for a in range(attempts):
+        for q in range(questions):
+            if not answered[a, q]:
+                continue
+            choice = 0 if correct[a, q] else wrong_choice[a, q]
+            rows.append((a + 1, question_ids[q], option_texts[q][choice], bool(correct[a, q])))
+    return rows, question_ids, option_texts
+
+
+def per_question_counts(rows, question_ids, option_texts):
+    # What the endpoint used to compute: one pass (one query) per question, counts only
+    results = []
+    for question_id, options in zip(question_ids, option_texts):
+        counts = {}
+        for _, q_id, answer, _ in rows:
+            if q_id == question_id:
+                counts[answer] = counts.get(answer, 0) + 1
+        results.append([counts.get(o, 0) for o in options])
+    return results
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--options", type=int, default=4)
+    parser.add_argument("--skip-rate", type=float, default=0.05, help="share of questions left unanswered")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline-questions", type=int, default=10,
+                        help="questions timed for the per-question baseline (extrapolated to --questions)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    rows, question_ids, option_texts = make_rows(args.attempts, args.questions, args.options, args.skip_rate, args.seed)
+    print(f"{len(rows)} responses ({args.attempts} attempts x {args.questions} questions)")
+
+    encode_s, encoded = timed(lambda: encode_rows(rows, question_ids, option_texts), args.repeat)
+    stats_s, _ = timed(lambda: analyze(*encoded, args.questions, args.options), args.repeat)
+    total_s, analysis = timed(lambda: analyze_rows(rows, question_ids, option_texts), args.repeat)
+
+    sample = args.baseline_questions
+    baseline_s, _ = timed(lambda: per_question_counts(rows, question_ids[:sample], option_texts[:sample]), 1)
+    baseline_s *= args.questions / sample
+
+    result = {
+        "attempts": args.attempts,
+        "questions": args.questions,
+        "responses": len(rows),
+        "encode_ms": round(encode_s * 1000, 1),
+        "statistics_ms": round(stats_s * 1000, 1),
+        "total_ms": round(total_s * 1000, 1),
+        "per_question_baseline_ms": round(baseline_s * 1000, 1),
+        "kr20": round(analysis.kr20, 4),
+    }
+    for key, value in result.items():
+        print(f"{key:>26}: {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Response encoding cost of the hot read endpoints, FastAPI's default path against the fast path.
+
+Seeds one LIVE assessment with --students submitted attempts over --questions questions, then
+calls each endpoint --repeat times through the app in-process (httpx's ASGI transport) twice,
+once with FAST_JSON_RESPONSES off (response_model re-validation, jsonable_encoder, json.dumps)
+and once on (orjson over the service's output). Paged endpoints are asked for --limit rows.
+Also reports the body size with and without gzip.
+
+    python benchmarks/bench_json_responses.py --students 2000 --questions 50 --limit 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--students", type=int, default=2000)
+parser.add_argument("--questions", type=int, default=50)
+parser.add_argument("--limit", type=int, default=500, help="page size for the paged endpoints")
+parser.add_argument("--repeat", type=int, default=30)
+parser.add_argument("--output", help="write results as JSON to this file")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+os.environ["DB_ECHO"] = "false"
+
+import httpx
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+
+import app.responses as responses
+from app.database import get_engine
+from app.models import *  # noqa: F401,F403 - registers every table on the metadata
+from app.models.assessment import Assessment, AssessmentQuestion, AssessmentStatus, AssessmentType
+from app.models.attempt import Attempt, AttemptAnswer
+from app.models.class_room import Room, RoomMember
+from app.models.question import Question
+from app.models.user import User, UserRole
+from app.analytics.rollups import rebuild_rollups
+from app.auth.service import create_access_token
+from app.main import app
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(students: int, questions: int):
+    now = datetime.utcnow()
+    engine = get_engine()
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(User), [
+            {"name": "teacher", "email": "teacher@example.com", "password_hash": "x", "role": UserRole.TEACHER}
+        ] + [
+            {"name": f"student {i}", "email": f"student{i}@example.com", "password_hash": "x", "role": UserRole.STUDENT}
+            for i in range(students)
+        ])
+        student_ids = list(range(2, students + 2))
+        session.execute(insert(Room).values(name="Room", code="JSON01", teacher_id=1, created_at=now))
+        session.execute(insert(RoomMember), [{"room_id": 1, "student_id": s, "joined_at": now} for s in student_ids])
+        # A room's worth of assessments for the room list, the first one LIVE and full of attempts
+        session.execute(insert(Assessment), [
+            {"room_id": 1, "created_by": 1, "type": AssessmentType.LIVE, "title": f"Assessment {i}",
+             "status": AssessmentStatus.LIVE if i == 0 else AssessmentStatus.DRAFT, "start_time": now,
+             "time_per_question": 30, "created_at": now}
+            for i in range(30)
+        ])
+        session.execute(insert(Question), [
+            {"question_text": f"Question {i}", "options": ["a", "b", "c", "d"], "correct_answer": "a",
+             "created_by": 1, "created_at": now}
+            for i in range(questions)
+        ])
+        session.execute(insert(AssessmentQuestion), [
+            {"assessment_id": 1, "question_id": q + 1, "question_order": q + 1} for q in range(questions)
+        ])
+        session.execute(insert(Attempt), [
+            {"assessment_id": 1, "student_id": s, "score": float(i % questions), "started_at": now,
+             "submitted_at": now + timedelta(seconds=60 + i), "answered_count": questions,
+             "correct_count": i % questions, "total_questions": questions}
+            for i, s in enumerate(student_ids)
+        ])
+        session.execute(insert(AttemptAnswer), [
+            {"attempt_id": a + 1, "question_id": q + 1, "selected_answer": "abcd"[(a + q) % 4],
+             "is_correct": (a + q) % 4 == 0, "time_taken": 5 + (a + q) % 30}
+            for a in range(students) for q in range(questions)
+        ])
+        session.commit()
+        rebuild_rollups(session)
+    teacher = create_access_token({"sub": "1", "role": "teacher", "name": "teacher"})
+    student = create_access_token({"sub": "2", "role": "student", "name": "student 0"})
+    return teacher, student
+
+
+async def measure(client: httpx.AsyncClient, url: str, token: str, repeat: int):
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "identity"}
+    # One untimed call warms the in-memory indexes the endpoint reads
+    response = await client.get(url, headers=headers)
+    response.raise_for_status()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+    compressed = await client.get(url, headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"})
+    return latencies, len(response.content), int(compressed.headers.get("content-length", len(compressed.content)))
+
+
+async def run(teacher: str, student: str):
+    limit = args.limit
+    endpoints = [
+        ("room assessments", "/assessments/room/1", student),
+        ("leaderboard", f"/assessments/1/leaderboard?limit={limit}", teacher),
+        ("teacher report", f"/assessments/1/report?limit={limit}", teacher),
+        ("monitor", f"/teacher/monitor/assessment/1/page?limit={limit}", teacher),
+        ("attempt report", "/attempts/1/report", student),
+        ("question analytics", "/teacher/analytics/assessment/1/questions", teacher),
+        ("item analysis", "/teacher/analytics/assessment/1/item-analysis", teacher),
+        ("score distribution", "/teacher/analytics/assessment/1/score-distribution?bins=50", teacher),
+    ]
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, url, token in endpoints:
+            row = {"endpoint": name, "url": url}
+            for mode, fast in (("default", False), ("fast", True)):
+                responses.FAST_JSON_RESPONSES = fast
+                latencies, size, gzipped = await measure(client, url, token, args.repeat)
+                row[f"{mode}_p50_ms"] = round(percentile(latencies, 50) * 1000, 2)
+                row[f"{mode}_p95_ms"] = round(percentile(latencies, 95) * 1000, 2)
+            row["bytes"], row["gzip_bytes"] = size, gzipped
+            results.append(row)
+    return results
+
+
+def main():
+    teacher, student = seed(args.students, args.questions)
+    results = asyncio.run(run(teacher, student))
+
+    print(f"{'endpoint':<20} {'default p50':>12} {'fast p50':>9} {'speedup':>8} {'bytes':>9} {'gzip':>8}")
+    for row in results:
+        speedup = row["default_p50_ms"] / row["fast_p50_ms"] if row["fast_p50_ms"] else float("nan")
+        print(
+            f"{row['endpoint']:<20} {row['default_p50_ms']:>12} {row['fast_p50_ms']:>9} {speedup:>7.2f}x "
+            f"{row['bytes']:>9} {row['gzip_bytes']:>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Login throughput and tail latency of Argon2 verification per worker count.
+
+Simulates a login storm: --clients threads each verify passwords back to back through
+the hashing pool (the same path /auth/login takes). Runs once inline (verification on
+the request thread, the old behaviour) and once per --workers value.
+
+    python benchmarks/bench_login.py --workers 1 2 4 8 --logins 400 --clients 64
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi import HTTPException
+
+from app.auth import hashing
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(workers: int, logins: int, clients: int, queue_limit: int, stored_hash: str):
+    pool = hashing.HashPool(workers=workers, queue_limit=queue_limit)
+    if workers > 0:
+        # Warm the worker processes so start-up cost is not measured
+        for _ in range(workers):
+            pool.run(hashing._hash, "warmup")
+
+    latencies = []
+    rejected = 0
+    counter = iter(range(logins))
+    lock = threading.Lock()
+
+    def client():
+        nonlocal rejected
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                pool.run(hashing._verify_and_update, "correct horse", stored_hash)
+            except HTTPException:
+                with lock:
+                    rejected += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+
+    return {
+        "workers": workers if workers > 0 else "inline",
+        "logins": len(latencies),
+        "rejected": rejected,
+        "throughput_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=40, help="concurrent request threads (Starlette default is 40)")
+    parser.add_argument("--queue-limit", type=int, default=10_000, help="admission limit; lower it to see 503 shedding")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"argon2 time_cost={hashing.ARGON2_TIME_COST} memory_cost={hashing.ARGON2_MEMORY_COST}KiB "
+          f"parallelism={hashing.ARGON2_PARALLELISM}, {os.cpu_count()} cores")
+    stored_hash = hashing._hash("correct horse")
+
+    results = [run(0, args.logins, args.clients, args.queue_limit, stored_hash)]
+    for workers in args.workers:
+        results.append(run(workers, args.logins, args.clients, args.queue_limit, stored_hash))
+
+    print(f"{'workers':>8} {'logins/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'rejected':>9}")
+    for row in results:
+        print(f"{row['workers']:>8} {row['throughput_per_s']:>9} {row['p50_ms']:>9} {row['p99_ms']:>9} {row['rejected']:>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Query-budget check for the hot endpoints.
+
+Seeds two copies of a LIVE exam in one scratch database, a small one and a large one (--small
+and --large students; each copy has a tenth as many questions as students, at least 5), with
+a submitted attempt for all but the last two students. Then calls every endpoint once per copy
+through the app itself (httpx's ASGI transport, no server), counting its SQL statements with
+count_statements(). Exits non-zero if an endpoint runs more statements than its budget below,
+or more on the large copy than on the small one: a count that grows with the data is an N+1.
+
+    python benchmarks/check_query_budgets.py                       # temporary SQLite file
+    python benchmarks/check_query_budgets.py --database-url postgresql://.../examforge_budgets --show-sql
+
+Run it with USE_ASYNC_DB=true to check the async handlers of the attempt and monitor routes.
+The database must be empty; the script creates the tables itself. When a change legitimately
+needs another statement, raise the endpoint's budget in the same commit.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", help="empty scratch database (default: temporary SQLite file)")
+parser.add_argument("--small", type=int, default=20, help="students in the small copy")
+parser.add_argument("--large", type=int, default=400, help="students in the large copy")
+parser.add_argument("--show-sql", action="store_true", help="print the statements of endpoints over budget or growing")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+os.environ["DB_ECHO"] = "false"
+
+import httpx
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel
+
+from app.database import get_engine
+from app.models import *  # noqa: F401,F403 - registers every table on the metadata
+from app.models.assessment import Assessment, AssessmentQuestion, AssessmentStatus, AssessmentType
+from app.models.attempt import Attempt, AttemptAnswer
+from app.models.class_room import Room, RoomMember
+from app.models.question import Question
+from app.models.user import User, UserRole
+from app.analytics.rollups import rebuild_rollups
+from app.auth.service import create_access_token
+from app.instrumentation import count_statements
+from app.main import app
+
+# Most SQL statements each endpoint may run, whatever the size of the exam
+BUDGETS = {
+    "POST /rooms/join": 5,
+    "GET /rooms/joined": 1,
+    "GET /rooms/my": 1,
+    "GET /assessments/room/{room_id}": 4,
+    "GET /assessments/{assessment_id}": 3,
+    "POST /assessments/{assessment_id}/attempt": 5,
+    "GET /assessments/attempts/{attempt_id}": 2,
+    "POST /assessments/attempts/{attempt_id}/answer": 4,
+    "POST /assessments/attempts/{attempt_id}/answers": 4,
+    "POST /assessments/attempts/{attempt_id}/submit": 8,
+    "GET /attempts/{attempt_id}/report": 4,
+    "GET /assessments/{assessment_id}/leaderboard": 2,
+    "GET /assessments/{assessment_id}/report": 4,
+    "GET /assessments/{assessment_id}/export": 3,
+    "GET /teacher/analytics/assessment/{assessment_id}/summary": 2,
+    "GET /teacher/analytics/assessment/{assessment_id}/questions": 4,
+    "GET /teacher/analytics/assessment/{assessment_id}/item-analysis": 3,
+    "GET /teacher/analytics/assessment/{assessment_id}/score-distribution": 4,
+    "GET /teacher/analytics/assessment/{assessment_id}/time-distribution": 2,
+    "GET /teacher/monitor/assessment/{assessment_id}": 2,
+    "GET /teacher/monitor/assessment/{assessment_id}/page": 2,
+    "GET /questions": 1,
+}
+
+
+def seed(session: Session, copy: str, students: int):
+    """One teacher, room and LIVE assessment; returns the ids and tokens the scenario needs."""
+    now = datetime.utcnow()
+    questions = max(5, students // 10)
+    teacher = User(name=f"teacher {copy}", email=f"teacher-{copy}@example.com", password_hash="x", role=UserRole.TEACHER)
+    members = [
+        User(name=f"student {copy} {i}", email=f"student-{copy}-{i}@example.com", password_hash="x", role=UserRole.STUDENT)
+        for i in range(students + 1)
+    ]
+    session.add(teacher)
+    session.add_all(members)
+    session.flush()
+    room = Room(name=copy, code=f"BUDGET{copy[0].upper()}", teacher_id=teacher.id, created_at=now)
+    session.add(room)
+    session.flush()
+    # The last student is left out of the room for the join call
+    session.execute(insert(RoomMember), [{"room_id": room.id, "student_id": s.id, "joined_at": now} for s in members[:-1]])
+    assessment = Assessment(
+        room_id=room.id, created_by=teacher.id, type=AssessmentType.LIVE, title=copy,
+        status=AssessmentStatus.LIVE, start_time=now, time_per_question=30, created_at=now
+    )
+    bank = [
+        Question(
+            question_text=f"{copy} q{i} {'linear equation' if i % 2 else 'triangle'}", options=["a", "b", "c", "d"],
+            correct_answer="a", topic=("Algebra", "Geometry")[i % 2], difficulty=("Easy", "Medium", "Hard")[i % 3],
+            created_by=teacher.id, created_at=now
+        )
+        for i in range(questions)
+    ]
+    session.add(assessment)
+    session.add_all(bank)
+    session.flush()
+    session.execute(insert(AssessmentQuestion), [
+        {"assessment_id": assessment.id, "question_id": q.id, "question_order": i + 1} for i, q in enumerate(bank)
+    ])
+    # Every student but the last two members has submitted; the last member sits the exam live
+    submitted = [
+        Attempt(
+            assessment_id=assessment.id, student_id=s.id, score=float(i % questions), started_at=now,
+            submitted_at=now + timedelta(seconds=60 + i), answered_count=questions,
+            correct_count=i % questions, total_questions=questions
+        )
+        for i, s in enumerate(members[:-3])
+    ]
+    session.add_all(submitted)
+    session.flush()
+    session.execute(insert(AttemptAnswer), [
+        {"attempt_id": a.id, "question_id": q.id, "selected_answer": "a" if j < i % questions else "b",
+         "is_correct": j < i % questions, "time_taken": 5 + (i + j) % 30}
+        for i, a in enumerate(submitted) for j, q in enumerate(bank)
+    ])
+    session.commit()
+
+    def token(user: User) -> str:
+        return create_access_token({"sub": str(user.id), "role": user.role.value, "name": user.name})
+
+    return {
+        "room_id": room.id, "room_code": room.code, "assessment_id": assessment.id,
+        "question_ids": [q.id for q in bank], "submitted_attempt_id": submitted[0].id,
+        "teacher": token(teacher), "submitted": token(members[0]), "live": token(members[-2]), "new": token(members[-1]),
+    }
+
+
+async def scenario(client: httpx.AsyncClient, ids: dict) -> dict:
+    """Statement count per endpoint, each called once as the exam would call it."""
+    counts, sql = {}, {}
+    assessment_id = ids["assessment_id"]
+
+    async def call(method: str, endpoint: str, url: str, who: str, **kwargs):
+        with count_statements(record_sql=args.show_sql) as stats:
+            response = await client.request(method, url, headers={"Authorization": f"Bearer {ids[who]}"}, **kwargs)
+        if not response.is_success:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        key = f"{method} {endpoint}"
+        counts[key], sql[key] = stats.statements, stats.sql
+        return response
+
+    await call("POST", "/rooms/join", "/rooms/join", "new", json={"code": ids["room_code"]})
+    await call("GET", "/rooms/joined", "/rooms/joined", "live")
+    await call("GET", "/rooms/my", "/rooms/my", "teacher")
+    await call("GET", "/assessments/room/{room_id}", f"/assessments/room/{ids['room_id']}", "live")
+    await call("GET", "/assessments/{assessment_id}", f"/assessments/{assessment_id}", "live")
+    attempt = (await call("POST", "/assessments/{assessment_id}/attempt", f"/assessments/{assessment_id}/attempt", "live")).json()
+    attempt_url = f"/assessments/attempts/{attempt['id']}"
+    await call("GET", "/assessments/attempts/{attempt_id}", attempt_url, "live")
+    question_ids = ids["question_ids"]
+    await call(
+        "POST", "/assessments/attempts/{attempt_id}/answer", f"{attempt_url}/answer", "live",
+        json={"question_id": question_ids[0], "selected_answer": "a", "time_taken": 3}
+    )
+    await call(
+        "POST", "/assessments/attempts/{attempt_id}/answers", f"{attempt_url}/answers", "live",
+        json={"answers": [{"question_id": q, "selected_answer": "a", "time_taken": 2} for q in question_ids[1:4]]}
+    )
+    await call("POST", "/assessments/attempts/{attempt_id}/submit", f"{attempt_url}/submit", "live")
+    await call("GET", "/attempts/{attempt_id}/report", f"/attempts/{ids['submitted_attempt_id']}/report", "submitted")
+
+    await call("GET", "/assessments/{assessment_id}/leaderboard", f"/assessments/{assessment_id}/leaderboard", "teacher")
+    await call("GET", "/assessments/{assessment_id}/report", f"/assessments/{assessment_id}/report", "teacher")
+    await call("GET", "/assessments/{assessment_id}/export", f"/assessments/{assessment_id}/export?format=csv", "teacher")
+    for page in ("summary", "questions", "item-analysis", "score-distribution", "time-distribution"):
+        endpoint = f"/teacher/analytics/assessment/{{assessment_id}}/{page}"
+        await call("GET", endpoint, f"/teacher/analytics/assessment/{assessment_id}/{page}", "teacher")
+    await call("GET", "/teacher/monitor/assessment/{assessment_id}", f"/teacher/monitor/assessment/{assessment_id}", "teacher")
+    await call("GET", "/teacher/monitor/assessment/{assessment_id}/page", f"/teacher/monitor/assessment/{assessment_id}/page?limit=2", "teacher")
+    await call("GET", "/questions", "/questions?topic=Algebra&q=equation", "teacher")
+    return {"counts": counts, "sql": sql}
+
+
+async def run(copies):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://budgets") as client:
+        return [await scenario(client, ids) for ids in copies]
+
+
+def main():
+    engine = get_engine()
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        copies = [seed(session, "small", args.small), seed(session, "large", args.large)]
+        rebuild_rollups(session)
+
+    small, large = asyncio.run(run(copies))
+
+    failures = 0
+    print(f"{'endpoint':<70} {'small':>6} {'large':>6} {'budget':>7}")
+    for endpoint, budget in BUDGETS.items():
+        few, many = small["counts"].get(endpoint), large["counts"].get(endpoint)
+        if few is None or many is None:
+            print(f"{endpoint:<70} {'-':>6} {'-':>6} {budget:>7}  NOT CALLED")
+            failures += 1
+            continue
+        problems = []
+        if many > budget:
+            problems.append("OVER BUDGET")
+        if many > few:
+            problems.append("GROWS WITH DATA")
+        print(f"{endpoint:<70} {few:>6} {many:>6} {budget:>7}  {', '.join(problems) or 'ok'}")
+        if problems:
+            failures += 1
+            for statement in large["sql"][endpoint] or ():
+                print("    ", " ".join(statement.split())[:200])
+
+    print(f"{len(BUDGETS)} endpoints checked on {engine.dialect.name}, {failures} failing")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Query-plan regression check for the hot service paths.
+
+Seeds a scratch database (one room, --students members, one LIVE assessment with --questions
+questions and a submitted attempt for all but the last two students), runs the student, teacher, report and
+analytics services against it while recording every SELECT they issue, and EXPLAINs each
+statement. Exits non-zero if any plan reads a table with a full scan instead of an index.
+
+    python benchmarks/check_query_plans.py                       # temporary SQLite file
+    python benchmarks/check_query_plans.py --database-url postgresql://.../examforge_plans
+
+On PostgreSQL the plans are taken with enable_seqscan off, so a remaining Seq Scan means no
+usable index exists (on a small seed the planner would otherwise prefer scans anyway).
+The database must be empty; the script creates the tables itself.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", help="empty scratch database (default: temporary SQLite file)")
+parser.add_argument("--students", type=int, default=2000)
+parser.add_argument("--questions", type=int, default=50)
+parser.add_argument("--show-plans", action="store_true", help="print every plan, not just the failing ones")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mktemp(suffix='.db')}"
+
+from sqlalchemy import event, insert
+from sqlmodel import Session, SQLModel
+
+from app.database import get_engine
+from app.models import *  # noqa: F401,F403 - registers every table on the metadata
+from app.models.assessment import Assessment, AssessmentQuestion, AssessmentStatus, AssessmentType
+from app.models.attempt import Attempt, AttemptAnswer
+from app.models.class_room import Room, RoomMember
+from app.models.question import Question
+from app.models.user import User, UserRole
+from app.analytics.rollups import rebuild_rollups
+from app.analytics import service as analytics
+from app.assessments import service as assessments
+from app.assessments.schemas import AnswerSubmit
+from app.monitor import service as monitor
+from app.questions import service as questions
+from app.questions.schemas import SampleStratum
+from app.reports import service as reports
+from app.reports.schemas import ReportOrder
+from app.rooms import service as rooms
+
+engine = get_engine()
+dialect = engine.dialect.name
+
+
+def seed(session: Session, students: int, questions: int):
+    now = datetime.utcnow()
+    session.execute(insert(User), [
+        {"name": "teacher", "email": "teacher@example.com", "password_hash": "x", "role": UserRole.TEACHER}
+    ] + [
+        {"name": f"student {i}", "email": f"student{i}@example.com", "password_hash": "x", "role": UserRole.STUDENT}
+        for i in range(students + 1)
+    ])
+    teacher_id = 1
+    student_ids = list(range(2, students + 3))
+    session.execute(insert(Room).values(name="Room", code="PLANS1", teacher_id=teacher_id, created_at=now))
+    session.execute(insert(RoomMember), [
+        {"room_id": 1, "student_id": s, "joined_at": now} for s in student_ids[:-1]
+    ])
+    session.execute(insert(Assessment).values(
+        room_id=1, created_by=teacher_id, type=AssessmentType.LIVE, title="Plans",
+        status=AssessmentStatus.LIVE, start_time=now, time_per_question=30, created_at=now
+    ))
+    session.execute(insert(Question), [
+        {"question_text": f"q{i} {'linear equation' if i % 2 else 'triangle'}", "options": ["a", "b", "c", "d"],
+         "correct_answer": "a", "topic": ("Algebra", "Geometry")[i % 2], "difficulty": ("Easy", "Medium", "Hard")[i % 3],
+         "created_by": teacher_id, "created_at": now}
+        for i in range(questions)
+    ])
+    session.execute(insert(AssessmentQuestion), [
+        {"assessment_id": 1, "question_id": q + 1, "question_order": q + 1} for q in range(questions)
+    ])
+    # Every student but the last two has submitted; the last member is left for the live scenario
+    session.execute(insert(Attempt), [
+        {"assessment_id": 1, "student_id": s, "score": float(i % questions), "started_at": now,
+         "submitted_at": now + timedelta(seconds=60 + i), "answered_count": questions,
+         "correct_count": i % questions, "total_questions": questions}
+        for i, s in enumerate(student_ids[:-2])
+    ])
+    session.execute(insert(AttemptAnswer), [
+        {"attempt_id": a + 1, "question_id": q + 1, "selected_answer": "a" if q < a % questions else "b",
+         "is_correct": q < a % questions, "time_taken": 5 + (a + q) % 30}
+        for a in range(students - 1) for q in range(questions)
+    ])
+    session.commit()
+    rebuild_rollups(session)
+    if dialect == "postgresql":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    return teacher_id, student_ids
+
+
+def scenario(teacher_id: int, student_ids):
+    """The request paths an exam exercises, each with its own session like a request would."""
+    live_student = student_ids[-2]
+    new_student = student_ids[-1]
+    submitted_student = student_ids[0]
+
+    def run(fn, *fn_args):
+        with Session(engine) as session:
+            return fn(session, *fn_args)
+
+    run(rooms.join_room_service, "PLANS1", new_student)
+    run(rooms.get_student_rooms_service, live_student)
+    run(rooms.get_teacher_rooms_service, teacher_id)
+    run(assessments.get_room_assessments_service, 1, live_student)
+    run(assessments.get_room_assessments_service, 1, teacher_id)
+    run(assessments.get_assessment_detail_payload_service, 1, live_student)
+    attempt = run(assessments.start_attempt_service, 1, live_student, "live")
+    run(assessments.start_attempt_service, 1, live_student, "live")
+    run(assessments.get_attempt_detail_service, attempt.id, live_student)
+    run(assessments.submit_answer_service, attempt.id, 1, "a", 3, live_student)
+    run(assessments.submit_answer_service, attempt.id, 1, "b", 4, live_student)
+    run(assessments.submit_answers_batch_service, attempt.id,
+        [AnswerSubmit(question_id=q, selected_answer="a", time_taken=2) for q in (2, 3, 4)], live_student)
+    run(assessments.submit_attempt_service, attempt.id, live_student, "live")
+
+    board = run(reports.get_leaderboard_service, 1, None, 50)
+    run(reports.get_leaderboard_service, 1, board.next_cursor, 50)
+    run(reports.get_attempt_report_service, 1, submitted_student)
+    for order in ReportOrder:
+        report = run(reports.get_assessment_report_service, 1, teacher_id, order, None, 50)
+        run(reports.get_assessment_report_service, 1, teacher_id, order, report.next_cursor, 50)
+    run(analytics.get_assessment_summary_service, 1, teacher_id)
+    run(analytics.get_assessment_questions_analytics_service, 1, teacher_id)
+    run(analytics.get_item_analysis_service, 1, teacher_id)
+    run(analytics.get_score_distribution_service, 1, teacher_id, 10)
+    run(analytics.get_time_distribution_service, 1, teacher_id, 10, 1)
+    run(questions.search_questions_service, teacher_id, None, "Algebra", "Medium", None, 20)
+    run(questions.search_questions_service, teacher_id, "equations", "Algebra", None, None, 20)
+    run(questions.sample_questions_service, teacher_id, [SampleStratum(topic="Algebra", difficulty="Easy", count=2)])
+
+    run(monitor.get_assessment_monitor_service, 1, teacher_id)
+    page = run(monitor.get_assessment_monitor_page_service, 1, teacher_id, None, 50, True)
+    run(monitor.get_assessment_monitor_page_service, 1, teacher_id, page.next_cursor, 50)
+
+
+def explain(statement: str, parameters):
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters).scalars().all()
+            full_scans = [line for line in plan if "Seq Scan" in line]
+        else:
+            plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()]
+            # "SCAN table" without an index; SEARCH ... USING INDEX and constant rows are fine
+            full_scans = [line for line in plan if re.match(r"^SCAN \w+$", line.strip())]
+    return plan, full_scans
+
+
+def main():
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        teacher_id, student_ids = seed(session, args.students, args.questions)
+
+    captured = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and statement not in captured:
+            captured[statement] = parameters
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        scenario(teacher_id, student_ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    failures = 0
+    for statement, parameters in captured.items():
+        plan, full_scans = explain(statement, parameters)
+        if full_scans:
+            failures += 1
+        if full_scans or args.show_plans:
+            print("FULL SCAN" if full_scans else "ok", "-", " ".join(statement.split())[:200])
+            for line in plan:
+                print("    ", line)
+
+    print(f"{len(captured)} distinct SELECTs checked on {dialect}, {failures} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ export default function ReportPage() {
     const { assessmentId } = useParams();
     const [leaderboard, setLeaderboard] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         const fetchLeaderboard = async () => {
@@ -37,6 +38,21 @@ export default function ReportPage() {
         fetchLeaderboard();
     }, [assessmentId]);
 
+    // The leaderboard comes a page at a time; next_cursor fetches the page after the last entry shown
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const res = await api.get(`/reports/assessments/${assessmentId}/leaderboard`, {
+                params: { cursor: leaderboard.next_cursor }
+            });
+            setLeaderboard(prev => ({ ...res.data, entries: [...prev.entries, ...res.data.entries] }));
+        } catch (err) {
+            console.error(err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     if (loading) return <div className="p-8">Loading Report...</div>;
 
     return (
@@ -89,6 +105,18 @@ export default function ReportPage() {
                             <p className="text-center py-8 text-gray-500">No entries yet.</p>
                         )}
                     </div>
+
+                    {leaderboard?.next_cursor && (
+                        <div className="mt-4 flex justify-center">
+                            <button
+                                onClick={loadMore}
+                                disabled={loadingMore}
+                                className="bg-blue-600 text-white px-6 py-2 rounded-lg hover:bg-blue-700 disabled:opacity-50"
+                            >
+                                {loadingMore ? 'Loading...' : `Load more (${leaderboard.entries.length} of ${leaderboard.total_entries})`}
+                            </button>
+                        </div>
+                    )}
                 </div>
             </div>
         </div>
@@ -7,33 +7,97 @@ export default function TeacherMonitorPage() {
     const { assessmentId } = useParams();
     const [students, setStudents] = useState([]);
     const [loading, setLoading] = useState(true);
-    const [lastUpdated, setLastUpdated] = useState(null);
-    const pollInterval = useRef(null);
+    const [connected, setConnected] = useState(false);
+    const [now, setNow] = useState(Date.now());
+    const clockOffset = useRef(0); // server time - local time, in ms
 
-    const fetchMonitorData = async () => {
-        try {
-            const res = await api.get(`/teacher/monitor/assessment/${assessmentId}`);
-            console.log("Live Monitor API Response:", res.data);
-            setStudents(res.data);
-            setLastUpdated(new Date());
-        } catch (err) {
-            console.error("Failed to fetch monitor data", err);
-        } finally {
-            setLoading(false);
-        }
+    const parseServerDate = (value) => {
+        if (!value) return null;
+        if (!value.endsWith('Z') && !value.includes('+')) value += 'Z';
+        return new Date(value).getTime();
     };
 
     useEffect(() => {
-        fetchMonitorData();
+        // Live monitor: a snapshot, then per-attempt deltas pushed over Server-Sent Events. The server
+        // re-sends a snapshot read from the database every MONITOR_RESYNC_SECONDS, which picks up
+        // changes served by other worker processes.
+        // fetch() is used instead of EventSource so the Authorization header can be sent.
+        const controller = new AbortController();
+        let retryTimer = null;
 
-        // Poll every 5 seconds
-        pollInterval.current = setInterval(fetchMonitorData, 5000);
+        const applyEvent = (event, data) => {
+            if (event === 'snapshot') {
+                clockOffset.current = parseServerDate(data.server_time) - Date.now();
+                setStudents(data.students);
+                setLoading(false);
+            } else if (event === 'attempt') {
+                setStudents(prev => {
+                    const others = prev.filter(s => s.student_id !== data.student_id);
+                    return [...others, data];
+                });
+            }
+        };
+
+        const connect = async () => {
+            try {
+                const res = await fetch(`${api.defaults.baseURL}/teacher/monitor/assessment/${assessmentId}/stream`, {
+                    headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+                    signal: controller.signal
+                });
+                if (!res.ok) throw new Error(`Monitor stream failed: ${res.status}`);
+                setConnected(true);
+
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                        const chunk = buffer.slice(0, boundary);
+                        buffer = buffer.slice(boundary + 2);
+                        let event = 'message';
+                        let data = '';
+                        chunk.split('\n').forEach(line => {
+                            if (line.startsWith('event: ')) event = line.slice(7);
+                            else if (line.startsWith('data: ')) data += line.slice(6);
+                        });
+                        if (data) applyEvent(event, JSON.parse(data));
+                    }
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return;
+                console.error("Monitor stream error", err);
+            } finally {
+                setLoading(false);
+            }
+            if (!controller.signal.aborted) {
+                // Reconnect; the server sends a fresh snapshot on every connection
+                setConnected(false);
+                retryTimer = setTimeout(connect, 3000);
+            }
+        };
+
+        connect();
+
+        // Remaining time is derived locally from the pushed deadline
+        const tick = setInterval(() => setNow(Date.now()), 1000);
 
         return () => {
-            if (pollInterval.current) clearInterval(pollInterval.current);
+            controller.abort();
+            if (retryTimer) clearTimeout(retryTimer);
+            clearInterval(tick);
         };
     }, [assessmentId]);
 
+    const remainingSeconds = (monitor) => {
+        const deadline = parseServerDate(monitor.deadline);
+        if (deadline === null) return monitor.remaining_time_seconds;
+        return Math.max(0, Math.floor((deadline - (now + clockOffset.current)) / 1000));
+    };
+
     const formatTime = (seconds) => {
         if (seconds === null || seconds === undefined) return "--";
         const m = Math.floor(seconds / 60);
@@ -55,7 +119,7 @@ export default function TeacherMonitorPage() {
                     </div>
                     <div className="text-right text-sm text-gray-500 flex items-center gap-2">
                         <RefreshCw size={14} className="animate-spin-slow" />
-                        Auto-refreshing (every 5s)
+                        {connected ? 'Live' : 'Reconnecting...'}
                     </div>
                 </div>
 
@@ -94,7 +158,7 @@ export default function TeacherMonitorPage() {
                                         <td className="px-6 py-4 whitespace-nowrap text-sm font-mono text-gray-700">
                                             {monitor.status === 'in_progress' ? (
                                                 <span className="flex items-center gap-1">
-                                                    <Clock size={14} className="text-gray-400" /> {formatTime(monitor.remaining_time_seconds)}
+                                                    <Clock size={14} className="text-gray-400" /> {formatTime(remainingSeconds(monitor))}
                                                 </span>
                                             ) : (
                                                 <span className="text-gray-400">-</span>